@@ -1,16 +1,43 @@
 # AI Analysis API Module for Gemini
 # Handles company analysis using Google Gemini API
 
+import json
 import os
+import queue
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 import google.generativeai as genai
 from typing import Optional
 
+from api.analysis_cache import AnalysisCache, cached_result, content_key, file_hash
+from api.transcript_store import TranscriptStore
+
 # Gemini API Key (환경변수에서 로드)
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
 
 # Configure Gemini
 genai.configure(api_key=GEMINI_API_KEY)
 
+# 전체 분석(analyze_all) 기본 카테고리
+ANALYSIS_CATEGORIES = ["company_overview", "business_model", "product_analysis"]
+
+# 카테고리 분석 동시 실행 수 및 Gemini 호출당 제한 시간 (초)
+ANALYSIS_WORKERS = int(os.environ.get('AI_ANALYSIS_WORKERS', '6'))
+ANALYSIS_TIMEOUT = float(os.environ.get('AI_ANALYSIS_TIMEOUT', '120'))
+
+# 분석에 사용하는 Gemini 모델 (바뀌면 캐시 키도 바뀜)
+ANALYSIS_MODEL = "gemini-2.0-flash"
+
+# 기업 분석 결과 캐시 (티커/카테고리/프롬프트/모델 해시 키)
+analysis_cache = AnalysisCache()
+
+# 어닝콜 PDF에서 추출한 텍스트 저장소 (PDF 내용 해시 키)
+transcript_store = TranscriptStore()
+
+# LLM 호출은 길어서 업스트림 공용 풀과 분리된 전용 풀 사용
+_analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix='ai-analysis')
+
 # System Prompt (공통 프롬프트)
 SYSTEM_PROMPT = """당신은 전문 기업 분석가입니다. 다음 원칙을 엄격히 준수하세요:
 
@@ -180,61 +207,181 @@ PROMPTS = {
 }
 
 
-def analyze_company(ticker: str, company_name: str, category: str) -> dict:
+def generate_text(model, prompt: str, stream: bool = False):
     """
-    Analyze a company using Gemini API.
-    
-    Args:
-        ticker: Stock ticker symbol (e.g., 'NVDA')
-        company_name: Full company name (e.g., 'NVIDIA Corp.')
-        category: Analysis category ('company_overview', 'business_model', 'product_analysis')
-    
-    Returns:
-        dict with 'success', 'content' or 'error' keys
+    Gemini 호출. stream이면 텍스트 조각을 생성되는 대로, 아니면 전체 텍스트를 한 번에 내보냅니다.
+    """
+    if not stream:
+        yield model.generate_content(prompt, request_options={"timeout": ANALYSIS_TIMEOUT}).text
+        return
+
+    for chunk in model.generate_content(prompt, stream=True, request_options={"timeout": ANALYSIS_TIMEOUT}):
+        try:
+            text = chunk.text
+        except ValueError:
+            # 텍스트가 없는 조각 (안전 필터/종료 신호 등)
+            continue
+        if text:
+            yield text
+
+
+def final_result(events) -> dict:
+    """('delta', 텍스트) / ('result', dict) 이벤트 스트림에서 마지막 결과만 반환"""
+    result = None
+    for event, payload in events:
+        if event == 'result':
+            result = payload
+    return result
+
+
+def company_analysis_key(ticker: str, category: str) -> str:
+    """기업 분석 캐시 키 (PROMPTS 템플릿이나 시스템 프롬프트, 모델이 바뀌면 달라짐)"""
+    return content_key('company', ticker.upper(), category, PROMPTS[category], SYSTEM_PROMPT, ANALYSIS_MODEL)
+
+
+def iter_company_analysis(ticker: str, company_name: str, category: str, stream: bool = True,
+                          force_refresh: bool = False):
+    """
+    analyze_company의 스트리밍 버전.
+    생성되는 대로 ('delta', 텍스트 조각)을 내보내고 마지막에 ('result', analyze_company와 같은 dict)를 내보냅니다.
+    캐시가 있으면 ('result', 캐시된 결과)만 내보냅니다.
     """
     try:
         if category not in PROMPTS:
-            return {"success": False, "error": f"Unknown category: {category}"}
+            yield 'result', {"success": False, "error": f"Unknown category: {category}"}
+            return
+        
+        cache_key = company_analysis_key(ticker, category)
+        if not force_refresh:
+            cached = analysis_cache.get(cache_key)
+            if cached is not None:
+                print(f"AI analysis cache hit: {ticker} {category}")
+                yield 'result', cached_result(cached)
+                return
         
         # Format the prompt
         prompt = PROMPTS[category].format(ticker=ticker, company_name=company_name)
         
         # Create model
         model = genai.GenerativeModel(
-            model_name="gemini-2.0-flash",
+            model_name=ANALYSIS_MODEL,
             system_instruction=SYSTEM_PROMPT
         )
         
-        # Generate response
-        response = model.generate_content(prompt)
+        # Generate response (조각을 모아 최종 텍스트 구성)
+        parts = []
+        for text in generate_text(model, prompt, stream):
+            parts.append(text)
+            yield 'delta', text
         
-        return {
+        result = {
             "success": True,
-            "content": response.text,
-            "category": category
+            "content": "".join(parts),
+            "category": category,
+            "analyzed_at": datetime.now().isoformat(),
+            "cached": False
         }
+        analysis_cache.set(cache_key, result)
+        yield 'result', result
         
     except Exception as e:
-        return {
+        yield 'result', {
             "success": False,
             "error": str(e)
         }
 
 
-def analyze_all(ticker: str, company_name: str) -> dict:
+def analyze_company(ticker: str, company_name: str, category: str, force_refresh: bool = False) -> dict:
     """
-    Run all analysis categories for a company.
+    Analyze a company using Gemini API.
+    분석 결과는 캐싱되어 AI_ANALYSIS_CACHE_TTL_DAYS 동안 API 호출 없이 반환됩니다.
+    
+    Args:
+        ticker: Stock ticker symbol (e.g., 'NVDA')
+        company_name: Full company name (e.g., 'NVIDIA Corp.')
+        category: Analysis category ('company_overview', 'business_model', 'product_analysis')
+        force_refresh: True면 캐시 무시하고 재분석
     
     Returns:
-        dict with results for each category
+        dict with 'success', 'content', 'cached' or 'error' keys
     """
-    results = {}
-    categories = ["company_overview", "business_model", "product_analysis"]
-    
+    return final_result(iter_company_analysis(ticker, company_name, category, stream=False,
+                                              force_refresh=force_refresh))
+
+
+def iter_analysis_events(ticker: str, company_name: str, categories: list = None, force_refresh: bool = False):
+    """
+    여러 카테고리를 동시에 스트리밍 생성하고 이벤트를 도착 순서대로 합쳐 내보냅니다.
+    ('delta', {"category", "text"}) 및 카테고리마다 한 번 ('category', 결과 dict).
+    ANALYSIS_TIMEOUT 동안 아무 출력이 없으면 남은 카테고리는 실패 결과로 내보냅니다.
+    """
+    categories = categories or ANALYSIS_CATEGORIES
+    events = queue.Queue()
+
+    def run(category):
+        for event, payload in iter_company_analysis(ticker, company_name, category, force_refresh=force_refresh):
+            events.put((category, event, payload))
+
     for category in categories:
-        results[category] = analyze_company(ticker, company_name, category)
+        _analysis_executor.submit(run, category)
+
+    remaining = list(categories)
+    while remaining:
+        try:
+            category, event, payload = events.get(timeout=ANALYSIS_TIMEOUT)
+        except queue.Empty:
+            break
+        if event == 'delta':
+            yield 'delta', {"category": category, "text": payload}
+        else:
+            remaining.remove(category)
+            yield 'category', {**payload, "category": category}
+
+    for category in remaining:
+        yield 'category', {
+            "success": False,
+            "error": f"Analysis timed out after {ANALYSIS_TIMEOUT:g}s",
+            "category": category
+        }
+
+
+def iter_analyze_all(ticker: str, company_name: str, categories: list = None, force_refresh: bool = False):
+    """
+    여러 카테고리 분석을 동시에 실행하고 끝나는 순서대로 (category, result)를 내보냅니다.
+    ANALYSIS_TIMEOUT 안에 끝나지 않은 카테고리는 실패 결과로 내보냅니다.
+    """
+    categories = categories or ANALYSIS_CATEGORIES
+    futures = {
+        _analysis_executor.submit(analyze_company, ticker, company_name, category, force_refresh): category
+        for category in categories
+    }
+    pending = set(futures)
+
+    try:
+        for future in as_completed(futures, timeout=ANALYSIS_TIMEOUT):
+            pending.discard(future)
+            yield futures[future], future.result()
+    except FuturesTimeoutError:
+        for future in pending:
+            future.cancel()
+            yield futures[future], {
+                "success": False,
+                "error": f"Analysis timed out after {ANALYSIS_TIMEOUT:g}s",
+                "category": futures[future]
+            }
+
+
+def analyze_all(ticker: str, company_name: str, categories: list = None, force_refresh: bool = False) -> dict:
+    """
+    Run analysis categories for a company concurrently.
+    전체 소요 시간은 카테고리별 시간의 합이 아니라 가장 느린 호출에 수렴합니다.
     
-    return results
+    Returns:
+        dict with results for each category (요청 순서)
+    """
+    categories = categories or ANALYSIS_CATEGORIES
+    results = dict(iter_analyze_all(ticker, company_name, categories, force_refresh))
+    return {category: results[category] for category in categories}
 
 
 # =====================================================
@@ -249,6 +396,9 @@ EARNINGS_CALL_SYSTEM_PROMPT = """당신은 전문 Equity Fund Manager로서 어
 - 한국어로 작성하되, 수치와 항목명은 정확히 영문 표기
 - Markdown 형식으로 답변"""
 
+# 분석 방식(텍스트 추출, 결과 형식 등)이 바뀌면 올려서 저장된 어닝콜 분석을 무효화
+EARNINGS_CALL_VERSION = 1
+
 EARNINGS_CALL_PROMPT = """다음 어닝콜 트랜스크립트를 분석하여 아래 형식으로 리포트를 작성하세요.
 
 ## 분석 대상
@@ -306,6 +456,7 @@ EARNINGS_CALL_PROMPT = """다음 어닝콜 트랜스크립트를 분석하여 
 def extract_pdf_text(pdf_path: str) -> str:
     """
     PDF 파일에서 텍스트를 추출합니다.
+    추출한 텍스트는 PDF 내용 해시로 저장되어 같은 PDF는 다시 파싱하지 않습니다.
     
     Args:
         pdf_path: PDF 파일의 전체 경로
@@ -314,104 +465,143 @@ def extract_pdf_text(pdf_path: str) -> str:
         추출된 텍스트 문자열
     """
     try:
-        import pdfplumber
-        
-        text_content = []
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_content.append(page_text)
-        
-        return "\n\n".join(text_content)
+        return transcript_store.get(pdf_path)
     
     except Exception as e:
         raise Exception(f"PDF 텍스트 추출 실패: {str(e)}")
 
 
-def analyze_earnings_call(ticker: str, pdf_path: str, period: str = "", force_refresh: bool = False) -> dict:
+def earnings_call_key(ticker: str, pdf_path: str, period: str) -> str:
+    """어닝콜 분석 캐시 키 (PDF 내용, 프롬프트, 분석 버전, 모델이 바뀌면 달라짐)"""
+    return content_key(
+        'earnings_call', EARNINGS_CALL_VERSION, file_hash(pdf_path), ticker.upper(), period,
+        EARNINGS_CALL_PROMPT, EARNINGS_CALL_SYSTEM_PROMPT, ANALYSIS_MODEL
+    )
+
+
+def migrate_legacy_analysis(cache_key: str, pdf_path: str):
     """
-    어닝콜 PDF를 분석하여 투자 리포트를 생성합니다.
-    분석 결과는 캐싱되어 다음 요청 시 API 호출 없이 반환됩니다.
-    
-    Args:
-        ticker: 종목 티커 (예: 'PLTR')
-        pdf_path: PDF 파일 경로
-        period: 분기 정보 (예: '2024 Q4')
-        force_refresh: True면 캐시 무시하고 재분석
-    
-    Returns:
-        dict with 'success', 'content', 'cached' or 'error' keys
+    PDF 옆에 저장된 이전 형식의 분석 결과(<PDF 이름>_analysis.json)를 캐시 키로 옮겨 반환
+    (없거나 실패한 분석이면 None). 원본 파일은 그대로 둡니다.
+    이미 이 키로 저장된 적이 있으면 (만료됐더라도) 옮기지 않습니다.
     """
-    import os
-    import json
-    from datetime import datetime
-    
-    # 캐시 파일 경로 설정 (PDF와 같은 폴더에 .json으로 저장)
-    pdf_dir = os.path.dirname(pdf_path)
-    pdf_basename = os.path.splitext(os.path.basename(pdf_path))[0]
-    cache_path = os.path.join(pdf_dir, f"{pdf_basename}_analysis.json")
-    
-    # 캐시 확인 (force_refresh가 아닌 경우)
-    if not force_refresh and os.path.exists(cache_path):
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-                cached_data['cached'] = True
-                cached_data['cache_date'] = cached_data.get('analyzed_at', 'Unknown')
-                print(f"Cache hit: {cache_path}")
-                return cached_data
-        except Exception as e:
-            print(f"Cache read error: {e}")
-    
+    if analysis_cache.contains(cache_key):
+        return None
+
+    legacy_path = os.path.join(
+        os.path.dirname(pdf_path),
+        f"{os.path.splitext(os.path.basename(pdf_path))[0]}_analysis.json"
+    )
     try:
-        # 1. PDF에서 텍스트 추출
-        transcript = extract_pdf_text(pdf_path)
-        
-        if not transcript or len(transcript.strip()) < 100:
-            return {
-                "success": False,
-                "error": "PDF에서 충분한 텍스트를 추출하지 못했습니다."
-            }
-        
-        # 2. 프롬프트 구성
-        prompt = EARNINGS_CALL_PROMPT.format(
-            ticker=ticker,
-            period=period,
-            transcript=transcript
-        )
-        
-        # 3. Gemini API 호출
-        model = genai.GenerativeModel(
-            model_name="gemini-2.0-flash",
-            system_instruction=EARNINGS_CALL_SYSTEM_PROMPT
-        )
-        
-        response = model.generate_content(prompt)
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Legacy analysis read error: {e}")
+        return None
+
+    if not legacy.get('success') or not legacy.get('content'):
+        return None
+
+    result = {k: v for k, v in legacy.items() if k not in ('cached', 'cache_date')}
+    analysis_cache.set(cache_key, result)
+    print(f"Legacy earnings call analysis migrated: {os.path.basename(legacy_path)}")
+    return result
+
+
+def iter_earnings_call(ticker: str, pdf_path: str, period: str = "", force_refresh: bool = False,
+                       stream: bool = True):
+    """
+    analyze_earnings_call의 스트리밍 버전.
+    생성되는 대로 ('delta', 텍스트 조각)을 내보내고 마지막에 ('result', analyze_earnings_call과 같은 dict)를 내보냅니다.
+    캐시가 있으면 ('result', 캐시된 결과)만 내보냅니다. 최종 텍스트는 다 모은 뒤 캐시에 저장합니다.
+
+    같은 어닝콜을 동시에 분석하면 먼저 온 요청만 Gemini를 호출하고
+    나머지는 그 분석이 끝나기를 기다려 저장된 결과를 받습니다.
+    """
+    requested_at = time.time()
+    try:
+        cache_key = earnings_call_key(ticker, pdf_path, period)
         
-        result = {
-            "success": True,
-            "content": response.text,
-            "ticker": ticker,
-            "period": period,
-            "analyzed_at": datetime.now().isoformat(),
-            "cached": False
-        }
+        # 캐시 확인 (force_refresh가 아닌 경우)
+        if not force_refresh:
+            cached = analysis_cache.get(cache_key) or migrate_legacy_analysis(cache_key, pdf_path)
+            if cached is not None:
+                print(f"Earnings call cache hit: {ticker} {period}")
+                yield 'result', cached_result(cached)
+                return
         
-        # 4. 캐시에 저장
-        try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
-            print(f"Analysis cached: {cache_path}")
-        except Exception as e:
-            print(f"Cache write error: {e}")
+        with analysis_cache.lock(cache_key):
+            # 기다리는 동안 다른 요청이 분석을 끝냈으면 (재분석 요청이라도) 그 결과 사용
+            cached = analysis_cache.get(cache_key, newer_than=requested_at if force_refresh else None)
+            if cached is not None:
+                print(f"Earnings call analyzed by concurrent request: {ticker} {period}")
+                yield 'result', cached_result(cached)
+                return
+            
+            # 1. PDF에서 텍스트 추출
+            transcript = extract_pdf_text(pdf_path)
+            
+            if not transcript or len(transcript.strip()) < 100:
+                yield 'result', {
+                    "success": False,
+                    "error": "PDF에서 충분한 텍스트를 추출하지 못했습니다."
+                }
+                return
+            
+            # 2. 프롬프트 구성
+            prompt = EARNINGS_CALL_PROMPT.format(
+                ticker=ticker,
+                period=period,
+                transcript=transcript
+            )
+            
+            # 3. Gemini API 호출 (조각을 모아 최종 텍스트 구성)
+            model = genai.GenerativeModel(
+                model_name=ANALYSIS_MODEL,
+                system_instruction=EARNINGS_CALL_SYSTEM_PROMPT
+            )
+            
+            parts = []
+            for text in generate_text(model, prompt, stream):
+                parts.append(text)
+                yield 'delta', text
+            
+            result = {
+                "success": True,
+                "content": "".join(parts),
+                "ticker": ticker,
+                "period": period,
+                "analyzed_at": datetime.now().isoformat(),
+                "cached": False
+            }
+            
+            # 4. 캐시에 저장 (락을 놓기 전에 저장해 기다리던 요청이 바로 사용)
+            analysis_cache.set(cache_key, result)
+            print(f"Earnings call analysis cached: {ticker} {period}")
         
-        return result
+        yield 'result', result
         
     except Exception as e:
-        return {
+        yield 'result', {
             "success": False,
             "error": str(e)
         }
 
 
+def analyze_earnings_call(ticker: str, pdf_path: str, period: str = "", force_refresh: bool = False) -> dict:
+    """
+    어닝콜 PDF를 분석하여 투자 리포트를 생성합니다.
+    분석 결과는 PDF 내용과 프롬프트/모델 해시로 캐싱되어 다음 요청 시 API 호출 없이 반환됩니다.
+    
+    Args:
+        ticker: 종목 티커 (예: 'PLTR')
+        pdf_path: PDF 파일 경로
+        period: 분기 정보 (예: '2024 Q4')
+        force_refresh: True면 캐시 무시하고 재분석
+    
+    Returns:
+        dict with 'success', 'content', 'cached' or 'error' keys
+    """
+    return final_result(iter_earnings_call(ticker, pdf_path, period, force_refresh, stream=False))
@@ -0,0 +1,124 @@
+# Analysis Cache Module
+# Persistent, content-addressed cache of Gemini analysis results (one JSON file per key)
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 내 락만 사용
+    fcntl = None
+
+from api.price_store import DATA_DIR
+
+ANALYSIS_CACHE_DIR = os.environ.get('AI_ANALYSIS_CACHE_DIR', os.path.join(DATA_DIR, 'ai_analysis'))
+
+# 저장된 분석 결과를 이 기간(일)이 지나면 다시 생성
+TTL_DAYS = float(os.environ.get('AI_ANALYSIS_CACHE_TTL_DAYS', '7'))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_key(*parts) -> str:
+    """분석 결과를 결정하는 입력(티커, 프롬프트 템플릿, 시스템 프롬프트, 모델 등)의 해시"""
+    payload = json.dumps(parts, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """파일 내용의 SHA-256 (같은 이름으로 교체된 파일도 구분)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    입력 해시 -> 분석 결과 dict를 디렉토리에 JSON 파일로 저장합니다.
+    프롬프트/모델이 바뀌면 키가 달라지므로 이전 결과는 자연히 쓰이지 않습니다.
+    파일을 공유하므로 같은 호스트의 다른 워커도 같은 결과를 사용합니다.
+    """
+
+    def __init__(self, directory: str = ANALYSIS_CACHE_DIR, ttl_days: float = TTL_DAYS):
+        self.directory = directory
+        self.ttl_days = ttl_days
+        self._locks = {}  # key -> [threading.Lock, 사용 중인 수]
+        self._locks_guard = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str, now: float = None, newer_than: float = None):
+        """저장된 결과 (없거나 TTL이 지났거나 newer_than 시각 이전에 저장된 것이면 None)"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Analysis cache read error: {e}")
+            return None
+
+        now = time.time() if now is None else now
+        saved_at = os.path.getmtime(path)
+        if now - saved_at >= self.ttl_days * 86400:
+            return None
+        if newer_than is not None and saved_at < newer_than:
+            return None
+        return result
+
+    def contains(self, key: str) -> bool:
+        """TTL과 관계없이 저장된 결과가 있는지"""
+        return os.path.exists(self._path(key))
+
+    def set(self, key: str, result: dict):
+        """임시 파일에 쓴 뒤 rename (동시에 읽는 쪽이 쓰다 만 파일을 보지 않도록)"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Analysis cache write error: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    @contextmanager
+    def lock(self, key: str):
+        """
+        같은 키의 분석을 한 번에 하나씩만 실행하도록 잠급니다
+        (스레드 간에는 키별 Lock, 같은 호스트의 프로세스 간에는 <key>.lock 파일 flock).
+        """
+        with self._locks_guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                if fcntl is None:
+                    yield
+                else:
+                    os.makedirs(self.directory, exist_ok=True)
+                    with open(os.path.join(self.directory, f"{key}.lock"), 'a') as lock_file:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)  # 파일을 닫으면 해제
+                        yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+
+def cached_result(result: dict) -> dict:
+    """캐시에서 꺼낸 결과에 캐시 표시 추가"""
+    return {**result, "cached": True, "cache_date": result.get('analyzed_at', 'Unknown')}
@@ -0,0 +1,449 @@
+# Cache Module
+# Thread-safe, size-bounded TTL/LRU cache with per-namespace TTLs
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+DEFAULT_TTL = 300  # 5분 (초)
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024  # 128MB
+DEFAULT_MAX_STALE = 86400  # 만료 후 stale 값으로 보관하는 최대 시간 (초)
+DEFAULT_WAIT_TIMEOUT = 60  # 진행 중인 계산을 기다리는 최대 시간 (초)
+REFRESH_WORKERS = 2  # 백그라운드 재계산(stale-while-revalidate) 스레드 수
+LEASE_POLL_INTERVAL = 0.2  # 다른 프로세스의 계산 결과를 확인하는 주기 (초)
+LEASE_DURATION = 60  # 계산 중 lease 유효 시간 (초), 계산이 끝날 때까지 LEASE_RENEW_INTERVAL마다 연장
+LEASE_RENEW_INTERVAL = LEASE_DURATION / 3
+PURGE_EVERY = 256  # 공유 저장소에서 오래된 항목을 정리하는 set 횟수 간격
+
+
+def estimate_size(value, _depth=0) -> int:
+    """캐시 값의 대략적인 메모리 크기(바이트) 추정 (dict/list/tuple 재귀)"""
+    # pandas 객체와 numpy 배열은 데이터 크기로만 셈 (sys.getsizeof가 이미 버퍼를 포함하므로 더하면 두 번 셈)
+    if hasattr(value, 'memory_usage'):  # pandas 객체
+        try:
+            usage = value.memory_usage(deep=True)
+            return int(usage.sum() if hasattr(usage, 'sum') else usage)
+        except Exception:
+            return sys.getsizeof(value)
+    if hasattr(value, 'nbytes') and hasattr(value, 'dtype'):  # numpy 배열 (뷰도 참조하는 버퍼 크기로)
+        return int(value.nbytes)
+
+    size = sys.getsizeof(value)
+    if _depth > 6:
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            size += estimate_size(item, _depth + 1)
+    return size
+
+
+class TTLCache:
+    """
+    키 앞부분(첫 ':' 이전)을 네임스페이스로 보고 네임스페이스별 TTL을 적용하는 캐시.
+
+    - 엔트리 수와 추정 바이트 크기 두 기준으로 LRU 순서대로 제거합니다.
+    - 모든 연산은 하나의 락으로 보호되어 멀티스레드 워커에서 안전합니다.
+    - hit / miss / eviction 카운터를 제공합니다.
+    - get_or_compute는 키별 single-flight로 동작합니다: 같은 키의 계산은 한 번만 실행되고,
+      동시에 들어온 요청은 그 결과를 기다리거나 만료된(stale) 값을 즉시 받습니다.
+    - backend(CacheBackend)를 지정하면 프로세스 내 캐시(L1) 뒤에 공유 저장소(L2)를 둡니다.
+      L1에 없으면 L2에서 읽어오고, 저장은 양쪽에 하며, 다른 프로세스가 같은 키를 계산 중이면
+      (lease) 직접 계산하지 않고 그 결과가 L2에 올라오기를 기다립니다.
+    """
+
+    def __init__(self, ttls: dict = None, default_ttl: int = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_stale: int = DEFAULT_MAX_STALE, backend=None):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+        self.backend = backend
+
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._inflight = {}  # key -> Future (진행 중인 계산)
+        self._refresher = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='cache-refresh')
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+        self.background_refreshes = 0
+        self.shared_hits = 0
+        self.peer_waits = 0
+        self._sets = 0
+
+    @staticmethod
+    def namespace(key: str) -> str:
+        return key.split(':', 1)[0]
+
+    def ttl_for(self, key: str) -> int:
+        return self.ttls.get(self.namespace(key), self.default_ttl)
+
+    def get(self, key: str):
+        """만료되지 않은 값을 반환 (없으면 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                now = time.time()
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                # 만료된 값은 max_stale 동안 stale 응답용으로 남겨둠
+                if now >= expires_at + self.max_stale:
+                    self._remove(key)
+
+        value = self._get_shared(key, fresh_only=True)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+                self.shared_hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value, ttl: int = None):
+        """값 저장 (ttl 미지정 시 네임스페이스 TTL)"""
+        ttl = self.ttl_for(key) if ttl is None else ttl
+        expires_at = time.time() + ttl
+        self._set_local(key, value, expires_at)
+
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value, expires_at)
+                self._sets += 1
+                if self._sets % PURGE_EVERY == 0:
+                    self.backend.purge(time.time() - self.max_stale)
+            except Exception as e:
+                print(f"Cache backend write error for {key}: {e}")
+
+    def get_stale(self, key: str):
+        """만료 여부와 관계없이 보관 중인 값을 반환 (없으면 None, 카운터 미반영)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() < entry[1] + self.max_stale:
+                return entry[0]
+        return self._get_shared(key, fresh_only=False)
+
+    def time_to_expiry(self, key: str):
+        """만료까지 남은 시간(초, 이미 만료되었으면 음수). 값이 없으면 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[1] - time.time()
+
+    def get_or_compute(self, key: str, compute, ttl: int = None, should_cache=None,
+                       serve_stale: bool = True, wait_timeout: float = DEFAULT_WAIT_TIMEOUT):
+        """
+        캐시에 값이 있으면 반환하고, 없으면 compute()로 계산해 저장 후 반환합니다.
+
+        같은 키에 대해 이미 계산이 진행 중이면 compute()를 다시 호출하지 않고
+        stale 값이 있으면 즉시 그 값을, 없으면 진행 중인 계산의 결과를 기다려 반환합니다.
+
+        Args:
+            compute: 인자 없는 계산 함수 (None 반환 시 저장하지 않음)
+            should_cache: 계산 결과를 저장할지 판단하는 함수 (기본: None이 아니면 저장)
+            serve_stale: 계산 진행 중일 때 stale 값 반환 허용 여부
+            wait_timeout: 진행 중인 계산을 기다리는 최대 시간 (초)
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            # 락을 기다리는 사이 다른 스레드가 계산을 끝냈을 수 있음
+            entry = self._entries.get(key)
+            if entry is not None and time.time() < entry[1]:
+                return entry[0]
+
+            flight, leader = self._begin_flight(key)
+
+        if not leader:
+            # stale 값 조회는 공유 저장소(디스크) 읽기일 수 있으므로 락 밖에서
+            stale = self.get_stale(key) if serve_stale else None
+            with self._lock:
+                if stale is not None:
+                    self.stale_hits += 1
+                    return stale
+                self.coalesced += 1
+            return self._wait_flight(key, flight, compute, ttl, should_cache, wait_timeout)
+
+        return self._run_flight(key, flight, compute, ttl, should_cache, peer_wait=wait_timeout)
+
+    def get_or_revalidate(self, key: str, compute, ttl: int = None, should_cache=None) -> tuple:
+        """
+        stale-while-revalidate 조회.
+        만료된 값이 있으면 즉시 반환하고 재계산은 백그라운드 스레드에서 수행합니다.
+        보관 중인 값이 전혀 없을 때만 get_or_compute처럼 계산을 기다립니다.
+
+        Returns:
+            (value, is_stale)
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, False
+
+        stale = self.get_stale(key)
+        if stale is None:
+            return self.get_or_compute(key, compute, ttl, should_cache), False
+
+        with self._lock:
+            self.stale_hits += 1
+        self.refresh_async(key, compute, ttl, should_cache)
+        return stale, True
+
+    def refresh(self, key: str, compute, ttl: int = None, should_cache=None,
+                wait_timeout: float = DEFAULT_WAIT_TIMEOUT):
+        """만료 여부와 관계없이 지금 다시 계산해 저장 (이미 진행 중이면 그 결과를 기다림)"""
+        with self._lock:
+            flight, leader = self._begin_flight(key)
+
+        if not leader:
+            return self._wait_flight(key, flight, compute, ttl, should_cache, wait_timeout)
+
+        return self._run_flight(key, flight, compute, ttl, should_cache)
+
+    def refresh_async(self, key: str, compute, ttl: int = None, should_cache=None):
+        """백그라운드 스레드에서 재계산 (이미 진행 중이면 아무것도 하지 않음)"""
+        with self._lock:
+            flight, leader = self._begin_flight(key)
+            if not leader:
+                return
+            self.background_refreshes += 1
+
+        def run():
+            try:
+                self._run_flight(key, flight, compute, ttl, should_cache, peer_wait=DEFAULT_WAIT_TIMEOUT)
+            except Exception as e:
+                print(f"Background refresh failed for {key}: {e}")
+
+        self._refresher.submit(run)
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+        if self.backend is not None:
+            try:
+                self.backend.delete(key)
+            except Exception as e:
+                print(f"Cache backend delete error for {key}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.backend is not None:
+            try:
+                self.backend.clear()
+            except Exception as e:
+                print(f"Cache backend clear error: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'maxEntries': self.max_entries,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'coalesced': self.coalesced,
+                'staleHits': self.stale_hits,
+                'backgroundRefreshes': self.background_refreshes,
+                'inflight': len(self._inflight),
+                'backend': type(self.backend).__name__ if self.backend is not None else None,
+                'sharedHits': self.shared_hits,
+                'peerWaits': self.peer_waits
+            }
+
+    # ---------- 내부 ----------
+
+    def _begin_flight(self, key: str) -> tuple:
+        """키의 진행 중 계산을 찾거나 새로 등록 (락 보유 상태에서 호출). (Future, leader) 반환"""
+        flight = self._inflight.get(key)
+        if flight is not None:
+            return flight, False
+
+        flight = Future()
+        self._inflight[key] = flight
+        return flight, True
+
+    def _wait_flight(self, key: str, flight: Future, compute, ttl, should_cache, wait_timeout: float):
+        """
+        같은 프로세스에서 진행 중인 계산의 결과를 기다립니다.
+        wait_timeout 안에 끝나지 않으면 stale 값을, 그것도 없으면 직접 계산한 값을 반환합니다.
+        """
+        try:
+            return flight.result(timeout=wait_timeout)
+        except FuturesTimeoutError:
+            print(f"Cache wait timed out for {key} after {wait_timeout}s")
+
+        stale = self.get_stale(key)
+        if stale is not None:
+            with self._lock:
+                self.stale_hits += 1
+            return stale
+
+        value = compute()
+        if value is not None and (should_cache is None or should_cache(value)):
+            self.set(key, value, ttl)
+        return value
+
+    def _run_flight(self, key: str, flight: Future, compute, ttl, should_cache, peer_wait: float = 0):
+        """
+        compute() 실행 후 저장하고, 대기 중인 호출자들에게 결과를 전달.
+        peer_wait > 0이면 다른 프로세스가 같은 키를 계산 중일 때 그 결과를 최대 peer_wait초 기다립니다.
+        계산하는 동안 lease를 주기적으로 연장해 오래 걸리는 계산도 다른 프로세스가 중복 실행하지 않습니다.
+        """
+        leased = self._acquire_lease(key, LEASE_DURATION)
+        renewing = None
+        try:
+            value = None
+            if not leased and peer_wait:
+                value, leased = self._wait_for_peer(key, peer_wait)
+
+            if value is None:
+                if leased:
+                    renewing = self._keep_lease(key)
+                value = compute()
+                if value is not None and (should_cache is None or should_cache(value)):
+                    self.set(key, value, ttl)
+            flight.set_result(value)
+            return value
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            if renewing is not None:
+                renewing.set()
+            if leased:
+                self._release_lease(key)
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _keep_lease(self, key: str):
+        """
+        반환된 Event가 set될 때까지 LEASE_RENEW_INTERVAL마다 lease를 연장하는 스레드 시작
+        (공유 저장소가 없으면 None)
+        """
+        if self.backend is None:
+            return None
+
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(LEASE_RENEW_INTERVAL):
+                try:
+                    if not self.backend.renew_lease(key, LEASE_DURATION):
+                        print(f"Cache lease lost for {key}")
+                        return
+                except Exception as e:
+                    print(f"Cache backend lease error for {key}: {e}")
+
+        threading.Thread(target=renew, name='cache-lease', daemon=True).start()
+        return stop
+
+    def _wait_for_peer(self, key: str, timeout: float) -> tuple:
+        """
+        다른 프로세스의 계산 결과가 공유 저장소에 올라오기를 기다립니다.
+        그 프로세스가 저장 없이 끝나면 lease를 넘겨받습니다.
+
+        Returns:
+            (value, leased) - 시간 초과 시 (None, False)
+        """
+        with self._lock:
+            self.peer_waits += 1
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            time.sleep(LEASE_POLL_INTERVAL)
+            value = self._get_shared(key, fresh_only=True)
+            if value is not None:
+                return value, False
+            if self._acquire_lease(key, LEASE_DURATION):
+                # 확인 직후 저장하고 lease를 놓았을 수 있으므로 한 번 더 확인
+                value = self._get_shared(key, fresh_only=True)
+                if value is not None:
+                    self._release_lease(key)
+                    return value, False
+                return None, True
+        return None, False
+
+    def _get_shared(self, key: str, fresh_only: bool):
+        """공유 저장소에서 읽어 L1에 채움 (fresh_only가 아니면 max_stale 이내 만료 값 포함)"""
+        if self.backend is None:
+            return None
+        try:
+            found = self.backend.get(key)
+        except Exception as e:
+            print(f"Cache backend read error for {key}: {e}")
+            return None
+        if found is None:
+            return None
+
+        value, expires_at = found
+        now = time.time()
+        if now >= expires_at + self.max_stale or (fresh_only and now >= expires_at):
+            return None
+        self._set_local(key, value, expires_at)
+        return value
+
+    def _acquire_lease(self, key: str, duration: float) -> bool:
+        """공유 저장소가 없거나 lease 확인에 실패하면 직접 계산 (True)"""
+        if self.backend is None:
+            return True
+        try:
+            return self.backend.acquire_lease(key, duration)
+        except Exception as e:
+            print(f"Cache backend lease error for {key}: {e}")
+            return True
+
+    def _release_lease(self, key: str):
+        if self.backend is None:
+            return
+        try:
+            self.backend.release_lease(key)
+        except Exception as e:
+            print(f"Cache backend lease error for {key}: {e}")
+
+    def _set_local(self, key: str, value, expires_at: float):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            self._evict()
+
+    def _remove(self, key: str):
+        """항목 제거 (만료된 항목이면 expirations에 한 번 반영)"""
+        _, expires_at, size = self._entries.pop(key)
+        self._bytes -= size
+        if time.time() >= expires_at:
+            self.expirations += 1
+
+    def _evict(self):
+        """오래 사용되지 않은 항목부터 제한 이내가 될 때까지 제거 (가장 최근 항목은 유지)"""
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
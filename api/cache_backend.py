@@ -0,0 +1,125 @@
+# Cache Backend Module
+# Shared (cross-process) storage behind TTLCache so gunicorn workers on a host share one cache
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+
+class CacheBackend:
+    """
+    TTLCache의 공유 저장소 인터페이스.
+    값은 직렬화되어 만료 시각(expires_at, epoch 초)과 함께 저장됩니다.
+
+    lease는 여러 프로세스가 같은 키를 동시에 계산하지 않도록 하는 짧은 점유 표시입니다.
+    """
+
+    def get(self, key: str):
+        """(value, expires_at) 반환 (없으면 None)"""
+        raise NotImplementedError
+
+    def set(self, key: str, value, expires_at: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def purge(self, before: float):
+        """expires_at이 before 이전인 항목 삭제"""
+        raise NotImplementedError
+
+    def acquire_lease(self, key: str, duration: float) -> bool:
+        """다른 프로세스가 점유 중이 아니면 duration초 동안 점유하고 True"""
+        return True
+
+    def renew_lease(self, key: str, duration: float) -> bool:
+        """이 프로세스가 점유 중인 lease를 지금부터 duration초로 연장 (점유를 잃었으면 False)"""
+        return True
+
+    def release_lease(self, key: str):
+        pass
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    로컬 SQLite 파일(WAL 모드) 기반 공유 캐시. 외부 서비스 없이 같은 호스트의
+    모든 워커 프로세스가 읽고 씁니다. 값은 pickle로 직렬화합니다.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        # 스레드별 연결 (fork 이후에는 부모 연결을 재사용하지 않음)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache '
+            '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS leases '
+            '(key TEXT PRIMARY KEY, owner INTEGER NOT NULL, expires_at REAL NOT NULL)'
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str):
+        row = self._conn().execute('SELECT value, expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0]), row[1]
+
+    def set(self, key: str, value, expires_at: float):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._conn().execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, sqlite3.Binary(payload), expires_at)
+        )
+
+    def delete(self, key: str):
+        self._conn().execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute('DELETE FROM cache')
+        conn.execute('DELETE FROM leases')
+
+    def purge(self, before: float):
+        conn = self._conn()
+        conn.execute('DELETE FROM cache WHERE expires_at < ?', (before,))
+        conn.execute('DELETE FROM leases WHERE expires_at < ?', (time.time(),))
+
+    def acquire_lease(self, key: str, duration: float) -> bool:
+        conn = self._conn()
+        now = time.time()
+        conn.execute('DELETE FROM leases WHERE key = ? AND expires_at < ?', (key, now))
+        cursor = conn.execute(
+            'INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)',
+            (key, os.getpid(), now + duration)
+        )
+        return cursor.rowcount == 1
+
+    def renew_lease(self, key: str, duration: float) -> bool:
+        cursor = self._conn().execute(
+            'UPDATE leases SET expires_at = ? WHERE key = ? AND owner = ?',
+            (time.time() + duration, key, os.getpid())
+        )
+        return cursor.rowcount == 1
+
+    def release_lease(self, key: str):
+        self._conn().execute('DELETE FROM leases WHERE key = ? AND owner = ?', (key, os.getpid()))
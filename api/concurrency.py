@@ -0,0 +1,91 @@
+# Concurrency Module
+# Shared, bounded thread pool for fanning out independent upstream calls
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+# 업스트림(yfinance, FDR, 번역 등) 호출용 공용 스레드 풀 크기 및 호출당 타임아웃
+MAX_WORKERS = int(os.environ.get('UPSTREAM_MAX_WORKERS', '16'))
+DEFAULT_TIMEOUT = float(os.environ.get('UPSTREAM_TIMEOUT', '15'))
+
+THREAD_NAME_PREFIX = 'upstream'
+
+executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix=THREAD_NAME_PREFIX)
+
+# 캐시 워밍업 같은 대량 백그라운드 작업용 소형 풀.
+# 스레드 이름이 THREAD_NAME_PREFIX로 시작하므로 안에서의 fan-out은 공용 풀에 제출되지 않고
+# 순차 실행되어, 요청 경로의 업스트림 호출이 백그라운드 작업 뒤에 밀리지 않습니다.
+BACKGROUND_WORKERS = int(os.environ.get('BACKGROUND_MAX_WORKERS', '2'))
+background_executor = ThreadPoolExecutor(
+    max_workers=BACKGROUND_WORKERS, thread_name_prefix=f'{THREAD_NAME_PREFIX}-background'
+)
+
+
+def in_worker_thread() -> bool:
+    """현재 스레드가 공용 풀의 워커인지 확인"""
+    return threading.current_thread().name.startswith(THREAD_NAME_PREFIX)
+
+
+def submit_all(calls: dict) -> dict:
+    """
+    인자 없는 호출들을 공용 풀에 제출합니다.
+
+    풀 워커 안에서 다시 호출되면 (중첩 fan-out) 풀 고갈로 인한 교착을 막기 위해
+    제출하지 않고 그 자리에서 순차 실행합니다.
+
+    Args:
+        calls: name -> callable
+
+    Returns:
+        dict of name -> Future
+    """
+    if in_worker_thread():
+        futures = {}
+        for name, fn in calls.items():
+            future = Future()
+            try:
+                future.set_result(fn())
+            except Exception as e:
+                future.set_exception(e)
+            futures[name] = future
+        return futures
+
+    return {name: executor.submit(fn) for name, fn in calls.items()}
+
+
+def collect(futures: dict, timeout: float = DEFAULT_TIMEOUT) -> tuple:
+    """
+    제출된 호출들의 결과를 모읍니다. 타임아웃 내에 끝나지 않았거나 실패한 호출은
+    결과에서 제외하고 errors에 사유를 기록합니다 (부분 결과 허용).
+
+    Returns:
+        (results, errors) - name -> 결과값, name -> 에러 메시지
+    """
+    _, not_done = wait(list(futures.values()), timeout=timeout)
+
+    results = {}
+    errors = {}
+    for name, future in futures.items():
+        if future in not_done:
+            future.cancel()
+            errors[name] = f"timed out after {timeout}s"
+            print(f"Upstream call timed out: {name}")
+            continue
+
+        exc = future.exception()
+        if exc is not None:
+            errors[name] = str(exc)
+            print(f"Upstream call failed: {name}: {exc}")
+        else:
+            results[name] = future.result()
+
+    return results, errors
+
+
+def fan_out(calls: dict, timeout: float = DEFAULT_TIMEOUT) -> tuple:
+    """
+    독립적인 호출들을 동시에 실행하고 (results, errors)를 반환합니다.
+    전체 지연은 호출들의 합이 아니라 가장 느린 호출(최대 timeout)에 수렴합니다.
+    """
+    return collect(submit_all(calls), timeout)
@@ -0,0 +1,80 @@
+# Downsample Module
+# Shape-preserving downsampling for long-range charts (OHLC bucketing for candles, LTTB for lines)
+
+import numpy as np
+import pandas as pd
+
+MIN_POINTS = 10  # max_points 최소값
+
+
+def bucket_starts(length: int, buckets: int) -> np.ndarray:
+    """length개 봉을 buckets개의 연속 구간으로 나눈 각 구간의 시작 위치"""
+    return np.linspace(0, length, buckets + 1).astype(np.int64)[:-1]
+
+
+def downsample_ohlcv(df: pd.DataFrame, max_points: int) -> tuple:
+    """
+    연속된 봉들을 max_points개 구간으로 묶어 하나의 캔들로 만듭니다.
+    시가=첫 봉 시가, 고가=구간 최고가, 저가=구간 최저가, 종가=마지막 봉 종가, 거래량=합계,
+    날짜=구간 첫 봉 날짜 (구간의 실제 고가/저가가 그대로 유지됨).
+
+    Returns:
+        (구간 캔들 DataFrame, 구간 시작 위치 배열, 구간 마지막 위치 배열)
+    """
+    length = len(df)
+    starts = bucket_starts(length, min(max_points, length))
+    ends = np.append(starts[1:], length) - 1
+
+    columns = {
+        'Open': df['Open'].to_numpy(dtype='f8')[starts],
+        'High': np.fmax.reduceat(df['High'].to_numpy(dtype='f8'), starts),
+        'Low': np.fmin.reduceat(df['Low'].to_numpy(dtype='f8'), starts),
+        'Close': df['Close'].to_numpy(dtype='f8')[ends]
+    }
+    if 'Volume' in df.columns:
+        columns['Volume'] = np.add.reduceat(np.nan_to_num(df['Volume'].to_numpy(dtype='f8')), starts)
+
+    return pd.DataFrame(columns, index=df.index[starts]), starts, ends
+
+
+def lttb_indices(values, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: 선의 모양(고점/저점)을 최대한 유지하도록 max_points개의 점을 고릅니다.
+    NaN은 건너뛰며, 첫 점과 마지막 점은 항상 포함됩니다.
+
+    Returns:
+        선택된 위치 (원래 배열 기준, 오름차순)
+    """
+    y_all = np.asarray(values, dtype='f8')
+    valid = np.flatnonzero(~np.isnan(y_all))
+    length = len(valid)
+    if max_points >= length or max_points < 3:
+        return valid
+
+    x = valid.astype('f8')
+    y = y_all[valid]
+    every = (length - 2) / (max_points - 2)
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(max_points - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+
+        # 다음 구간의 평균점 (마지막 구간은 마지막 점)
+        next_end = min(int((i + 2) * every) + 1, length)
+        if end < next_end:
+            avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # 이전 선택점 - 후보 - 다음 평균점으로 이루어진 삼각형 넓이가 가장 큰 후보 선택
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    selected[-1] = length - 1
+    return valid[selected]
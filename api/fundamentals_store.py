@@ -0,0 +1,236 @@
+# Fundamentals Store Module
+# Local SQLite database of normalized financial statements and derived period metrics per ticker
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from api.price_store import DATA_DIR
+
+FUNDAMENTALS_DB_PATH = os.environ.get('FUNDAMENTALS_DB_PATH', os.path.join(DATA_DIR, 'fundamentals.sqlite3'))
+
+# 저장된 재무 데이터를 이 기간(일)이 지나면 다시 조회 (추정치 갱신 반영)
+TTL_DAYS = float(os.environ.get('FUNDAMENTALS_TTL_DAYS', '7'))
+
+# 마지막 분기 말 이후 이 기간(일)이 지나면 새 분기 실적이 발표됐을 수 있으므로 조회
+# (분기 91일 + 발표까지 약 30일), 아직 발표 전이면 RECHECK_DAYS마다 다시 확인
+NEW_PERIOD_DAYS = 121
+RECHECK_DAYS = 1
+
+# 지표 계산 방식(calculate_period_metrics)이 바뀌면 올려서 저장된 재무제표로 다시 계산
+METRICS_VERSION = 1
+
+
+class FundamentalsStore:
+    """
+    종목별 재무제표(정규화: 종목/재무제표/행/열/값)와 기간별 파생 지표(종목/주기/기간/필드/값)를
+    SQLite(WAL) 파일 하나에 저장합니다. 같은 호스트의 워커들이 함께 읽고 씁니다.
+    """
+
+    def __init__(self, path: str = FUNDAMENTALS_DB_PATH, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        # 스레드별 연결 (fork 이후에는 부모 연결을 재사용하지 않음)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS tickers '
+            '(ticker TEXT PRIMARY KEY, fetched_at REAL NOT NULL, latest_period_end TEXT, '
+            'metrics_version INTEGER NOT NULL)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS statements '
+            '(ticker TEXT NOT NULL, statement TEXT NOT NULL, row_label TEXT NOT NULL, col_label TEXT NOT NULL, '
+            'value REAL, PRIMARY KEY (ticker, statement, row_label, col_label))'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS metrics '
+            '(ticker TEXT NOT NULL, frequency TEXT NOT NULL, period TEXT NOT NULL, is_estimate INTEGER NOT NULL, '
+            'field TEXT NOT NULL, value REAL, PRIMARY KEY (ticker, frequency, period, field))'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS metrics_field ON metrics (field, frequency)')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    # ---------- 갱신 판단 ----------
+
+    def status(self, ticker: str):
+        """(fetched_at, latest_period_end, metrics_version) 반환 (저장된 적 없으면 None)"""
+        return self._conn().execute(
+            'SELECT fetched_at, latest_period_end, metrics_version FROM tickers WHERE ticker = ?',
+            (ticker.upper(),)
+        ).fetchone()
+
+    def needs_fetch(self, ticker: str, now: float = None) -> bool:
+        """TTL이 지났거나 새 분기 실적이 나왔을 시점이면 True"""
+        status = self.status(ticker)
+        if status is None:
+            return True
+
+        now = time.time() if now is None else now
+        fetched_at, latest_period_end, _ = status
+        age_days = (now - fetched_at) / 86400
+        if age_days >= TTL_DAYS:
+            return True
+
+        if latest_period_end and age_days >= RECHECK_DAYS:
+            expected = datetime.strptime(latest_period_end, '%Y-%m-%d') + timedelta(days=NEW_PERIOD_DAYS)
+            return datetime.fromtimestamp(now) >= expected
+        return False
+
+    # ---------- 저장 ----------
+
+    def save(self, ticker: str, statements: dict, fundamentals: dict, fetched_at: float = None):
+        """
+        재무제표 원본과 파생 지표를 종목 단위로 교체 저장합니다.
+
+        Args:
+            statements: 재무제표 이름 -> DataFrame (행 x 열, 예: 'Total Revenue' x 기간 말일)
+            fundamentals: {"annual": [지표 dict], "quarterly": [지표 dict]}
+            fetched_at: Yahoo에서 조회한 시각 (기본: 지금)
+        """
+        ticker = ticker.upper()
+        statement_rows = []
+        period_ends = []
+        for name, df in statements.items():
+            if df is None or getattr(df, 'empty', True):
+                continue
+            for col in df.columns:
+                col_label = col.strftime('%Y-%m-%d') if hasattr(col, 'strftime') else str(col)
+                if hasattr(col, 'strftime'):
+                    period_ends.append(col_label)
+                for row_label, value in df[col].items():
+                    statement_rows.append((ticker, name, str(row_label), col_label, _to_real(value)))
+
+        metric_rows = []
+        for frequency, periods in fundamentals.items():
+            for metrics in periods:
+                is_estimate = int(bool(metrics.get('isEstimate')))
+                for field, value in metrics.items():
+                    if field in ('period', 'isEstimate'):
+                        continue
+                    metric_rows.append((ticker, frequency, metrics['period'], is_estimate, field, _to_real(value)))
+
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM statements WHERE ticker = ?', (ticker,))
+            conn.execute('DELETE FROM metrics WHERE ticker = ?', (ticker,))
+            conn.executemany('INSERT OR REPLACE INTO statements VALUES (?, ?, ?, ?, ?)', statement_rows)
+            conn.executemany('INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?, ?)', metric_rows)
+            conn.execute(
+                'INSERT OR REPLACE INTO tickers (ticker, fetched_at, latest_period_end, metrics_version) '
+                'VALUES (?, ?, ?, ?)',
+                (ticker, fetched_at or time.time(), max(period_ends) if period_ends else None, METRICS_VERSION)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def save_metrics(self, ticker: str, fundamentals: dict):
+        """저장된 재무제표로 다시 계산한 지표만 교체 (조회 시각은 유지)"""
+        status = self.status(ticker)
+        self.save(ticker, self.load_statements(ticker), fundamentals, fetched_at=status[0] if status else None)
+
+    # ---------- 조회 ----------
+
+    def load(self, ticker: str):
+        """
+        저장된 파생 지표를 fetch 결과와 같은 형태로 반환합니다 (없거나 지표 버전이 다르면 None).
+
+        Returns:
+            {"annual": [...], "quarterly": [...]} (각각 기간 오름차순)
+        """
+        status = self.status(ticker)
+        if status is None or status[2] != METRICS_VERSION:
+            return None
+
+        rows = self._conn().execute(
+            'SELECT frequency, period, is_estimate, field, value FROM metrics WHERE ticker = ?',
+            (ticker.upper(),)
+        ).fetchall()
+
+        periods = {'annual': {}, 'quarterly': {}}
+        for frequency, period, is_estimate, field, value in rows:
+            metrics = periods.setdefault(frequency, {}).setdefault(
+                period, {'period': period, 'isEstimate': bool(is_estimate)}
+            )
+            metrics[field] = value
+
+        return {
+            frequency: [by_period[period] for period in sorted(by_period)]
+            for frequency, by_period in periods.items()
+        }
+
+    def load_statements(self, ticker: str) -> dict:
+        """저장된 재무제표 원본 (재무제표 이름 -> DataFrame, 기간 열은 최신순)"""
+        rows = self._conn().execute(
+            'SELECT statement, row_label, col_label, value FROM statements WHERE ticker = ?',
+            (ticker.upper(),)
+        ).fetchall()
+
+        statements = {}
+        if not rows:
+            return statements
+
+        df = pd.DataFrame(rows, columns=['statement', 'row', 'col', 'value'])
+        for name, group in df.groupby('statement', sort=False):
+            table = group.pivot(index='row', columns='col', values='value')
+            try:
+                # 재무제표: 열 = 기간 말일 (yfinance와 같이 최신순)
+                table.columns = pd.to_datetime(table.columns, format='%Y-%m-%d')
+                table = table[sorted(table.columns, reverse=True)]
+            except (ValueError, TypeError):
+                pass
+            statements[name] = table
+        return statements
+
+    def metric_trend(self, field: str, frequency: str = 'annual', tickers: list = None,
+                     include_estimates: bool = False) -> pd.DataFrame:
+        """
+        여러 종목의 한 지표 추이 (예: 전 종목 GPM 추이).
+
+        Returns:
+            DataFrame (기간 x 종목)
+        """
+        query = 'SELECT ticker, period, value FROM metrics WHERE field = ? AND frequency = ?'
+        params = [field, frequency]
+        if not include_estimates:
+            query += ' AND is_estimate = 0'
+        if tickers:
+            query += f" AND ticker IN ({','.join('?' * len(tickers))})"
+            params.extend(t.upper() for t in tickers)
+
+        rows = self._conn().execute(query, params).fetchall()
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows, columns=['ticker', 'period', 'value'])
+        return df.pivot(index='period', columns='ticker', values='value').sort_index()
+
+    def fields(self) -> list:
+        """저장된 지표 필드 이름"""
+        return [row[0] for row in self._conn().execute('SELECT DISTINCT field FROM metrics ORDER BY field')]
+
+
+def _to_real(value):
+    """SQLite REAL로 저장할 값 (숫자가 아니거나 NaN이면 None)"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value
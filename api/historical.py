@@ -1,25 +1,31 @@
 # api/historical.py
 from http.server import BaseHTTPRequestHandler
-import FinanceDataReader as fdr
-import json
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime, timedelta
 
+try:
+    from api.price_store import get_history, resample_ohlcv
+    from api.serialization import encode_dates, encode_ohlc
+    from api.responses import dumps
+except ImportError:
+    from price_store import get_history, resample_ohlcv
+    from serialization import encode_dates, encode_ohlc
+    from responses import dumps
+
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
-        try:
-            query_components = parse_qs(urlparse(self.path).query)
-            ticker = query_components.get('ticker', ['AAPL'])[0]
-            date_range = query_components.get('range', ['1y'])[0] # 1m, 3m, 1y, 5y, max
-            interval = query_components.get('interval', ['d'])[0] # d, w, m
-            
-            # CORS Headers
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'X-Requested-With, Content-Type')
-            self.end_headers()
+        query_components = parse_qs(urlparse(self.path).query)
+        ticker = query_components.get('ticker', ['AAPL'])[0]
+        date_range = query_components.get('range', ['1y'])[0] # 1m, 3m, 1y, 5y, max
+        interval = query_components.get('interval', ['d'])[0] # d, w, m
+
+        # CORS Headers
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'X-Requested-With, Content-Type')
+        self.end_headers()
         
         # Calculate start date
         today = datetime.now()
@@ -37,8 +43,8 @@ class handler(BaseHTTPRequestHandler):
             start_date = (today - timedelta(days=365)).strftime('%Y-%m-%d')
         
         try:
-            # Fetch data using FinanceDataReader
-            df = fdr.DataReader(ticker, start_date)
+            # Local price store (only bars newer than the stored history are downloaded)
+            df = get_history(ticker, start_date)
             
             if df.empty:
                 raise ValueError("No data found for this ticker")
@@ -51,35 +57,11 @@ class handler(BaseHTTPRequestHandler):
             change_percent = float((change / prev_close) * 100) if prev_close != 0 else 0
 
             # Resample if needed (Daily is default)
-            resampled_df = df
-            if interval == 'w':
-                # Weekly resampling for OHLC
-                resampled_df = df.resample('W').agg({
-                    'Open': 'first',
-                    'High': 'max',
-                    'Low': 'min',
-                    'Close': 'last'
-                }).dropna()
-            elif interval == 'm':
-                # Monthly resampling for OHLC
-                resampled_df = df.resample('M').agg({
-                    'Open': 'first',
-                    'High': 'max',
-                    'Low': 'min',
-                    'Close': 'last'
-                }).dropna()
+            resampled_df = resample_ohlcv(df, interval)
             
             # Prepare OHLC data for chartjs-chart-financial
             # Format: { x: timestamp, o: open, h: high, l: low, c: close }
-            ohlc_data = []
-            for index, row in resampled_df.iterrows():
-                ohlc_data.append({
-                    "x": index.strftime('%Y-%m-%d'),
-                    "o": float(row['Open']),
-                    "h": float(row['High']),
-                    "l": float(row['Low']),
-                    "c": float(row['Close'])
-                })
+            dates = encode_dates(resampled_df.index)
 
             chart_data = {
                 "ticker": ticker,
@@ -88,24 +70,12 @@ class handler(BaseHTTPRequestHandler):
                 "current_price": current_price,
                 "change": change,
                 "change_percent": round(change_percent, 2),
-                "labels": resampled_df.index.strftime('%Y-%m-%d').tolist(),
-                "prices": resampled_df['Close'].tolist(),
-                "ohlc": ohlc_data
-            }
-            
-            chart_data = {
-                "ticker": ticker,
-                "range": date_range,
-                "interval": interval,
-                "current_price": current_price,
-                "change": change,
-                "change_percent": round(change_percent, 2),
-                "labels": resampled_df.index.strftime('%Y-%m-%d').tolist(),
+                "labels": dates,
                 "prices": resampled_df['Close'].tolist(),
-                "ohlc": ohlc_data
+                "ohlc": encode_ohlc(resampled_df, dates)
             }
             
-            self.wfile.write(json.dumps(chart_data).encode('utf-8'))
+            self.wfile.write(dumps(chart_data))
             
         except Exception as e:
             # If headers are not sent yet, send 500. 
@@ -113,5 +83,5 @@ class handler(BaseHTTPRequestHandler):
             # However, standard http.server doesn't support changing status code after headers.
             # Ideally with Vercel functions this handler logic is slightly adapted, 
             # but for standard BaseHTTPRequestHandler we just write the error.
-            self.wfile.write(json.dumps({"error": str(e)}).encode('utf-8'))
+            self.wfile.write(dumps({"error": str(e)}))
         return
@@ -0,0 +1,390 @@
+# Indicators Module
+# Vectorized technical indicators (SMA/EMA/RSI/MACD/Bollinger/ATR), persisted per ticker with incremental updates
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from api.price_store import DATA_DIR
+
+INDICATOR_DIR = os.path.join(DATA_DIR, 'indicators')
+
+# 요청이 없을 때의 기본 지표 (기존 응답의 ma10/ma20/ma50)
+DEFAULT_INDICATORS = ['ma10', 'ma20', 'ma50']
+MAX_INDICATORS = 10  # 요청당 최대 지표 수
+MAX_STORED_INDICATORS = 20  # 종목별로 저장해두는 최대 지표 수
+MAX_PERIOD = 400
+# 메모리에 유지하는 종목별 지표 배열 수 (LRU, 넘으면 오래 안 쓴 종목부터 제거하고 필요할 때 파일에서 다시 읽음)
+MEMO_MAX_TICKERS = int(os.environ.get('INDICATOR_MEMO_MAX_TICKERS', '64'))
+
+# 저장소가 변경 여부를 비교하는 입력 열
+INPUT_COLUMNS = {'close': 'Close', 'high': 'High', 'low': 'Low'}
+
+
+def _ewm(values: np.ndarray, alpha: float, seed: float = None) -> np.ndarray:
+    """
+    지수 가중 평균 (y_t = (1 - alpha) * y_{t-1} + alpha * x_t).
+    seed가 없으면 전체를 pandas로 계산하고, 있으면 values[0] 위치의 값을 seed로 두고
+    이후 봉만 이어서 계산합니다 (증분 갱신용, pandas와 같은 연산 순서).
+    """
+    if seed is None:
+        return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+    old_wt, new_wt = 1.0 - alpha, alpha
+    result = np.empty(len(values))
+    result[0] = weighted = seed
+    for i in range(1, len(values)):
+        if weighted != values[i]:
+            weighted = (old_wt * weighted + new_wt * values[i]) / (old_wt + new_wt)
+        result[i] = weighted
+    return result
+
+
+def _mask_head(values: np.ndarray, offset: int, count: int) -> np.ndarray:
+    """전체 기준 앞쪽 count개 봉(데이터 부족 구간)을 NaN으로 (복사본 반환)"""
+    values = np.array(values, dtype='f8')
+    head = max(0, min(len(values), count - offset))
+    if head:
+        values[:head] = np.nan
+    return values
+
+
+# ============================================
+# 지표 정의
+# compute(df, seed, offset)는 df(가격 구간)와 같은 길이의 배열들을 반환합니다.
+# - 이동창 지표: df 앞부분에 lookback개의 과거 봉이 포함되어 들어옵니다.
+# - 재귀 지표: seed가 주어지면 df의 첫 봉은 이미 계산된 봉이며 seed가 그 봉의 상태입니다.
+# offset은 df 첫 봉의 전체 기준 위치입니다.
+# ============================================
+
+class Indicator:
+    recursive = False
+
+    def __init__(self, name: str, period: int):
+        self.name = name
+        self.period = period
+
+    @property
+    def outputs(self) -> list:
+        return [self.name]
+
+    @property
+    def state(self) -> list:
+        """증분 갱신을 위해 함께 저장하는 내부 열"""
+        return []
+
+    @property
+    def lookback(self) -> int:
+        """증분 갱신 시 새 봉 앞에 필요한 과거 봉 수"""
+        return 1 if self.recursive else self.period - 1
+
+    def compute(self, df: pd.DataFrame, seed: dict = None, offset: int = 0) -> dict:
+        raise NotImplementedError
+
+
+class SMA(Indicator):
+    def compute(self, df, seed=None, offset=0):
+        values = df['Close'].rolling(window=self.period).mean().to_numpy()
+        return {self.name: _mask_head(values, offset, self.period - 1)}
+
+
+class EMA(Indicator):
+    recursive = True
+
+    def compute(self, df, seed=None, offset=0):
+        values = _ewm(df['Close'].to_numpy(dtype='f8'), 2.0 / (self.period + 1),
+                      None if seed is None else seed[self.name])
+        return {self.name: _mask_head(values, offset, self.period - 1)}
+
+
+class RSI(Indicator):
+    """Wilder 방식 (alpha = 1/period) 상대강도지수"""
+    recursive = True
+
+    @property
+    def state(self):
+        return [f'_{self.name}_gain', f'_{self.name}_loss']
+
+    def compute(self, df, seed=None, offset=0):
+        gain_key, loss_key = self.state
+        delta = np.diff(df['Close'].to_numpy(dtype='f8'), prepend=np.nan)
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+        gains[np.isnan(delta)] = np.nan
+        losses[np.isnan(delta)] = np.nan
+
+        alpha = 1.0 / self.period
+        avg_gain = _ewm(gains, alpha, None if seed is None else seed[gain_key])
+        avg_loss = _ewm(losses, alpha, None if seed is None else seed[loss_key])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+        rsi[np.isnan(avg_gain) | np.isnan(avg_loss)] = np.nan
+        return {
+            self.name: _mask_head(rsi, offset, self.period),
+            gain_key: avg_gain,
+            loss_key: avg_loss
+        }
+
+
+class MACD(Indicator):
+    """MACD(12, 26, 9): macd, macd_signal, macd_hist"""
+    recursive = True
+    FAST, SLOW, SIGNAL = 12, 26, 9
+
+    @property
+    def outputs(self):
+        return ['macd', 'macd_signal', 'macd_hist']
+
+    @property
+    def state(self):
+        return ['_macd_fast', '_macd_slow']
+
+    def compute(self, df, seed=None, offset=0):
+        closes = df['Close'].to_numpy(dtype='f8')
+        fast = _ewm(closes, 2.0 / (self.FAST + 1), None if seed is None else seed['_macd_fast'])
+        slow = _ewm(closes, 2.0 / (self.SLOW + 1), None if seed is None else seed['_macd_slow'])
+        macd = fast - slow
+        signal = _ewm(macd, 2.0 / (self.SIGNAL + 1), None if seed is None else seed['macd_signal'])
+        hist = macd - signal
+
+        signal_head = self.SLOW + self.SIGNAL - 2
+        return {
+            'macd': _mask_head(macd, offset, self.SLOW - 1),
+            'macd_signal': signal,
+            'macd_hist': _mask_head(hist, offset, signal_head),
+            '_macd_fast': fast,
+            '_macd_slow': slow
+        }
+
+    def finalize(self, columns: dict):
+        """signal은 재귀 상태로도 쓰이므로 저장 후 응답에서만 앞부분을 가림"""
+        columns['macd_signal'] = _mask_head(columns['macd_signal'], 0, self.SLOW + self.SIGNAL - 2)
+        return columns
+
+
+class Bollinger(Indicator):
+    """볼린저 밴드 (period, 2 표준편차): bbN_upper, bbN_mid, bbN_lower"""
+    WIDTH = 2.0
+
+    @property
+    def outputs(self):
+        return [f'{self.name}_upper', f'{self.name}_mid', f'{self.name}_lower']
+
+    def compute(self, df, seed=None, offset=0):
+        rolling = df['Close'].rolling(window=self.period)
+        mid = rolling.mean().to_numpy()
+        std = rolling.std(ddof=0).to_numpy()
+        upper, mid_key, lower = self.outputs
+        return {
+            upper: _mask_head(mid + self.WIDTH * std, offset, self.period - 1),
+            mid_key: _mask_head(mid, offset, self.period - 1),
+            lower: _mask_head(mid - self.WIDTH * std, offset, self.period - 1)
+        }
+
+
+class ATR(Indicator):
+    """Wilder 방식 평균 진폭 (True Range의 지수 평균)"""
+    recursive = True
+
+    def compute(self, df, seed=None, offset=0):
+        high = df['High'].to_numpy(dtype='f8')
+        low = df['Low'].to_numpy(dtype='f8')
+        prev_close = np.roll(df['Close'].to_numpy(dtype='f8'), 1)
+        true_range = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+        true_range[0] = high[0] - low[0]
+
+        values = _ewm(true_range, 1.0 / self.period, None if seed is None else seed[self.name])
+        return {self.name: _mask_head(values, offset, self.period - 1)}
+
+
+INDICATOR_TYPES = {'ma': SMA, 'sma': SMA, 'ema': EMA, 'rsi': RSI, 'bb': Bollinger, 'atr': ATR}
+INDICATOR_PATTERN = re.compile(r'^(ma|sma|ema|rsi|bb|atr)(\d+)$')
+
+
+def parse_indicators(spec: str = None) -> list:
+    """
+    'ma20,rsi14,macd' 형식의 지표 목록을 Indicator 리스트로 변환합니다 (없으면 기본 지표).
+
+    Raises:
+        ValueError: 알 수 없는 지표명/기간
+    """
+    names = [s.strip().lower() for s in (spec or '').split(',') if s.strip()] or DEFAULT_INDICATORS
+    names = list(dict.fromkeys(names))
+    if len(names) > MAX_INDICATORS:
+        raise ValueError(f"Too many indicators (max {MAX_INDICATORS})")
+
+    return [make_indicator(name) for name in names]
+
+
+def make_indicator(name: str) -> Indicator:
+    """지표명(예: 'rsi14')으로 Indicator 생성"""
+    if name == 'macd':
+        return MACD('macd', MACD.SLOW)
+    match = INDICATOR_PATTERN.match(name)
+    if not match or not 2 <= int(match.group(2)) <= MAX_PERIOD:
+        raise ValueError(f"Unknown indicator: {name}")
+    return INDICATOR_TYPES[match.group(1)](name, int(match.group(2)))
+
+
+def compute_indicators(df: pd.DataFrame, indicators: list) -> pd.DataFrame:
+    """저장 없이 전체 구간 계산 (주봉/월봉 등)"""
+    columns = {}
+    for indicator in indicators:
+        result = indicator.compute(df)
+        if hasattr(indicator, 'finalize'):
+            result = indicator.finalize(result)
+        columns.update({name: result[name] for name in indicator.outputs})
+    return pd.DataFrame(columns, index=df.index)
+
+
+class IndicatorStore:
+    """
+    종목별 일봉 지표를 <ticker>.npz로 저장합니다.
+
+    저장 당시의 입력(날짜/종가/고가/저가)과 현재 가격 데이터를 비교해 같은 앞부분은 그대로 쓰고,
+    달라졌거나 새로 추가된 봉만 다시 계산합니다 (이동창 지표는 lookback만큼의 과거 봉,
+    재귀 지표는 직전 봉의 저장된 상태에서 이어서 계산). 저장된 지표는 요청되지 않아도 함께 갱신됩니다.
+    """
+
+    def __init__(self, root: str = INDICATOR_DIR, memo_size: int = MEMO_MAX_TICKERS):
+        self.root = root
+        self.memo_size = memo_size
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        # ticker -> (파일 수정 시각, arrays): 파일이 바뀌지 않았으면 다시 읽지 않음 (최근 memo_size개 종목만)
+        self._loaded = OrderedDict()
+        self._loaded_lock = threading.Lock()
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.root, quote(ticker.upper(), safe='') + '.npz')
+
+    def _lock_for(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(ticker.upper(), threading.Lock())
+
+    def _recall(self, ticker: str, mtime: int):
+        """메모리에 있는 배열 (파일이 그 뒤로 바뀌었거나 없으면 None)"""
+        with self._loaded_lock:
+            loaded = self._loaded.get(ticker)
+            if loaded is None or loaded[0] != mtime:
+                return None
+            self._loaded.move_to_end(ticker)
+            return loaded[1]
+
+    def _remember(self, ticker: str, mtime: int, arrays: dict):
+        with self._loaded_lock:
+            self._loaded[ticker] = (mtime, arrays)
+            self._loaded.move_to_end(ticker)
+            while len(self._loaded) > self.memo_size:
+                self._loaded.popitem(last=False)
+
+    def _read(self, ticker: str):
+        path = self._path(ticker)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        arrays = self._recall(ticker.upper(), mtime)
+        if arrays is not None:
+            return arrays
+
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        except Exception as e:
+            print(f"Indicator store read error for {ticker}: {e}")
+            return None
+        self._remember(ticker.upper(), mtime, arrays)
+        return arrays
+
+    def _write(self, ticker: str, arrays: dict):
+        """임시 파일에 쓴 뒤 rename"""
+        path = self._path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+            self._remember(ticker.upper(), os.stat(path).st_mtime_ns, arrays)
+        except OSError as e:
+            print(f"Indicator store write error for {ticker}: {e}")
+
+    @staticmethod
+    def _valid_prefix(stored: dict, inputs: dict) -> int:
+        """저장된 입력과 현재 입력이 같은 앞부분 봉 수"""
+        count = min(len(stored['date']), len(inputs['date']))
+        same = stored['date'][:count] == inputs['date'][:count]
+        for key in INPUT_COLUMNS:
+            a, b = stored[key][:count], inputs[key][:count]
+            same &= (a == b) | (np.isnan(a) & np.isnan(b))
+        changed = np.flatnonzero(~same)
+        return int(changed[0]) if len(changed) else count
+
+    def get(self, ticker: str, df: pd.DataFrame, indicators: list) -> pd.DataFrame:
+        """
+        df(저장된 전체 일봉) 기준 지표를 반환합니다 (필요한 봉만 재계산 후 저장).
+
+        Returns:
+            DataFrame (index=df.index, columns=요청 지표의 출력 열)
+        """
+        inputs = {'date': df.index.values.astype('datetime64[D]')}
+        for key, column in INPUT_COLUMNS.items():
+            inputs[key] = df[column].to_numpy(dtype='f8')
+        total = len(df)
+
+        with self._lock_for(ticker):
+            stored = self._read(ticker)
+            valid = self._valid_prefix(stored, inputs) if stored is not None else 0
+
+            # 요청 지표 + 이미 저장된 지표 (저장 파일 전체를 같은 가격 기준으로 유지)
+            wanted = {indicator.name: indicator for indicator in indicators}
+            if stored is not None:
+                for name in stored['names'].tolist():
+                    if len(wanted) >= MAX_STORED_INDICATORS:
+                        break
+                    wanted.setdefault(name, make_indicator(name))
+
+            arrays = dict(inputs)
+            changed = stored is None or valid < total or len(stored['date']) != total
+            for indicator in wanted.values():
+                keys = indicator.outputs + indicator.state
+                has_stored = stored is not None and all(key in stored for key in keys)
+                if not has_stored:
+                    changed = True
+
+                if has_stored and valid == total:
+                    arrays.update({key: stored[key][:total] for key in keys})
+                elif has_stored and valid > max(indicator.lookback, indicator.period):
+                    start = valid - indicator.lookback
+                    seed = {key: stored[key][valid - 1] for key in keys} if indicator.recursive else None
+                    part = indicator.compute(df.iloc[start:], seed, offset=start)
+                    arrays.update({
+                        key: np.concatenate([stored[key][:valid], part[key][valid - start:]])
+                        for key in keys
+                    })
+                else:
+                    arrays.update(indicator.compute(df))
+
+            if changed:
+                arrays['names'] = np.array(list(wanted))
+                self._write(ticker, arrays)
+
+        columns = {}
+        for indicator in indicators:
+            result = {key: arrays[key] for key in indicator.outputs + indicator.state}
+            if hasattr(indicator, 'finalize'):
+                result = indicator.finalize(result)
+            columns.update({name: result[name] for name in indicator.outputs})
+        return pd.DataFrame(columns, index=df.index)
+
+
+# 공용 인스턴스
+indicator_store = IndicatorStore()
@@ -0,0 +1,102 @@
+# Market Data Module
+# Batched multi-ticker price downloads via yfinance
+
+import pandas as pd
+import yfinance as yf
+
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def download_history(symbols: list, period: str = '5d', interval: str = '1d') -> dict:
+    """
+    여러 종목의 시세를 한 번의 요청으로 다운로드합니다.
+
+    Args:
+        symbols: 티커 리스트 (예: ['AAPL', 'MSFT'])
+        period: 조회 기간 (yfinance period 형식, 예: '5d', '1mo', '1y')
+        interval: 봉 간격 (예: '1d')
+
+    Returns:
+        dict of field ('Open', 'High', 'Low', 'Close', 'Volume') -> DataFrame (날짜 x 티커)
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {field: pd.DataFrame() for field in PRICE_FIELDS}
+
+    df = yf.download(
+        symbols,
+        period=period,
+        interval=interval,
+        group_by='column',
+        auto_adjust=True,
+        progress=False,
+        threads=True
+    )
+
+    frames = {}
+    for field in PRICE_FIELDS:
+        if df.empty or field not in df.columns.get_level_values(0):
+            frames[field] = pd.DataFrame(columns=symbols, dtype=float)
+            continue
+
+        frame = df[field]
+        if isinstance(frame, pd.Series):
+            frame = frame.to_frame(name=symbols[0])
+        frames[field] = frame.reindex(columns=symbols)
+
+    return frames
+
+
+def last_valid(frame: pd.DataFrame, n: int = 1) -> pd.Series:
+    """
+    각 열(티커)에서 끝에서 n번째 유효 값을 구합니다 (없으면 NaN).
+    티커마다 거래일/결측이 달라도 열 단위로 한 번에 계산됩니다.
+    """
+    valid = frame.notna()
+    rank = valid.iloc[::-1].cumsum().iloc[::-1]
+    return frame.where(valid & (rank == n)).max()
+
+
+def summarize_quotes(closes: pd.DataFrame) -> dict:
+    """
+    종가 매트릭스에서 종목별 현재가와 전일 대비 변동을 계산합니다.
+
+    Returns:
+        dict of ticker -> {'price', 'prevClose', 'change', 'changePct'}
+    """
+    prices = last_valid(closes, 1)
+    prev_closes = last_valid(closes, 2).fillna(prices)
+    changes = prices - prev_closes
+    change_pcts = (changes / prev_closes * 100).where(prev_closes != 0, 0.0)
+
+    quotes = {}
+    for symbol in prices.index[prices.notna()]:
+        quotes[symbol] = {
+            'price': prices[symbol],
+            'prevClose': prev_closes[symbol],
+            'change': changes[symbol],
+            'changePct': round(change_pcts[symbol], 2)
+        }
+
+    return quotes
+
+
+def period_returns(closes: pd.DataFrame, prices: pd.Series, lookbacks: dict) -> dict:
+    """
+    종가 매트릭스에서 기간별 수익률(%)을 열 단위로 한 번에 계산합니다.
+
+    Args:
+        closes: 날짜 x 티커 종가
+        prices: 티커별 현재가
+        lookbacks: 이름 -> 몇 거래일 전 (None이면 조회 구간의 첫 종가)
+
+    Returns:
+        이름 -> 티커별 수익률 Series (기준가가 0이면 0)
+    """
+    first = closes.bfill().iloc[0] if len(closes) else pd.Series(dtype=float)
+    returns = {}
+    for name, days in lookbacks.items():
+        # 데이터가 짧은 종목은 첫 종가를 기준으로 사용
+        base = first if days is None else last_valid(closes, days + 1).fillna(first)
+        returns[name] = ((prices - base) / base * 100).where(base != 0, 0.0)
+    return returns
@@ -0,0 +1,16 @@
+# PDF Text Module
+# Page-level PDF text extraction run inside transcript extraction worker processes
+# (kept free of app imports so spawned workers start quickly)
+
+import pdfplumber
+
+
+def count_pages(pdf_path: str) -> int:
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_page_range(pdf_path: str, start: int, stop: int) -> list:
+    """start~stop-1 페이지의 텍스트 (프로세스 풀 작업 단위: 각 프로세스가 PDF를 직접 엽니다)"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in range(start, stop)]
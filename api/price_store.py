@@ -0,0 +1,232 @@
+# Price Store Module
+# Persistent on-disk daily OHLCV store with incremental (delta) fetch
+
+import json
+import os
+import threading
+import time
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import FinanceDataReader as fdr
+
+# 데이터 디렉토리 (gunicorn 재시작 후에도 유지)
+DATA_DIR = os.environ.get(
+    'FINDALPHA_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+)
+PRICE_DIR = os.path.join(DATA_DIR, 'prices')
+
+# 마지막 조회 후 이 시간(초)이 지나야 신규 봉을 다시 조회
+REFRESH_INTERVAL = int(os.environ.get('PRICE_REFRESH_INTERVAL', '300'))
+
+# 겹치는 완성 봉의 종가가 이 비율 이상 다르면 (액면분할/배당 조정) 전체 재조회
+ADJUSTMENT_TOLERANCE = 0.005
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+RECORD_DTYPE = np.dtype([('date', 'datetime64[D]')] + [(col, 'f8') for col in PRICE_COLUMNS])
+
+
+def _month_end_rule() -> str:
+    """pandas 2.2+는 월말 리샘플링에 'ME'를 사용 ('M'은 제거됨)"""
+    try:
+        pd.tseries.frequencies.to_offset('ME')
+        return 'ME'
+    except ValueError:
+        return 'M'
+
+
+MONTH_END_RULE = _month_end_rule()
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """일봉을 주봉('w')/월봉('m')으로 변환 (그 외는 그대로 반환)"""
+    if interval == 'w':
+        rule = 'W'
+    elif interval == 'm':
+        rule = MONTH_END_RULE
+    else:
+        return df
+
+    agg = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+    return df.resample(rule).agg({col: agg[col] for col in df.columns if col in agg}).dropna()
+
+
+class PriceStore:
+    """
+    종목별 일봉 OHLCV를 NumPy 파일(<ticker>.npy, 메모리 맵 로드)로 저장합니다.
+
+    - 저장된 구간보다 과거가 요청되면 부족한 앞부분만 조회해 붙입니다.
+    - 마지막 저장일 이후(마지막 봉 포함)의 신규 봉만 조회해 갱신합니다.
+    - 조회 기간/봉 간격은 로컬에서 슬라이싱/리샘플링합니다.
+    """
+
+    def __init__(self, root: str = PRICE_DIR, refresh_interval: int = REFRESH_INTERVAL, fetcher=None):
+        self.root = root
+        self.refresh_interval = refresh_interval
+        self.fetcher = fetcher or fdr.DataReader
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # ---------- 파일 입출력 ----------
+
+    def _paths(self, ticker: str) -> tuple:
+        name = quote(ticker.upper(), safe='')
+        return os.path.join(self.root, f"{name}.npy"), os.path.join(self.root, f"{name}.json")
+
+    def _lock_for(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(ticker.upper(), threading.Lock())
+
+    def _read(self, ticker: str) -> tuple:
+        data_path, meta_path = self._paths(ticker)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None, None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            records = np.load(data_path, mmap_mode='r')
+            # 데이터와 메타 파일 교체 사이에 중단되면 둘이 어긋날 수 있음 -> 저장된 것이 없는 것으로 보고 다시 조회
+            if meta.get('rows', len(records)) != len(records):
+                print(f"Price store data/meta mismatch for {ticker}, refetching")
+                return None, None
+            return records, meta
+        except Exception as e:
+            print(f"Price store read error for {ticker}: {e}")
+            return None, None
+
+    def _write(self, ticker: str, records: np.ndarray, meta: dict):
+        """
+        임시 파일에 쓴 뒤 rename하여 다른 프로세스가 깨진 파일을 읽지 않도록 함.
+        메타는 데이터 다음에 쓰고 행 수를 함께 기록해, 읽을 때 둘이 짝이 맞는지 확인합니다.
+        """
+        data_path, meta_path = self._paths(ticker)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+
+            with open(data_path + suffix, 'wb') as f:
+                np.save(f, records)
+            os.replace(data_path + suffix, data_path)
+
+            with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+                json.dump({**meta, 'rows': len(records)}, f)
+            os.replace(meta_path + suffix, meta_path)
+        except OSError as e:
+            # 읽기 전용 환경(예: 서버리스)에서도 조회 결과는 그대로 반환
+            print(f"Price store write error for {ticker}: {e}")
+
+    # ---------- 변환 ----------
+
+    @staticmethod
+    def _to_records(df: pd.DataFrame) -> np.ndarray:
+        records = np.empty(len(df), dtype=RECORD_DTYPE)
+        records['date'] = df.index.values.astype('datetime64[D]')
+        for col in PRICE_COLUMNS:
+            records[col] = df[col].to_numpy(dtype='f8') if col in df.columns else np.nan
+        return records
+
+    @staticmethod
+    def _to_frame(records: np.ndarray) -> pd.DataFrame:
+        index = pd.DatetimeIndex(records['date'].astype('datetime64[ns]'), name='Date')
+        return pd.DataFrame({col: np.asarray(records[col]) for col in PRICE_COLUMNS}, index=index)
+
+    def _fetch(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp = None) -> np.ndarray:
+        start_str = start.strftime('%Y-%m-%d')
+        if end is not None:
+            df = self.fetcher(ticker, start_str, end.strftime('%Y-%m-%d'))
+        else:
+            df = self.fetcher(ticker, start_str)
+        if df is None or df.empty:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return self._to_records(df.sort_index())
+
+    # ---------- 조회 ----------
+
+    def get_history(self, ticker: str, start_date: str) -> pd.DataFrame:
+        """
+        start_date 이후의 일봉 OHLCV를 반환합니다 (필요한 부분만 원격 조회).
+
+        Returns:
+            DataFrame (Open, High, Low, Close, Volume), 데이터가 없으면 빈 DataFrame
+        """
+        start = pd.Timestamp(start_date).normalize()
+
+        with self._lock_for(ticker):
+            records, meta = self._read(ticker)
+            now = time.time()
+
+            if records is None:
+                # 최초 조회: 요청 구간 전체
+                records = self._fetch(ticker, start)
+                if len(records) == 0:
+                    return self._to_frame(records)
+                self._write(ticker, records, {'coverage_start': start.strftime('%Y-%m-%d'), 'fetched_at': now})
+            else:
+                coverage_start = pd.Timestamp(meta['coverage_start'])
+                changed = False
+
+                # 1. 저장 구간보다 과거 요청 -> 앞부분만 보충
+                if start < coverage_start:
+                    older = self._fetch(ticker, start, coverage_start - pd.Timedelta(days=1))
+                    older = older[older['date'] < records['date'][0]] if len(records) else older
+                    records = np.concatenate([older, records])
+                    meta['coverage_start'] = start.strftime('%Y-%m-%d')
+                    changed = True
+
+                # 2. 신규 봉 조회 (마지막 봉은 장중 미완성일 수 있어 다시 받아 덮어씀)
+                if len(records) and now - meta.get('fetched_at', 0) > self.refresh_interval:
+                    records, full_refetch = self._apply_delta(ticker, records)
+                    if full_refetch:
+                        print(f"Price adjustment detected for {ticker}, refetching full history")
+                        refetched = self._fetch(ticker, pd.Timestamp(meta['coverage_start']))
+                        if len(refetched):
+                            records = refetched
+                    meta['fetched_at'] = now
+                    changed = True
+
+                if changed:
+                    self._write(ticker, records, meta)
+
+        frame = self._to_frame(records)
+        return frame[frame.index >= start]
+
+    def load(self, ticker: str) -> pd.DataFrame:
+        """저장된 전체 일봉 (원격 조회 없음, 저장된 데이터가 없으면 빈 DataFrame)"""
+        records, _ = self._read(ticker)
+        if records is None:
+            records = np.empty(0, dtype=RECORD_DTYPE)
+        return self._to_frame(records)
+
+    def _apply_delta(self, ticker: str, records: np.ndarray) -> tuple:
+        """
+        마지막 2개 봉부터 다시 조회해 병합합니다. 겹치는 완성 봉(끝에서 두 번째)의
+        종가가 달라졌으면 과거 가격이 조정된 것이므로 전체 재조회가 필요함을 알립니다.
+
+        Returns:
+            (records, full_refetch)
+        """
+        overlap_start = records['date'][-2] if len(records) > 1 else records['date'][-1]
+        delta = self._fetch(ticker, pd.Timestamp(overlap_start))
+        if len(delta) == 0:
+            return records, False
+
+        if len(records) > 1:
+            stored = records[records['date'] == overlap_start]['Close']
+            fresh = delta[delta['date'] == overlap_start]['Close']
+            if len(stored) and len(fresh) and stored[0] != 0:
+                if abs(fresh[0] / stored[0] - 1) > ADJUSTMENT_TOLERANCE:
+                    return records, True
+
+        kept = records[records['date'] < delta['date'][0]]
+        return np.concatenate([kept, delta]), False
+
+
+# 공용 인스턴스
+price_store = PriceStore()
+
+
+def get_history(ticker: str, start_date: str) -> pd.DataFrame:
+    """공용 가격 저장소에서 일봉 OHLCV 조회"""
+    return price_store.get_history(ticker, start_date)
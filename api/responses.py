@@ -0,0 +1,134 @@
+# Responses Module
+# Fast JSON encoding (numpy/pandas/NaN-aware), gzip/brotli negotiation and server-sent event streams
+
+import gzip
+import json
+import math
+
+import numpy as np
+import pandas as pd
+from flask import Response, request, stream_with_context
+
+# orjson/brotli는 선택 설치 (없으면 표준 json / gzip만 사용)
+try:
+    import orjson
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1024  # 이보다 작은 응답은 압축하지 않음
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _default(obj):
+    """orjson/json이 직접 처리하지 못하는 값 변환"""
+    if isinstance(obj, (pd.Timestamp, pd.Timedelta)) or hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.to_numpy()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _sanitize(obj):
+    """표준 json용: numpy/pandas 값을 Python 값으로, NaN/Infinity를 None으로 변환"""
+    if isinstance(obj, dict):
+        return {str(k) if not isinstance(k, str) else k: _sanitize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(v) for v in obj]
+    if isinstance(obj, (pd.Series, pd.Index, np.ndarray)):
+        return _sanitize(np.asarray(obj).tolist())
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
+        return None
+    return obj
+
+
+def dumps(data) -> bytes:
+    """
+    응답 데이터를 한 번에 JSON(UTF-8 bytes)으로 직렬화합니다.
+    numpy 배열/스칼라, pandas Series/Timestamp를 그대로 받을 수 있고 NaN은 null이 됩니다.
+    키는 기존 jsonify 응답과 같도록 정렬합니다.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(_sanitize(data), default=_default, ensure_ascii=False,
+                      separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def negotiate_encoding(accept_encoding: str):
+    """Accept-Encoding 헤더에서 사용할 압축 방식 선택 ('br' > 'gzip', 없으면 None)"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.lower()] = q
+
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def compress(body: bytes, accept_encoding: str) -> tuple:
+    """
+    클라이언트가 허용한 방식으로 본문을 압축합니다.
+
+    Returns:
+        (body, content_encoding) - 압축하지 않았으면 content_encoding은 None
+    """
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY), 'br'
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), 'gzip'
+    return body, None
+
+
+def json_response(data, status: int = 200) -> Response:
+    """jsonify 대체: 빠른 JSON 직렬화 + 압축 협상"""
+    body, encoding = compress(dumps(data), request.headers.get('Accept-Encoding', ''))
+    response = Response(body, status=status, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def sse_event(data, event: str = None) -> str:
+    """server-sent event 한 건 (data는 JSON 한 줄)"""
+    lines = f"event: {event}\n" if event else ""
+    return lines + "data: " + dumps(data).decode('utf-8') + "\n\n"
+
+
+def sse_response(events) -> Response:
+    """
+    이벤트 문자열을 만들어지는 대로 바로 보내는 text/event-stream 응답.
+    (압축/프록시 버퍼링을 하지 않아야 이벤트가 즉시 전달됨)
+    """
+    response = Response(stream_with_context(events), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
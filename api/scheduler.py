@@ -0,0 +1,146 @@
+# Scheduler Module
+# Market-calendar-aware cache warmup/refresh scheduler (one leader process per host)
+
+import os
+import threading
+import time
+from datetime import date, datetime, time as dtime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, Holiday, GoodFriday, USLaborDay, USMartinLutherKingJr,
+    USMemorialDay, USPresidentsDay, USThanksgivingDay, nearest_workday, sunday_to_monday
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 락 없이 프로세스마다 실행
+    fcntl = None
+
+from api.price_store import DATA_DIR
+
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+CHECK_INTERVAL = 30  # 스케줄 확인 주기 (초)
+LEADER_RETRY_INTERVAL = 60  # 리더가 아닌 프로세스의 락 재시도 주기 (초)
+LOCK_PATH = os.path.join(DATA_DIR, 'scheduler.lock')
+
+
+# ============================================
+# 미국 증시(NYSE) 캘린더 (조기 폐장일은 정규장으로 취급)
+# ============================================
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    rules = [
+        Holiday('NewYearsDay', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('IndependenceDay', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday)
+    ]
+
+
+@lru_cache(maxsize=8)
+def _holidays(year: int) -> frozenset:
+    days = NYSEHolidayCalendar().holidays(start=f'{year}-01-01', end=f'{year}-12-31')
+    return frozenset(d.date() for d in days)
+
+
+def is_trading_day(d: date) -> bool:
+    """주말/휴장일이 아니면 True"""
+    return d.weekday() < 5 and d not in _holidays(d.year)
+
+
+def is_market_open(now: datetime = None) -> bool:
+    """미국 정규장(거래일 09:30~16:00 ET) 여부"""
+    now = now.astimezone(MARKET_TZ) if now else datetime.now(MARKET_TZ)
+    return is_trading_day(now.date()) and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+# ============================================
+# 스케줄러
+# ============================================
+
+class Job:
+    def __init__(self, name: str, fn, open_interval: float, closed_interval: float):
+        self.name = name
+        self.fn = fn  # fn(ttl): 결과를 계산해 ttl초 동안 유효하게 공유 캐시에 저장
+        self.open_interval = open_interval
+        self.closed_interval = closed_interval
+        self.last_run = 0.0
+
+
+class Scheduler:
+    """
+    등록된 작업을 장중/장외 주기에 맞춰 실행합니다.
+
+    - 파일 락(flock)을 잡은 프로세스 하나만 작업을 실행합니다 (gunicorn 워커가 여러 개여도 호스트당 1회).
+      락을 잡지 못한 프로세스는 주기적으로 재시도해 리더 워커가 재시작되면 이어받습니다.
+    - 시작 직후와 장 시작/마감 전환 시점에는 모든 작업을 즉시 실행합니다.
+    """
+
+    def __init__(self, check_interval: float = CHECK_INTERVAL, lock_path: str = LOCK_PATH):
+        self.check_interval = check_interval
+        self.lock_path = lock_path
+        self.jobs = []
+        self._lock_file = None
+        self._thread = None
+        self._market_open = None
+
+    def add_job(self, name: str, fn, open_interval: float, closed_interval: float):
+        self.jobs.append(Job(name, fn, open_interval, closed_interval))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='cache-scheduler', daemon=True)
+            self._thread.start()
+        return self
+
+    def _acquire_leadership(self) -> bool:
+        if fcntl is None:
+            return True
+        try:
+            os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+            lock_file = open(self.lock_path, 'a')
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        self._lock_file = lock_file  # 프로세스가 살아있는 동안 락 유지
+        return True
+
+    def _run(self):
+        while not self._acquire_leadership():
+            time.sleep(LEADER_RETRY_INTERVAL)
+
+        print(f"Cache scheduler started (pid {os.getpid()})")
+        while True:
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f"Scheduler error: {e}")
+            time.sleep(self.check_interval)
+
+    def run_pending(self, now: datetime = None):
+        """주기가 된 작업 실행 (장 시작/마감 전환 시에는 전체 실행)"""
+        market_open = is_market_open(now)
+        session_changed = market_open != self._market_open
+        self._market_open = market_open
+
+        for job in self.jobs:
+            interval = job.open_interval if market_open else job.closed_interval
+            if session_changed or time.time() - job.last_run >= interval:
+                try:
+                    print(f"Scheduler running: {job.name}")
+                    # 다음 실행 전까지 유효하도록 확인 주기 2회분 여유를 둠
+                    job.fn(interval + 2 * self.check_interval)
+                except Exception as e:
+                    print(f"Scheduler job error ({job.name}): {e}")
+                job.last_run = time.time()
@@ -0,0 +1,77 @@
+# Screen Module
+# Declarative screen filters (e.g. "marketCap>1e11,changePct<-3") evaluated vectorized
+# over a ticker x field table
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# 비교 연산자 (긴 연산자를 먼저 매칭)
+OPERATORS = {
+    '>=': np.greater_equal,
+    '<=': np.less_equal,
+    '!=': np.not_equal,
+    '==': np.equal,
+    '=': np.equal,
+    '>': np.greater,
+    '<': np.less
+}
+FILTER_PATTERN = re.compile(
+    r'^\s*([A-Za-z][A-Za-z0-9_]*)\s*(>=|<=|!=|==|=|>|<)\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*$'
+)
+
+MAX_FILTERS = 20
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def parse_filters(spec: str, fields) -> list:
+    """
+    'field>value' 조건을 쉼표로 구분한 문자열을 파싱합니다.
+
+    Args:
+        spec: 예) 'marketCap>1e11,revenueGrowth>20,changePct<-3'
+        fields: 필터에 사용할 수 있는 숫자 필드 이름
+
+    Returns:
+        [(field, op, value), ...]
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 모르는 필드
+    """
+    filters = []
+    for part in (spec or '').split(','):
+        if not part.strip():
+            continue
+        match = FILTER_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"Invalid filter: {part.strip()} (expected e.g. marketCap>1e11)")
+        field, op, value = match.groups()
+        if field not in fields:
+            raise ValueError(f"Unknown screen field: {field}")
+        filters.append((field, op, float(value)))
+
+    if len(filters) > MAX_FILTERS:
+        raise ValueError(f"Too many filters (max {MAX_FILTERS})")
+    return filters
+
+
+def run_screen(table: pd.DataFrame, filters: list, sort: str = None, descending: bool = True,
+               limit: int = DEFAULT_LIMIT) -> tuple:
+    """
+    모든 조건을 만족하는 종목을 정렬해 반환합니다. 조건마다 열 전체를 한 번에 비교하며,
+    값이 없는(NaN) 종목은 그 필드의 조건을 만족하지 않는 것으로 봅니다.
+
+    Returns:
+        (상위 limit개 DataFrame, 조건을 만족한 전체 종목 수)
+    """
+    mask = np.ones(len(table), dtype=bool)
+    for field, op, value in filters:
+        column = table[field].to_numpy(dtype='f8')
+        mask &= ~np.isnan(column) & OPERATORS[op](column, value)
+
+    matched = table[mask]
+    if sort:
+        matched = matched.sort_values(sort, ascending=not descending, na_position='last', kind='stable')
+    return matched.head(limit), int(mask.sum())
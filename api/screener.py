@@ -0,0 +1,79 @@
+# Screener Module
+# Local screens (day movers, 52-week highs/lows) over the universe price matrix,
+# with Yahoo Finance predefined screeners as optional enrichment
+
+import pandas as pd
+import yfinance as yf
+
+from api.market_data import last_valid
+
+FIFTY_TWO_WEEKS = 252  # 52주 (거래일)
+
+
+def screen_movers(closes: pd.DataFrame, volumes: pd.DataFrame, count: int = 10) -> tuple:
+    """
+    전일 대비 등락률 상위/하위 종목을 고릅니다.
+
+    Returns:
+        (gainers, losers) - 티커 x ['price', 'change', 'changePct', 'volume'] DataFrame
+        (상승 종목은 등락률 내림차순, 하락 종목은 오름차순, 각 최대 count개)
+    """
+    prices = last_valid(closes, 1)
+    prev_closes = last_valid(closes, 2)
+    changes = prices - prev_closes
+
+    table = pd.DataFrame({
+        'price': prices,
+        'change': changes,
+        'changePct': (changes / prev_closes * 100).where(prev_closes != 0),
+        'volume': last_valid(volumes).fillna(0)
+    }).dropna(subset=['changePct'])
+
+    gainers = table[table['changePct'] > 0].nlargest(count, 'changePct')
+    losers = table[table['changePct'] < 0].nsmallest(count, 'changePct')
+    return gainers, losers
+
+
+def screen_extremes(highs: pd.DataFrame, lows: pd.DataFrame, closes: pd.DataFrame,
+                    window: int = FIFTY_TWO_WEEKS) -> pd.DataFrame:
+    """
+    종목별 52주 고가/저가와 현재가의 거리, 오늘 신고가/신저가 여부를 계산합니다.
+    신고가는 오늘 고가가 어제까지의 window일 최고가 이상인 경우 (신저가는 반대).
+
+    Returns:
+        티커 x ['price', 'high52', 'low52', 'pctFromHigh', 'pctFromLow', 'newHigh', 'newLow'] DataFrame
+    """
+    rolling_high = highs.rolling(window, min_periods=1).max()
+    rolling_low = lows.rolling(window, min_periods=1).min()
+    prior_high = rolling_high.shift(1).iloc[-1]
+    prior_low = rolling_low.shift(1).iloc[-1]
+    high52 = rolling_high.iloc[-1]
+    low52 = rolling_low.iloc[-1]
+    prices = last_valid(closes)
+
+    return pd.DataFrame({
+        'price': prices,
+        'high52': high52,
+        'low52': low52,
+        'pctFromHigh': ((prices / high52 - 1) * 100).where(high52 > 0),
+        'pctFromLow': ((prices / low52 - 1) * 100).where(low52 > 0),
+        'newHigh': highs.iloc[-1] >= prior_high,
+        'newLow': lows.iloc[-1] <= prior_low
+    }).dropna(subset=['price'])
+
+
+def fetch_predefined_screen(name: str, count: int = 25) -> list:
+    """
+    Yahoo Finance 사전 정의 스크리너(예: 'day_gainers', 'day_losers') 결과 조회 (느리거나 실패할 수 있음).
+
+    Returns:
+        quote dict 리스트
+    """
+    if hasattr(yf, 'screen'):
+        response = yf.screen(name, count=count)
+    else:
+        # 구버전 yfinance
+        screener = yf.Screener()
+        screener.set_predefined_body(name)
+        response = screener.response
+    return (response or {}).get('quotes', [])[:count]
@@ -0,0 +1,114 @@
+# Serialization Module
+# Vectorized encoders that turn OHLCV DataFrames into chart JSON arrays (no DataFrame.iterrows)
+
+import base64
+
+import numpy as np
+import pandas as pd
+
+UP_COLOR = '#22c55e'
+DOWN_COLOR = '#ef4444'
+
+
+def encode_dates(index: pd.DatetimeIndex, fmt: str = '%Y-%m-%d') -> list:
+    """날짜 인덱스를 문자열 리스트로 변환"""
+    return index.strftime(fmt).tolist()
+
+
+def encode_values(values, fill=None) -> list:
+    """
+    숫자 배열을 Python float 리스트로 변환합니다. NaN 위치는 fill 값(기본 None -> JSON null)으로 채웁니다.
+    """
+    arr = np.asarray(values, dtype='f8')
+    result = arr.tolist()
+    for i in np.flatnonzero(np.isnan(arr)):
+        result[i] = fill
+    return result
+
+
+def encode_xy(dates: list, values, x_key: str = 'x', y_key: str = 'y') -> list:
+    """[{x_key: 날짜, y_key: 값(NaN -> null)}, ...]"""
+    return [{x_key: x, y_key: y} for x, y in zip(dates, encode_values(values))]
+
+
+def encode_ohlc(df: pd.DataFrame, dates: list = None) -> list:
+    """캔들차트용 [{"x", "o", "h", "l", "c"}, ...]"""
+    dates = encode_dates(df.index) if dates is None else dates
+    opens = df['Open'].to_numpy(dtype='f8').tolist()
+    highs = df['High'].to_numpy(dtype='f8').tolist()
+    lows = df['Low'].to_numpy(dtype='f8').tolist()
+    closes = df['Close'].to_numpy(dtype='f8').tolist()
+    return [
+        {"x": x, "o": o, "h": h, "l": l, "c": c}
+        for x, o, h, l, c in zip(dates, opens, highs, lows, closes)
+    ]
+
+
+def encode_volume(df: pd.DataFrame, dates: list = None) -> list:
+    """거래량 막대용 [{"x", "y"(NaN -> 0), "color"(양봉/음봉)}, ...]"""
+    dates = encode_dates(df.index) if dates is None else dates
+    volumes = encode_values(df['Volume'], fill=0)
+    up = df['Close'].to_numpy(dtype='f8') >= df['Open'].to_numpy(dtype='f8')
+    colors = np.where(up, UP_COLOR, DOWN_COLOR).tolist()
+    return [{"x": x, "y": y, "color": color} for x, y, color in zip(dates, volumes, colors)]
+
+
+# ============================================
+# 컬럼형(columnar) 포맷: 공유 타임스탬프 + 병렬 숫자 배열
+# ============================================
+
+def encode_epoch_ms(index: pd.DatetimeIndex) -> np.ndarray:
+    """날짜 인덱스를 epoch 밀리초(int64, UTC 자정 기준)로 변환"""
+    return index.values.astype('datetime64[ms]').astype('<i8')
+
+
+def pack_array(values, dtype: str) -> str:
+    """숫자 배열을 little-endian 바이너리로 묶어 base64 문자열로 변환"""
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode('ascii')
+
+
+def encode_columnar(index: pd.DatetimeIndex, columns: dict, packed: bool = False, int_columns=()) -> dict:
+    """
+    행마다 날짜를 반복하는 대신 하나의 타임스탬프 배열과 열별 숫자 배열로 인코딩합니다.
+
+    Args:
+        index: 날짜 인덱스 (모든 열이 공유)
+        columns: 열 이름 -> 값 배열 (Series/ndarray)
+        packed: True면 base64 바이너리 (타임스탬프/정수 열은 int64, 나머지는 float32; NaN 유지),
+                False면 numpy 배열 그대로 (응답 직렬화 시 NaN -> null)
+        int_columns: 정수로 보낼 열 이름 (NaN -> 0, 예: 거래량)
+
+    Returns:
+        {"format": "columnar", "encoding", "length", "t", "columns"[, "dtypes"]}
+    """
+    timestamps = encode_epoch_ms(index)
+    result = {
+        "format": "columnar",
+        "encoding": "base64" if packed else "json",
+        "length": len(timestamps)
+    }
+
+    if not packed:
+        result["t"] = timestamps
+        result["columns"] = {
+            name: np.nan_to_num(np.asarray(values, dtype='f8'), nan=0.0) if name in int_columns
+            else np.asarray(values, dtype='f8')
+            for name, values in columns.items()
+        }
+        return result
+
+    dtypes = {"t": "int64"}
+    packed_columns = {}
+    for name, values in columns.items():
+        arr = np.asarray(values, dtype='f8')
+        if name in int_columns:
+            packed_columns[name] = pack_array(np.nan_to_num(arr, nan=0.0), '<i8')
+            dtypes[name] = "int64"
+        else:
+            packed_columns[name] = pack_array(arr, '<f4')
+            dtypes[name] = "float32"
+
+    result["t"] = pack_array(timestamps, '<i8')
+    result["columns"] = packed_columns
+    result["dtypes"] = dtypes
+    return result
@@ -1,6 +1,5 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request
 from flask_cors import CORS
-import FinanceDataReader as fdr
 import json
 from datetime import datetime, timedelta
 import pandas as pd
@@ -10,6 +9,15 @@ app = Flask(__name__)
 # Allow CORS for all domains on all routes
 CORS(app, resources={r"/*": {"origins": "*"}}) 
 
+try:
+    from api.price_store import get_history, resample_ohlcv
+    from api.serialization import encode_dates, encode_ohlc
+    from api.responses import json_response
+except ImportError:
+    from price_store import get_history, resample_ohlcv
+    from serialization import encode_dates, encode_ohlc
+    from responses import json_response
+
 @app.route('/api/historical', methods=['GET'])
 def get_historical_data():
     try:
@@ -34,14 +42,14 @@ def get_historical_data():
         else: # Default 1y
             start_date = (today - timedelta(days=365)).strftime('%Y-%m-%d')
         
-        # Fetch data using FinanceDataReader
-        print(f"[{datetime.now()}] Calling fdr.DataReader for {ticker}...")
-        df = fdr.DataReader(ticker, start_date)
-        print(f"[{datetime.now()}] fdr.DataReader returned {len(df)} rows.")
+        # Local price store (only bars newer than the stored history are downloaded)
+        print(f"[{datetime.now()}] Loading price history for {ticker}...")
+        df = get_history(ticker, start_date)
+        print(f"[{datetime.now()}] Price store returned {len(df)} rows.")
         
         if df.empty:
             print(f"No data found for {ticker}")
-            return jsonify({"error": "No data found for this ticker"}), 404
+            return json_response({"error": "No data found for this ticker"}), 404
 
         # Extract Current Info (Always from Daily data for accuracy)
         last_row = df.iloc[-1]
@@ -51,34 +59,10 @@ def get_historical_data():
         change_percent = float((change / prev_close) * 100) if prev_close != 0 else 0
 
         # Resample if needed (Daily is default)
-        resampled_df = df.copy()
-        if interval == 'w':
-            # Weekly resampling for OHLC
-            resampled_df = df.resample('W').agg({
-                'Open': 'first',
-                'High': 'max',
-                'Low': 'min',
-                'Close': 'last'
-            }).dropna()
-        elif interval == 'm':
-            # Monthly resampling for OHLC
-            resampled_df = df.resample('M').agg({
-                'Open': 'first',
-                'High': 'max',
-                'Low': 'min',
-                'Close': 'last'
-            }).dropna()
+        resampled_df = resample_ohlcv(df, interval)
         
         # Prepare OHLC data
-        ohlc_data = []
-        for index, row in resampled_df.iterrows():
-            ohlc_data.append({
-                "x": index.strftime('%Y-%m-%d'),
-                "o": float(row['Open']),
-                "h": float(row['High']),
-                "l": float(row['Low']),
-                "c": float(row['Close'])
-            })
+        dates = encode_dates(resampled_df.index)
 
         chart_data = {
             "ticker": ticker,
@@ -87,16 +71,16 @@ def get_historical_data():
             "current_price": current_price,
             "change": change,
             "change_percent": round(change_percent, 2),
-            "labels": resampled_df.index.strftime('%Y-%m-%d').tolist(),
+            "labels": dates,
             "prices": resampled_df['Close'].tolist(),
-            "ohlc": ohlc_data
+            "ohlc": encode_ohlc(resampled_df, dates)
         }
         
-        return jsonify(chart_data)
+        return json_response(chart_data)
 
     except Exception as e:
         print(f"Error fetching data: {e}")
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 if __name__ == '__main__':
     print("Starting Flask API Server on port 5002...")
@@ -0,0 +1,121 @@
+# Transcript Store Module
+# Plain-text transcripts extracted from earnings-call PDFs (pages in parallel across processes),
+# persisted on disk keyed by the PDF content hash
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from api.analysis_cache import file_hash
+from api.pdf_text import count_pages, extract_page_range
+from api.price_store import DATA_DIR
+
+TRANSCRIPT_DIR = os.environ.get('TRANSCRIPT_DIR', os.path.join(DATA_DIR, 'transcripts'))
+
+# 페이지 추출 프로세스 수 (기본: CPU 수, 최대 4)
+TRANSCRIPT_WORKERS = int(os.environ.get('TRANSCRIPT_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# 병렬 추출 결과를 기다리는 최대 시간 (초), 넘으면 프로세스를 종료하고 순서대로 추출
+EXTRACT_TIMEOUT = float(os.environ.get('TRANSCRIPT_EXTRACT_TIMEOUT', '120'))
+
+# 프로세스 하나가 맡는 최소 페이지 수 (페이지가 적으면 프로세스 시작 비용이 더 큼)
+MIN_PAGES_PER_WORKER = 4
+
+# 텍스트 추출 방식이 바뀌면 올려서 저장된 텍스트를 다시 추출
+EXTRACT_VERSION = 1
+
+PAGE_SEPARATOR = "\n\n"
+
+# 워커 프로세스는 spawn으로 시작 (멀티스레드 gunicorn 워커에서 fork하면
+# 다른 스레드가 잡고 있던 락을 물려받아 자식 프로세스가 멈출 수 있음)
+_mp_context = multiprocessing.get_context('spawn')
+
+
+def extract_pages(pdf_path: str, workers: int = TRANSCRIPT_WORKERS) -> list:
+    """
+    PDF의 모든 페이지 텍스트를 추출합니다. 페이지를 workers개의 연속 구간으로 나눠
+    프로세스 풀에서 동시에 추출하며, 풀을 사용할 수 없거나 EXTRACT_TIMEOUT 안에
+    끝나지 않으면 순서대로 추출합니다.
+
+    Returns:
+        페이지 순서대로 텍스트 리스트
+    """
+    page_count = count_pages(pdf_path)
+    workers = min(workers, page_count // MIN_PAGES_PER_WORKER)
+    if workers <= 1:
+        return extract_page_range(pdf_path, 0, page_count)
+
+    bounds = [page_count * i // workers for i in range(workers + 1)]
+    executor = None
+    try:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context)
+        chunks = executor.map(extract_page_range, [pdf_path] * workers, bounds[:-1], bounds[1:],
+                              timeout=EXTRACT_TIMEOUT)
+        pages = [text for chunk in chunks for text in chunk]
+        executor.shutdown()
+        return pages
+    except FuturesTimeoutError:
+        print(f"Parallel PDF extraction timed out after {EXTRACT_TIMEOUT:g}s, extracting serially")
+    except (BrokenProcessPool, OSError) as e:
+        print(f"Parallel PDF extraction unavailable, extracting serially: {e}")
+
+    if executor is not None:
+        _stop_workers(executor)
+    return extract_page_range(pdf_path, 0, page_count)
+
+
+def _stop_workers(executor: ProcessPoolExecutor):
+    """응답 없는 추출 프로세스를 기다리지 않고 종료"""
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+class TranscriptStore:
+    """
+    PDF 내용 해시 -> 추출된 텍스트를 디렉토리에 .txt 파일로 저장합니다.
+    같은 PDF를 다시 분석하거나 프롬프트가 바뀌어도 PDF를 다시 파싱하지 않습니다.
+    """
+
+    def __init__(self, directory: str = TRANSCRIPT_DIR, workers: int = TRANSCRIPT_WORKERS):
+        self.directory = directory
+        self.workers = workers
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.v{EXTRACT_VERSION}.txt")
+
+    def load(self, key: str):
+        """저장된 텍스트 (없으면 None)"""
+        try:
+            with open(self.path_for(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def get(self, pdf_path: str) -> str:
+        """PDF의 텍스트 (저장된 것이 없으면 추출해 저장)"""
+        key = file_hash(pdf_path)
+        text = self.load(key)
+        if text is not None:
+            return text
+
+        pages = extract_pages(pdf_path, self.workers)
+        text = PAGE_SEPARATOR.join(page for page in pages if page)
+        self._write(key, text)
+        print(f"Transcript extracted: {os.path.basename(pdf_path)} ({len(pages)} pages)")
+        return text
+
+    def _write(self, key: str, text: str):
+        """임시 파일에 쓴 뒤 rename"""
+        path = self.path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Transcript store write error: {e}")
@@ -0,0 +1,224 @@
+# Universe Module
+# Background-maintained date x ticker price matrix (close/high/low/volume) for every tracked symbol,
+# plus vectorized period returns, breadth and sector aggregates over it
+
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from api.market_data import download_history, last_valid, period_returns
+from api.price_store import DATA_DIR
+from api.scheduler import is_market_open
+
+UNIVERSE_PATH = os.path.join(DATA_DIR, 'universe.npz')
+UNIVERSE_PERIOD = '1y'
+
+# 저장된 매트릭스가 이 시간(초)보다 오래되면 요청 시 다시 다운로드 (평소에는 스케줄러가 갱신).
+# 장외에는 스케줄러가 1시간마다 갱신하므로 그 두 배까지 허용 (스케줄러가 멈췄을 때만 요청에서 다운로드)
+MAX_AGE = int(os.environ.get('UNIVERSE_MAX_AGE', '900'))
+CLOSED_MAX_AGE = int(os.environ.get('UNIVERSE_CLOSED_MAX_AGE', str(2 * 3600)))
+
+# 저장하는 필드 (npz 배열 이름 -> 다운로드 필드)
+UNIVERSE_FIELDS = {'close': 'Close', 'high': 'High', 'low': 'Low', 'volume': 'Volume'}
+
+# 기간 이름 -> 몇 거래일 전 (None이면 조회 구간의 첫 종가)
+RETURN_PERIODS = {'1d': 1, '1w': 5, '1m': 21, '3m': 63, '1y': None}
+
+
+class UniverseStore:
+    """
+    전체 유니버스의 일별 종가/고가/저가/거래량 매트릭스(날짜 x 티커)를 universe.npz 하나로 저장합니다.
+
+    한 번의 일괄 다운로드로 갱신하며, 파일을 공유하므로 스케줄러를 실행하지 않는
+    다른 워커도 파일이 바뀌었을 때만 다시 읽어 같은 매트릭스를 메모리에서 사용합니다.
+    """
+
+    def __init__(self, path: str = UNIVERSE_PATH, period: str = UNIVERSE_PERIOD, max_age: int = MAX_AGE,
+                 closed_max_age: int = CLOSED_MAX_AGE):
+        self.path = path
+        self.period = period
+        self.max_age = max_age
+        self.closed_max_age = closed_max_age
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.RLock()  # 다운로드는 프로세스당 한 번에 하나 (single-flight)
+        self._loaded = None  # (파일 수정 시각, 필드 -> DataFrame)
+
+    def _read(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+        if self._loaded is not None and self._loaded[0] == mtime:
+            return self._loaded
+
+        try:
+            with np.load(self.path) as data:
+                index = pd.DatetimeIndex(data['date'].astype('datetime64[ns]'))
+                tickers = data['tickers'].tolist()
+                frames = {
+                    field: pd.DataFrame(data[name], index=index, columns=tickers)
+                    for name, field in UNIVERSE_FIELDS.items()
+                }
+        except Exception as e:
+            print(f"Universe store read error: {e}")
+            return None
+
+        self._loaded = (mtime, frames)
+        return self._loaded
+
+    def _write(self, frames: dict):
+        """임시 파일에 쓴 뒤 rename"""
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                closes = frames['Close']
+                np.savez(
+                    f,
+                    date=closes.index.values.astype('datetime64[D]'),
+                    tickers=np.array(closes.columns, dtype=str),
+                    **{name: frames[field].to_numpy(dtype='f8') for name, field in UNIVERSE_FIELDS.items()}
+                )
+            os.replace(tmp_path, self.path)
+            self._loaded = (os.stat(self.path).st_mtime_ns, frames)
+        except OSError as e:
+            print(f"Universe store write error: {e}")
+
+    def refresh(self, symbols: list) -> dict:
+        """
+        전체 종목을 한 번에 다운로드해 매트릭스를 교체합니다.
+
+        Returns:
+            dict of field ('Close', 'High', 'Low', 'Volume') -> DataFrame (날짜 x 티커)
+        """
+        with self._refresh_lock:
+            downloaded = download_history(symbols, period=self.period)
+            closes = downloaded['Close'].dropna(how='all')
+            if closes.empty:
+                raise ValueError("Universe download returned no data")
+            frames = {
+                field: downloaded[field].reindex(index=closes.index, columns=closes.columns)
+                for field in UNIVERSE_FIELDS.values()
+            }
+
+            with self._lock:
+                self._write(frames)
+        print(f"Universe refreshed: {closes.shape[1]} symbols x {closes.shape[0]} days")
+        return frames
+
+    def _fresh(self, loaded, symbols: list) -> bool:
+        """저장된 매트릭스가 허용 기간(장중 max_age, 장외 closed_max_age) 이내이고 모든 종목을 포함하는지"""
+        max_age = self.max_age if is_market_open() else self.closed_max_age
+        return (
+            loaded is not None
+            and time.time() - loaded[0] / 1e9 < max_age
+            and set(symbols) <= set(loaded[1]['Close'].columns)
+        )
+
+    def get(self, symbols: list) -> dict:
+        """
+        저장된 매트릭스를 반환합니다. 없거나 허용 기간보다 오래됐거나 빠진 종목이 있으면 다시 다운로드하고,
+        다운로드에 실패하면 이전 매트릭스를 그대로 사용합니다.
+        동시에 들어온 요청은 다운로드를 한 번만 하고 나머지는 그 결과를 사용합니다.
+
+        Returns:
+            dict of field -> DataFrame (날짜 x 티커, 열 = symbols)
+        """
+        with self._lock:
+            loaded = self._read()
+
+        if self._fresh(loaded, symbols):
+            frames = loaded[1]
+        else:
+            with self._refresh_lock:
+                # 기다리는 동안 다른 스레드(또는 파일을 교체한 다른 워커)가 갱신했으면 그 결과 사용
+                with self._lock:
+                    loaded = self._read()
+                if self._fresh(loaded, symbols):
+                    frames = loaded[1]
+                else:
+                    try:
+                        frames = self.refresh(symbols)
+                    except Exception as e:
+                        if loaded is None:
+                            raise
+                        print(f"Universe refresh failed, using stored matrix: {e}")
+                        frames = loaded[1]
+
+        return {field: frame.reindex(columns=symbols) for field, frame in frames.items()}
+
+    def stats(self) -> dict:
+        loaded = self._read()
+        if loaded is None:
+            return {'symbols': 0, 'days': 0, 'updatedAt': None}
+        closes = loaded[1]['Close']
+        return {
+            'symbols': closes.shape[1],
+            'days': closes.shape[0],
+            'updatedAt': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(loaded[0] / 1e9))
+        }
+
+
+def universe_returns(closes: pd.DataFrame, volumes: pd.DataFrame, groups: dict, caps: dict,
+                     periods: dict = RETURN_PERIODS, breadth_period: str = '1d') -> dict:
+    """
+    유니버스 매트릭스에서 종목별 기간 수익률과 그룹(섹터)별 집계를 한 번에 계산합니다.
+    그룹 집계는 그룹 x 종목 소속 행렬과 종목 x 기간 수익률 행렬의 곱으로 구합니다.
+
+    Args:
+        closes / volumes: 날짜 x 티커
+        groups: 그룹 이름 -> 소속 티커 리스트
+        caps: 티커 -> 시가총액 (없거나 0이면 시가총액 가중 평균에서 제외)
+        periods: 기간 이름 -> 몇 거래일 전
+        breadth_period: 상승/하락 종목 수를 셀 기간
+
+    Returns:
+        {
+            'tickers': DataFrame (티커 x ['price', 'volume', 기간...]),
+            'groups': DataFrame (그룹 x ['count', 'advancers', 'decliners', 'unchanged']),
+            'equal': DataFrame (그룹 x 기간, 동일 가중 평균 수익률),
+            'capWeighted': DataFrame (그룹 x 기간, 시가총액 가중 평균 수익률)
+        }
+    """
+    prices = last_valid(closes)
+    returns = pd.DataFrame(period_returns(closes, prices, periods), index=closes.columns)
+    tickers = pd.concat([prices.rename('price'), last_valid(volumes).rename('volume'), returns], axis=1)
+
+    # 그룹 x 종목 소속 행렬
+    members = list(closes.columns)
+    position = {symbol: i for i, symbol in enumerate(members)}
+    membership = np.zeros((len(groups), len(members)))
+    for row, symbols in enumerate(groups.values()):
+        for symbol in symbols:
+            if symbol in position:
+                membership[row, position[symbol]] = 1.0
+
+    values = returns.to_numpy(dtype='f8')  # 종목 x 기간
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    weights = np.nan_to_num(np.array([caps.get(symbol) or 0 for symbol in members], dtype='f8'))
+    weighted = membership * weights
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        equal = (membership @ filled) / (membership @ valid)
+        cap_weighted = (weighted @ filled) / (weighted @ valid)
+
+    breadth = values[:, list(periods).index(breadth_period)]
+    group_names = list(groups)
+    group_stats = pd.DataFrame({
+        'count': membership @ valid[:, list(periods).index(breadth_period)],
+        'advancers': membership @ (breadth > 0),
+        'decliners': membership @ (breadth < 0),
+        'unchanged': membership @ (breadth == 0)
+    }, index=group_names).astype('int64')
+
+    return {
+        'tickers': tickers,
+        'groups': group_stats,
+        'equal': pd.DataFrame(equal, index=group_names, columns=list(periods)),
+        'capWeighted': pd.DataFrame(cap_weighted, index=group_names, columns=list(periods))
+    }
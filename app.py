@@ -1,4 +1,4 @@
-from flask import Flask, send_from_directory, request, jsonify
+from flask import Flask, send_from_directory, request
 from flask_cors import CORS
 import FinanceDataReader as fdr
 from datetime import datetime, timedelta
@@ -6,9 +6,22 @@ import pandas as pd
 import os
 import yfinance as yf
 import math
-import json
-import time
 import threading
+import sqlite3
+from api.concurrency import background_executor, fan_out, submit_all, collect
+from api.price_store import DATA_DIR, price_store, get_history, resample_ohlcv
+from api.fundamentals_store import FundamentalsStore
+from api.indicators import indicator_store, parse_indicators, compute_indicators
+from api.downsample import MIN_POINTS, downsample_ohlcv, lttb_indices
+from api.cache import TTLCache
+from api.cache_backend import SQLiteBackend
+from api.market_data import download_history, last_valid, period_returns, summarize_quotes
+from api.responses import json_response, sse_event, sse_response
+from api.serialization import encode_columnar, encode_dates, encode_ohlc, encode_volume, encode_xy
+from api.scheduler import Scheduler
+from api.screen import DEFAULT_LIMIT, MAX_LIMIT, parse_filters, run_screen
+from api.screener import fetch_predefined_screen, screen_extremes, screen_movers
+from api.universe import RETURN_PERIODS, UniverseStore, universe_returns
 
 # Translation support (using deep-translator which is Python 3.14 compatible)
 try:
@@ -23,30 +36,39 @@ CORS(app)
 
 # ============================================
 # 캐싱 시스템 - API 응답 속도 개선
+# 키의 ':' 앞부분을 네임스페이스로 보고 네임스페이스별 TTL 적용
+# 같은 호스트의 gunicorn 워커들은 SQLite(WAL) 파일을 공유 캐시로 함께 사용
+# (CACHE_BACKEND=memory이면 프로세스 내 캐시만 사용)
 # ============================================
-CACHE = {}
-CACHE_DURATION = 300  # 5분 (초)
-
-def get_cached(key):
-    """캐시에서 데이터 조회"""
-    if key in CACHE:
-        data, timestamp = CACHE[key]
-        if time.time() - timestamp < CACHE_DURATION:
-            print(f"Cache HIT: {key}")
-            return data
-        else:
-            del CACHE[key]  # 만료된 캐시 삭제
-    return None
+CACHE_TTLS = {
+    'quote': 60,  # 시세: 1분
+    'prices': 300,  # 가격: 5분
+    'fundamentals': 6 * 3600,  # 재무제표/추정치: 6시간
+    'profile': 6 * 3600,  # 기업 프로필: 6시간
+    'ticker_news': 600,  # 종목 뉴스: 10분
+    'market_overview': 300,
+    'sectors': 300,
+    'movers': 300,
+    'new_highs': 300,
+    'sector_stocks': 600,
+    'stock_meta': 86400,  # 종목명/시가총액: 1일
+    'universe_returns': 300,
+    'screen_table': 900  # /api/screen 종목 x 필드 테이블
+}
 
-def set_cache(key, data):
-    """캐시에 데이터 저장"""
-    CACHE[key] = (data, time.time())
-    print(f"Cache SET: {key}")
+if os.environ.get('CACHE_BACKEND', 'sqlite') == 'sqlite':
+    cache_backend = SQLiteBackend(os.environ.get('CACHE_DB_PATH', os.path.join(DATA_DIR, 'cache.sqlite3')))
+else:
+    cache_backend = None
 
+cache = TTLCache(
+    CACHE_TTLS,
+    default_ttl=300,
+    max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', '2048')),
+    max_bytes=int(os.environ.get('CACHE_MAX_MB', '128')) * 1024 * 1024,
+    backend=cache_backend
+)
 
-# 백그라운드 캐시 갱신을 위한 변수
-cache_update_lock = threading.Lock()
-cache_updating = set()
 
 @app.route('/')
 def index():
@@ -58,442 +80,793 @@ def serve_static(path):
         return send_from_directory('.', path)
     return send_from_directory('.', 'index.html')
 
+@app.route('/api/cache-stats')
+def cache_stats():
+    """캐시 상태(엔트리 수, 크기, 적중/미스/제거 횟수) 반환."""
+    return json_response(cache.stats())
+
+# ============================================
+# 종목 상세 데이터 (가격 / 재무 / 뉴스 / 프로필)
+# 각 리소스는 데이터 변경 주기에 맞는 TTL로 개별 캐싱 (CACHE_TTLS)
+# ============================================
+
+
+def get_start_date(date_range):
+    """조회 기간(range)에 해당하는 시작일 계산"""
+    today = datetime.now()
+    if date_range == '1m': start = (today - timedelta(days=30))
+    elif date_range == '3m': start = (today - timedelta(days=90))
+    elif date_range == '6m': start = (today - timedelta(days=180))
+    elif date_range == '1y': start = (today - timedelta(days=365))
+    elif date_range == '5y': start = (today - timedelta(days=365*5))
+    elif date_range == 'max': start = datetime(1980, 1, 1)
+    else: start = (today - timedelta(days=365))
+
+    return start.strftime('%Y-%m-%d')
+
+
+# Safe float helper
+def safe_float(val):
+    if val is None: return None
+    try:
+        f = float(val)
+        if math.isnan(f) or math.isinf(f): return None
+        return f
+    except: return None
+
+# CY (Calendar Year) conversion helpers
+def get_cy_year(d):
+    # If fiscal year ends in Jan-Mar, treat as previous calendar year
+    if d.month <= 3: return d.year - 1
+    return d.year
+
+def get_cy_q_label(d):
+    # Adjust roughly to represent the calendar quarter based on end date
+    mid = d - timedelta(days=45)
+    q = (mid.month - 1) // 3 + 1
+    return f"{mid.year}-Q{q}"
+
+# Helper function to calculate metrics for a period
+def calculate_period_metrics(income_stmt, cash_flow, period_col, prev_period_col=None, is_estimate=False, period_label=None):
+    # Extract data
+    revenue = safe_float(income_stmt.loc['Total Revenue', period_col]) if 'Total Revenue' in income_stmt.index else None
+    gross_profit = safe_float(income_stmt.loc['Gross Profit', period_col]) if 'Gross Profit' in income_stmt.index else None
+    ebitda = safe_float(income_stmt.loc['EBITDA', period_col]) if 'EBITDA' in income_stmt.index else None
+    if ebitda is None:
+        ebitda = safe_float(income_stmt.loc['Normalized EBITDA', period_col]) if 'Normalized EBITDA' in income_stmt.index else None
+    net_income = safe_float(income_stmt.loc['Net Income', period_col]) if 'Net Income' in income_stmt.index else None
+
+    # OPEX 세부 항목
+    operating_expense = safe_float(income_stmt.loc['Operating Expense', period_col]) if 'Operating Expense' in income_stmt.index else None
+    rd_expense = safe_float(income_stmt.loc['Research And Development', period_col]) if 'Research And Development' in income_stmt.index else None
+    sga_expense = safe_float(income_stmt.loc['Selling General And Administration', period_col]) if 'Selling General And Administration' in income_stmt.index else None
+
+    # Operating Income
+    operating_income = safe_float(income_stmt.loc['Operating Income', period_col]) if 'Operating Income' in income_stmt.index else None
+
+    # Cash flow data
+    operating_cf = None
+    capex = None
+    if period_col in cash_flow.columns:
+        operating_cf = safe_float(cash_flow.loc['Operating Cash Flow', period_col]) if 'Operating Cash Flow' in cash_flow.index else None
+        capex = safe_float(cash_flow.loc['Capital Expenditure', period_col]) if 'Capital Expenditure' in cash_flow.index else None
+
+    # Calculate FCF
+    free_cash_flow = None
+    if operating_cf is not None and capex is not None:
+        free_cash_flow = operating_cf + capex
+
+    # Get EPS
+    eps = safe_float(income_stmt.loc['Basic EPS', period_col]) if 'Basic EPS' in income_stmt.index else None
+    if eps is None:
+        eps = safe_float(income_stmt.loc['Diluted EPS', period_col]) if 'Diluted EPS' in income_stmt.index else None
+
+    # Calculate margins
+    gpm = (gross_profit / revenue * 100) if (revenue and gross_profit and revenue != 0) else None
+    ebitda_margin = (ebitda / revenue * 100) if (revenue and ebitda and revenue != 0) else None
+    opm = (operating_income / revenue * 100) if (revenue and operating_income and revenue != 0) else None
+    fcf_margin = (free_cash_flow / revenue * 100) if (revenue and free_cash_flow and revenue != 0) else None
+
+    # OPEX as % of revenue
+    rd_pct = (rd_expense / revenue * 100) if (revenue and rd_expense and revenue != 0) else None
+    sga_pct = (sga_expense / revenue * 100) if (revenue and sga_expense and revenue != 0) else None
+    opex_pct = (operating_expense / revenue * 100) if (revenue and operating_expense and revenue != 0) else None
+
+    # Calculate YoY Growth
+    revenue_growth = None
+    eps_growth = None
+    fcf_growth = None
+
+    if prev_period_col is not None and prev_period_col in income_stmt.columns:
+        prev_revenue = safe_float(income_stmt.loc['Total Revenue', prev_period_col]) if 'Total Revenue' in income_stmt.index else None
+        if revenue and prev_revenue and prev_revenue != 0:
+            revenue_growth = ((revenue - prev_revenue) / abs(prev_revenue) * 100)
+
+        prev_eps = safe_float(income_stmt.loc['Basic EPS', prev_period_col]) if 'Basic EPS' in income_stmt.index else None
+        if prev_eps is None:
+            prev_eps = safe_float(income_stmt.loc['Diluted EPS', prev_period_col]) if 'Diluted EPS' in income_stmt.index else None
+        if eps and prev_eps and prev_eps != 0:
+            eps_growth = ((eps - prev_eps) / abs(prev_eps) * 100)
+
+    if prev_period_col is not None and prev_period_col in cash_flow.columns:
+        prev_operating_cf = safe_float(cash_flow.loc['Operating Cash Flow', prev_period_col]) if 'Operating Cash Flow' in cash_flow.index else None
+        prev_capex = safe_float(cash_flow.loc['Capital Expenditure', prev_period_col]) if 'Capital Expenditure' in cash_flow.index else None
+        if prev_operating_cf is not None and prev_capex is not None:
+            prev_fcf = prev_operating_cf + prev_capex
+            if free_cash_flow and prev_fcf and prev_fcf != 0:
+                fcf_growth = ((free_cash_flow - prev_fcf) / abs(prev_fcf) * 100)
+
+    if period_label:
+        year_str = period_label
+    else:
+        year_str = str(period_col.year) if hasattr(period_col, 'year') else str(period_col)
+
+    if is_estimate and not year_str.endswith('E'):
+        year_str += "E"
+
+    return {
+        "period": year_str,
+        "revenue": revenue,
+        "revenueGrowth": revenue_growth,
+        "gpm": gpm,
+        "opm": opm,
+        "ebitdaMargin": ebitda_margin,
+        "netIncome": net_income,
+        "eps": eps,
+        "epsGrowth": eps_growth,
+        "freeCashFlow": free_cash_flow,
+        "fcfGrowth": fcf_growth,
+        "fcfMargin": fcf_margin,
+        "operatingExpense": operating_expense,
+        "rdExpense": rd_expense,
+        "sgaExpense": sga_expense,
+        "rdPct": rd_pct,
+        "sgaPct": sga_pct,
+        "opexPct": opex_pct,
+        "isEstimate": is_estimate
+    }
+
+
+# 차트 응답 포맷: rows(기본, 행별 객체 배열) / columnar(JSON 배열) / base64(columnar + 바이너리 압축)
+PRICE_FORMATS = ('rows', 'columnar', 'base64')
+
+
+def get_price_format(args):
+    """요청 파라미터(format=columnar, encoding=base64)에서 차트 응답 포맷 결정"""
+    if args.get('format') != 'columnar':
+        return 'rows'
+    return 'base64' if args.get('encoding') == 'base64' else 'columnar'
+
+
+def get_indicator_values(ticker_symbol, df, resampled_df, interval, indicators):
+    """
+    일봉 지표는 저장된 전체 이력 기준으로 지표 저장소에서 (새 봉만 증분 계산),
+    주봉/월봉이나 저장소를 쓸 수 없을 때는 응답 구간에서 직접 계산합니다.
+    """
+    if interval not in ('w', 'm'):
+        history = price_store.load(ticker_symbol)
+        if len(history) and history.index[-1] == df.index[-1]:
+            values = indicator_store.get(ticker_symbol, history, indicators)
+            return values.reindex(resampled_df.index)
+    return compute_indicators(resampled_df, indicators)
+
+
+def fetch_prices(ticker_symbol, date_range, interval, fmt='rows', indicators=None, max_points=None):
+    """
+    가격/거래량/기술지표 차트 데이터 조회 (데이터 없으면 None).
+    indicators: 'ma20,rsi14' 형식 (없으면 기본 ma10/ma20/ma50)
+    max_points: 봉이 이보다 많으면 캔들은 구간 OHLC로, 지표 선은 LTTB로 축소
+    """
+    # 로컬 가격 저장소에서 조회 (저장 이후 신규 봉만 원격 조회)
+    df = get_history(ticker_symbol, get_start_date(date_range))
+
+    if df.empty:
+        return None
+
+    last_row = df.iloc[-1]
+    if len(df) > 1:
+        prev_close = df.iloc[-2]['Close']
+    else:
+        prev_close = last_row['Open']
+
+    current_price = last_row['Close']
+    change = current_price - prev_close
+    change_percent = (change / prev_close) * 100 if prev_close != 0 else 0
+
+    resampled_df = resample_ohlcv(df, interval)
+
+    # 기술지표 (기본: 이동평균 10/20/50)
+    studies = parse_indicators(indicators)
+    values = get_indicator_values(ticker_symbol, df, resampled_df, interval, studies)
+
+    payload = {
+        "ticker": ticker_symbol,
+        "range": date_range,
+        "interval": interval,
+        "current_price": current_price,
+        "change": change,
+        "change_percent": round(change_percent, 2)
+    }
+    if indicators:
+        payload["indicators"] = list(values.columns)
+
+    # 장기 차트 축소: 구간별 실제 고가/저가를 유지하는 캔들 + 모양을 유지하는 지표 선
+    lines = None
+    if max_points and len(resampled_df) > max_points:
+        payload["downsampled"] = {"from": len(resampled_df), "to": max_points}
+        if fmt == 'rows':
+            # 행 포맷은 선마다 날짜가 있으므로 지표 선은 LTTB로 따로 고름
+            lines = {}
+            for name in values.columns:
+                picked = lttb_indices(values[name], max_points)
+                lines[name] = encode_xy(encode_dates(values.index[picked]), values[name].to_numpy()[picked])
+        resampled_df, starts, _ = downsample_ohlcv(resampled_df, max_points)
+        # 컬럼형은 타임스탬프를 공유하므로 캔들 날짜(구간 첫 봉)와 같은 시점의 지표 값
+        values = values.iloc[starts]
+
+    if fmt != 'rows':
+        # 날짜/종가 중복과 봉별 색상 문자열 없이 열 단위로 전송 (색상은 o/c로 클라이언트에서 계산)
+        payload.update(encode_columnar(resampled_df.index, {
+            "o": resampled_df['Open'],
+            "h": resampled_df['High'],
+            "l": resampled_df['Low'],
+            "c": resampled_df['Close'],
+            "v": resampled_df['Volume'],
+            **{name: values[name] for name in values.columns}
+        }, packed=(fmt == 'base64'), int_columns=('v',)))
+        return payload
+
+    dates = encode_dates(resampled_df.index)
+
+    return {
+        **payload,
+        "prices": resampled_df['Close'].to_numpy(),
+        "labels": dates,
+        "ohlc": encode_ohlc(resampled_df, dates),
+        "volume": encode_volume(resampled_df, dates),
+        **(lines if lines is not None else {name: encode_xy(dates, values[name]) for name in values.columns})
+    }
+
+
+# 재무제표/파생 지표 로컬 DB (새 분기 실적 시점이나 TTL 만료 시에만 Yahoo 조회)
+fundamentals_store = FundamentalsStore()
+
+
+def fetch_statements(ticker_symbol):
+    """
+    재무제표 4종과 컨센서스 추정치 2종을 동시에 조회. 실패/타임아웃된 항목은 결과에서 제외.
+
+    Returns:
+        (statements, errors) - 이름 -> DataFrame, 이름 -> 에러 메시지
+    """
+    return fan_out({
+        'financials': lambda: yf.Ticker(ticker_symbol).financials,
+        'cashflow': lambda: yf.Ticker(ticker_symbol).cashflow,
+        'quarterly_financials': lambda: yf.Ticker(ticker_symbol).quarterly_financials,
+        'quarterly_cashflow': lambda: yf.Ticker(ticker_symbol).quarterly_cashflow,
+        'revenue_estimate': lambda: yf.Ticker(ticker_symbol).revenue_estimate,
+        'earnings_estimate': lambda: yf.Ticker(ticker_symbol).earnings_estimate
+    })
+
+
+def fetch_fundamentals(ticker_symbol):
+    """
+    연간/분기 재무 지표 및 컨센서스 추정치.
+    로컬 DB에 저장된 값을 우선 사용하고, TTL이 지났거나 새 분기 실적이 나왔을 시점에만 Yahoo에서 조회해 저장.
+
+    Returns:
+        (financials_data, errors) - errors가 비어있지 않으면 일부 항목이 누락된 결과
+    """
+    stored = None
+    try:
+        stored = fundamentals_store.load(ticker_symbol)
+        if stored is None and fundamentals_store.status(ticker_symbol) is not None:
+            # 지표 계산 방식이 바뀐 경우: 저장된 재무제표로 다시 계산
+            stored = build_fundamentals(fundamentals_store.load_statements(ticker_symbol))
+            fundamentals_store.save_metrics(ticker_symbol, stored)
+        if stored is not None and not fundamentals_store.needs_fetch(ticker_symbol):
+            return stored, {}
+    except sqlite3.Error as e:
+        print(f"Fundamentals store error for {ticker_symbol}: {e}")
+
+    statements, errors = fetch_statements(ticker_symbol)
+    if errors and stored is not None:
+        # 일부 조회 실패: 누락된 새 결과보다 저장된 결과가 나음 (다음 요청에서 다시 조회)
+        return stored, {}
+
+    financials_data = build_fundamentals(statements)
+    if not errors:
+        try:
+            fundamentals_store.save(ticker_symbol, statements, financials_data)
+        except sqlite3.Error as e:
+            print(f"Fundamentals store write error for {ticker_symbol}: {e}")
+    return financials_data, errors
+
+
+def build_fundamentals(statements):
+    """재무제표/추정치(이름 -> DataFrame)에서 연간/분기 지표 시계열 계산"""
+    financials_data = {"annual": [], "quarterly": []}
+
+    # Annual Data
+    annual_income = statements.get('financials', pd.DataFrame())
+    annual_cf = statements.get('cashflow', pd.DataFrame())
+    revenue_est = statements.get('revenue_estimate')
+    earnings_est = statements.get('earnings_estimate')
+
+    if not annual_income.empty:
+        years = annual_income.columns[:5]
+
+        # Historical Annual
+        for i in range(len(years)):
+            period_col = years[i]
+            prev_period_col = years[i+1] if i + 1 < len(years) else None
+
+            # CY Adjustment
+            cy_year = get_cy_year(period_col)
+            label = str(cy_year)
+
+            metrics = calculate_period_metrics(annual_income, annual_cf, period_col, prev_period_col, is_estimate=False, period_label=label)
+            financials_data["annual"].append(metrics)
+
+        # Estimates (Annual)
+        last_hist_cy = get_cy_year(years[0])
+
+        if revenue_est is not None and not revenue_est.empty and earnings_est is not None and not earnings_est.empty:
+            for period in revenue_est.index:
+                if 'y' in str(period):
+                    offset = 0
+                    if period == '0y': offset = 1
+                    elif period == '+1y': offset = 2
+                    elif period == '+2y': offset = 3
+                    elif period == '+3y': offset = 4
+                    elif period == '+4y': offset = 5
+                    else: continue
+
+                    est_year = last_hist_cy + offset
+                    label = f"{est_year}"
+
+                    rev_val = safe_float(revenue_est.loc[period, 'avg']) if 'avg' in revenue_est.columns else None
+                    eps_val = safe_float(earnings_est.loc[period, 'avg']) if 'avg' in earnings_est.columns else None
+
+                    if rev_val or eps_val:
+                        metrics = {
+                            "period": label + "E",
+                            "revenue": rev_val,
+                            "revenueGrowth": None,
+                            "gpm": None,
+                            "ebitdaMargin": None,
+                            "netIncome": None,
+                            "eps": eps_val,
+                            "epsGrowth": None,
+                            "freeCashFlow": None,
+                            "fcfGrowth": None,
+                            "isEstimate": True
+                        }
+                        financials_data["annual"].append(metrics)
+
+    # Sort annual (Oldest -> Newest)
+    financials_data["annual"].sort(key=lambda x: x['period'])
+
+    # Quarterly Data
+    quarterly_income = statements.get('quarterly_financials', pd.DataFrame())
+    quarterly_cash = statements.get('quarterly_cashflow', pd.DataFrame())
+
+    if not quarterly_income.empty:
+        columns = quarterly_income.columns
+        num_periods = min(8, len(columns))
+        historical_quarters = []
+
+        for i in range(num_periods):
+            period_col = columns[i]
+            prev_col = columns[i+1] if i + 1 < len(columns) else None
+
+            label = get_cy_q_label(period_col)
+
+            metrics = calculate_period_metrics(quarterly_income, quarterly_cash, period_col, prev_col, is_estimate=False, period_label=label)
+            historical_quarters.append(metrics)
+
+        # Estimates (Quarterly)
+        last_hist_label = historical_quarters[0]['period'] if historical_quarters else f"{datetime.now().year}-Q1"
+        try:
+            l_year, l_q = map(int, last_hist_label.replace('Q','').split('-'))
+        except:
+            l_year, l_q = datetime.now().year, 1
+
+        curr_y, curr_q = l_year, l_q
+
+        estimate_quarters = []
+        est_periods = ['0q', '+1q', '+2q', '+3q', '+4q']
+
+        if revenue_est is not None and not revenue_est.empty and earnings_est is not None:
+            for p in est_periods:
+                if p in revenue_est.index:
+                    curr_q += 1
+                    if curr_q > 4:
+                        curr_q = 1
+                        curr_y += 1
+
+                    label = f"{curr_y}-Q{curr_q}"
+
+                    rev_val = safe_float(revenue_est.loc[p, 'avg']) if 'avg' in revenue_est.columns else None
+                    eps_val = safe_float(earnings_est.loc[p, 'avg']) if 'avg' in earnings_est.columns else None
+
+                    if rev_val and eps_val:
+                        metrics = {
+                            "period": label + "E",
+                            "revenue": rev_val,
+                            "revenueGrowth": None,
+                            "gpm": None,
+                            "ebitdaMargin": None,
+                            "netIncome": None,
+                            "eps": eps_val,
+                            "epsGrowth": None,
+                            "freeCashFlow": None,
+                            "fcfGrowth": None,
+                            "isEstimate": True
+                        }
+                        estimate_quarters.append(metrics)
+
+        combined_quarters = list(reversed(historical_quarters)) + estimate_quarters
+        financials_data["quarterly"] = sorted(combined_quarters, key=lambda x: x['period'])
+
+    print(f"Financial time-series data: {len(financials_data['annual'])} annual, {len(financials_data['quarterly'])} quarterly")
+    return financials_data
+
+
+def fetch_ticker_news(ticker_symbol):
+    """yfinance 종목 뉴스 조회 (new structure: content nested inside each news item)"""
+    news_data = []
+    news_list = yf.Ticker(ticker_symbol).news
+    if news_list:
+        for item in news_list[:10]:  # Limit to 10 news items
+            # New yfinance structure: data is inside 'content' object
+            content = item.get('content', item)  # Fallback to item if no content
+
+            # Extract thumbnail URL from nested structure
+            thumbnail_url = ''
+            thumbnail_obj = content.get('thumbnail', {})
+            if thumbnail_obj:
+                resolutions = thumbnail_obj.get('resolutions', [])
+                if resolutions:
+                    thumbnail_url = resolutions[-1].get('url', '')
+
+            # Extract publisher from provider object
+            publisher = ''
+            provider = content.get('provider', {})
+            if provider:
+                publisher = provider.get('displayName', '')
+
+            # Extract link from clickThroughUrl or canonicalUrl
+            link = ''
+            click_url = content.get('clickThroughUrl', {})
+            if click_url:
+                link = click_url.get('url', '')
+            if not link:
+                canonical = content.get('canonicalUrl', {})
+                if canonical:
+                    link = canonical.get('url', '')
+
+            # Parse pubDate to timestamp
+            pub_time = 0
+            pub_date = content.get('pubDate', '')
+            if pub_date:
+                try:
+                    parsed = datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
+                    pub_time = int(parsed.timestamp())
+                except:
+                    pass
+
+            news_item = {
+                "title": content.get('title', ''),
+                "link": link,
+                "publisher": publisher,
+                "providerPublishTime": pub_time,
+                "thumbnail": thumbnail_url
+            }
+            news_data.append(news_item)
+        print(f"Fetched {len(news_data)} news items")
+    return news_data
+
+
+def fetch_profile(ticker_symbol):
+    """기업 프로필 조회 (설명은 한국어로 번역)"""
+    info = yf.Ticker(ticker_symbol).info
+
+    # Get description and translate to Korean
+    description_en = info.get('longBusinessSummary') or info.get('description', '')
+    description_ko = description_en  # Default to English
+
+    if description_en and TRANSLATION_AVAILABLE:
+        try:
+            description_ko = GoogleTranslator(source='en', target='ko').translate(description_en)
+            print(f"Description translated to Korean successfully")
+        except Exception as trans_err:
+            print(f"Translation error: {trans_err}")
+            # Keep original English description
+
+    return build_meta(ticker_symbol, info, description_ko, description_en)
+
+
+def build_meta(ticker_symbol, info, description_ko='', description_en=''):
+    """ticker.info에서 화면 표시용 메타데이터 구성"""
+    return {
+        "name": info.get('shortName', ticker_symbol),
+        "description": description_ko,
+        "descriptionEn": description_en,
+        "marketCap": str(info.get('marketCap', '-')),
+        "sector": info.get('sector', '-'),
+        "peRatio": str(info.get('forwardPE', info.get('trailingPE', '-'))),
+        "website": info.get('website', '#'),
+        "irWebsite": info.get('irWebsite', '#')
+    }
+
+
+def get_prices(ticker_symbol, date_range, interval, fmt='rows', indicators=None, max_points=None):
+    """가격 데이터 (캐시 우선)"""
+    key = f"prices:{ticker_symbol}:{date_range}:{interval}"
+    if fmt != 'rows':
+        key += f":{fmt}"
+    if indicators:
+        key += f":{indicators}"
+    if max_points:
+        key += f":mp{max_points}"
+    return cache.get_or_compute(
+        key,
+        lambda: fetch_prices(ticker_symbol, date_range, interval, fmt, indicators, max_points)
+    )
+
+
+def get_indicators_param(args):
+    """indicators 파라미터 정규화 (없으면 None, 잘못된 지표명은 ValueError)"""
+    spec = args.get('indicators', '').strip()
+    if not spec:
+        return None
+    return ','.join(indicator.name for indicator in parse_indicators(spec))
+
+
+def get_max_points_param(args):
+    """max_points 파라미터 (없으면 None, MIN_POINTS 미만이거나 숫자가 아니면 ValueError)"""
+    value = args.get('max_points', '').strip()
+    if not value:
+        return None
+    max_points = int(value)
+    if max_points < MIN_POINTS:
+        raise ValueError(f"max_points must be at least {MIN_POINTS}")
+    return max_points
+
+
+def get_fundamentals(ticker_symbol):
+    """재무 데이터 (캐시 우선)"""
+    complete = {}
+
+    def compute():
+        data, errors = fetch_fundamentals(ticker_symbol)
+        complete['ok'] = not errors
+        return data
+
+    # 일부 항목이 누락된 결과는 장기 캐시에 넣지 않음
+    return cache.get_or_compute(
+        f"fundamentals:{ticker_symbol}", compute,
+        should_cache=lambda data: complete.get('ok', False)
+    )
+
+
+def get_ticker_news(ticker_symbol):
+    """종목 뉴스 (캐시 우선)"""
+    return cache.get_or_compute(f"ticker_news:{ticker_symbol}", lambda: fetch_ticker_news(ticker_symbol))
+
+
+def get_profile(ticker_symbol):
+    """기업 프로필 (캐시 우선)"""
+    return cache.get_or_compute(f"profile:{ticker_symbol}", lambda: fetch_profile(ticker_symbol))
+
+
+@app.route('/api/historical/prices')
+def historical_prices():
+    """가격/거래량/이동평균 차트 데이터만 반환."""
+    try:
+        ticker_symbol = request.args.get('ticker', 'AAPL')
+        date_range = request.args.get('range', '1y')
+        interval = request.args.get('interval', 'd')
+        fmt = get_price_format(request.args)
+        try:
+            indicators = get_indicators_param(request.args)
+            max_points = get_max_points_param(request.args)
+        except ValueError as e:
+            return json_response({"error": str(e)}), 400
+
+        data = get_prices(ticker_symbol, date_range, interval, fmt, indicators, max_points)
+        if data is None:
+            return json_response({"error": "No data found"}), 404
+
+        return json_response(data)
+
+    except Exception as e:
+        print(f"Prices Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return json_response({"error": str(e)}), 500
+
+
+@app.route('/api/fundamentals')
+def fundamentals():
+    """연간/분기 재무 지표 반환."""
+    try:
+        ticker_symbol = request.args.get('ticker', 'AAPL')
+        return json_response({
+            "ticker": ticker_symbol,
+            "financials": get_fundamentals(ticker_symbol)
+        })
+
+    except Exception as e:
+        print(f"Fundamentals Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return json_response({"error": str(e)}), 500
+
+
+@app.route('/api/ticker-news')
+def ticker_news():
+    """종목 관련 뉴스 반환."""
+    try:
+        ticker_symbol = request.args.get('ticker', 'AAPL')
+        return json_response({
+            "ticker": ticker_symbol,
+            "news": get_ticker_news(ticker_symbol)
+        })
+
+    except Exception as e:
+        print(f"Ticker News Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return json_response({"error": str(e)}), 500
+
+
+@app.route('/api/profile')
+def profile():
+    """기업 프로필(이름, 설명, 섹터, 시가총액 등) 반환."""
+    try:
+        ticker_symbol = request.args.get('ticker', 'AAPL')
+        return json_response({
+            "ticker": ticker_symbol,
+            "meta": get_profile(ticker_symbol)
+        })
+
+    except Exception as e:
+        print(f"Profile Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return json_response({"error": str(e)}), 500
+
+
 @app.route('/api/historical')
 def historical():
+    """가격 + 프로필 + 재무 + 뉴스 통합 응답 (각 리소스 캐시에서 조합)."""
     try:
         ticker_symbol = request.args.get('ticker', 'AAPL')
         date_range = request.args.get('range', '1y')
         interval = request.args.get('interval', 'd')
-        
-        print(f"Fetching {ticker_symbol} data...")
+        fmt = get_price_format(request.args)
+        try:
+            indicators = get_indicators_param(request.args)
+            max_points = get_max_points_param(request.args)
+        except ValueError as e:
+            return json_response({"error": str(e)}), 400
 
-        # Calculate start date
-        today = datetime.now()
-        if date_range == '1m': start = (today - timedelta(days=30))
-        elif date_range == '3m': start = (today - timedelta(days=90))
-        elif date_range == '6m': start = (today - timedelta(days=180))
-        elif date_range == '1y': start = (today - timedelta(days=365))
-        elif date_range == '5y': start = (today - timedelta(days=365*5))
-        elif date_range == 'max': start = datetime(1980, 1, 1)
-        else: start = (today - timedelta(days=365))
-        
-        start_date = start.strftime('%Y-%m-%d')
+        print(f"Fetching {ticker_symbol} data...")
 
-        # 1. Price Data
-        df = fdr.DataReader(ticker_symbol, start_date)
-        
-        if df.empty:
-            return jsonify({"error": "No data found"}), 404
+        # 가격/프로필/뉴스는 공용 풀에서 동시에 조회하고, 그동안 요청 스레드는
+        # 재무 데이터(내부에서 재무제표들을 다시 동시 조회)를 가져옴
+        pending = submit_all({
+            'prices': lambda: get_prices(ticker_symbol, date_range, interval, fmt, indicators, max_points),
+            'meta': lambda: get_profile(ticker_symbol),
+            'news': lambda: get_ticker_news(ticker_symbol)
+        })
 
-        last_row = df.iloc[-1]
-        if len(df) > 1:
-            prev_close = df.iloc[-2]['Close']
-        else:
-            prev_close = last_row['Open']
-            
-        current_price = float(last_row['Close'])
-        change = float(current_price - prev_close)
-        change_percent = float((change / prev_close) * 100) if prev_close != 0 else 0
-        
-        resampled_df = df
-        if interval == 'w':
-            resampled_df = df.resample('W').agg({'Open':'first','High':'max','Low':'min','Close':'last','Volume':'sum'}).dropna()
-        elif interval == 'm':
-            resampled_df = df.resample('M').agg({'Open':'first','High':'max','Low':'min','Close':'last','Volume':'sum'}).dropna()
-
-        # Calculate Moving Averages
-        resampled_df['MA10'] = resampled_df['Close'].rolling(window=10).mean()
-        resampled_df['MA20'] = resampled_df['Close'].rolling(window=20).mean()
-        resampled_df['MA50'] = resampled_df['Close'].rolling(window=50).mean()
-
-        ohlc_data = []
-        volume_data = []
-        ma10_data = []
-        ma20_data = []
-        ma50_data = []
-        
-        for index, row in resampled_df.iterrows():
-            date_str = index.strftime('%Y-%m-%d')
-            ohlc_data.append({
-                "x": date_str,
-                "o": float(row['Open']), "h": float(row['High']), "l": float(row['Low']), "c": float(row['Close'])
-            })
-            volume_data.append({
-                "x": date_str,
-                "y": float(row['Volume']) if pd.notna(row['Volume']) else 0,
-                "color": '#22c55e' if row['Close'] >= row['Open'] else '#ef4444'
-            })
-            ma10_data.append({"x": date_str, "y": float(row['MA10']) if pd.notna(row['MA10']) else None})
-            ma20_data.append({"x": date_str, "y": float(row['MA20']) if pd.notna(row['MA20']) else None})
-            ma50_data.append({"x": date_str, "y": float(row['MA50']) if pd.notna(row['MA50']) else None})
-            
-
-        # 2. Rich Metadata via yfinance
-        ticker = yf.Ticker(ticker_symbol)
-        info = {}
         financials_data = {"annual": [], "quarterly": []}
-        
+        missing = []
         try:
-            info = ticker.info
-            
-            # Safe float helper
-            def safe_float(val):
-                if val is None: return None
-                try:
-                    f = float(val)
-                    if math.isnan(f) or math.isinf(f): return None
-                    return f
-                except: return None
-            
-            # CY (Calendar Year) conversion helpers
-            def get_cy_year(d):
-                # If fiscal year ends in Jan-Mar, treat as previous calendar year
-                if d.month <= 3: return d.year - 1
-                return d.year
-            
-            def get_cy_q_label(d):
-                # Adjust roughly to represent the calendar quarter based on end date
-                mid = d - timedelta(days=45)
-                q = (mid.month - 1) // 3 + 1
-                return f"{mid.year}-Q{q}"
-
-            # Helper function to calculate metrics for a period
-            def calculate_period_metrics(income_stmt, cash_flow, period_col, prev_period_col=None, is_estimate=False, period_label=None):
-                # Extract data
-                revenue = safe_float(income_stmt.loc['Total Revenue', period_col]) if 'Total Revenue' in income_stmt.index else None
-                gross_profit = safe_float(income_stmt.loc['Gross Profit', period_col]) if 'Gross Profit' in income_stmt.index else None
-                ebitda = safe_float(income_stmt.loc['EBITDA', period_col]) if 'EBITDA' in income_stmt.index else None
-                if ebitda is None:
-                    ebitda = safe_float(income_stmt.loc['Normalized EBITDA', period_col]) if 'Normalized EBITDA' in income_stmt.index else None
-                net_income = safe_float(income_stmt.loc['Net Income', period_col]) if 'Net Income' in income_stmt.index else None
-                
-                # OPEX 세부 항목
-                operating_expense = safe_float(income_stmt.loc['Operating Expense', period_col]) if 'Operating Expense' in income_stmt.index else None
-                rd_expense = safe_float(income_stmt.loc['Research And Development', period_col]) if 'Research And Development' in income_stmt.index else None
-                sga_expense = safe_float(income_stmt.loc['Selling General And Administration', period_col]) if 'Selling General And Administration' in income_stmt.index else None
-                
-                # Operating Income
-                operating_income = safe_float(income_stmt.loc['Operating Income', period_col]) if 'Operating Income' in income_stmt.index else None
-                
-                # Cash flow data
-                operating_cf = None
-                capex = None
-                if period_col in cash_flow.columns:
-                    operating_cf = safe_float(cash_flow.loc['Operating Cash Flow', period_col]) if 'Operating Cash Flow' in cash_flow.index else None
-                    capex = safe_float(cash_flow.loc['Capital Expenditure', period_col]) if 'Capital Expenditure' in cash_flow.index else None
-                
-                # Calculate FCF
-                free_cash_flow = None
-                if operating_cf is not None and capex is not None:
-                    free_cash_flow = operating_cf + capex
-                
-                # Get EPS
-                eps = safe_float(income_stmt.loc['Basic EPS', period_col]) if 'Basic EPS' in income_stmt.index else None
-                if eps is None:
-                    eps = safe_float(income_stmt.loc['Diluted EPS', period_col]) if 'Diluted EPS' in income_stmt.index else None
-                
-                # Calculate margins
-                gpm = (gross_profit / revenue * 100) if (revenue and gross_profit and revenue != 0) else None
-                ebitda_margin = (ebitda / revenue * 100) if (revenue and ebitda and revenue != 0) else None
-                opm = (operating_income / revenue * 100) if (revenue and operating_income and revenue != 0) else None
-                fcf_margin = (free_cash_flow / revenue * 100) if (revenue and free_cash_flow and revenue != 0) else None
-                
-                # OPEX as % of revenue
-                rd_pct = (rd_expense / revenue * 100) if (revenue and rd_expense and revenue != 0) else None
-                sga_pct = (sga_expense / revenue * 100) if (revenue and sga_expense and revenue != 0) else None
-                opex_pct = (operating_expense / revenue * 100) if (revenue and operating_expense and revenue != 0) else None
-                
-                # Calculate YoY Growth
-                revenue_growth = None
-                eps_growth = None
-                fcf_growth = None
-                
-                if prev_period_col is not None and prev_period_col in income_stmt.columns:
-                    prev_revenue = safe_float(income_stmt.loc['Total Revenue', prev_period_col]) if 'Total Revenue' in income_stmt.index else None
-                    if revenue and prev_revenue and prev_revenue != 0:
-                        revenue_growth = ((revenue - prev_revenue) / abs(prev_revenue) * 100)
-                    
-                    prev_eps = safe_float(income_stmt.loc['Basic EPS', prev_period_col]) if 'Basic EPS' in income_stmt.index else None
-                    if prev_eps is None:
-                        prev_eps = safe_float(income_stmt.loc['Diluted EPS', prev_period_col]) if 'Diluted EPS' in income_stmt.index else None
-                    if eps and prev_eps and prev_eps != 0:
-                        eps_growth = ((eps - prev_eps) / abs(prev_eps) * 100)
-                
-                if prev_period_col is not None and prev_period_col in cash_flow.columns:
-                    prev_operating_cf = safe_float(cash_flow.loc['Operating Cash Flow', prev_period_col]) if 'Operating Cash Flow' in cash_flow.index else None
-                    prev_capex = safe_float(cash_flow.loc['Capital Expenditure', prev_period_col]) if 'Capital Expenditure' in cash_flow.index else None
-                    if prev_operating_cf is not None and prev_capex is not None:
-                        prev_fcf = prev_operating_cf + prev_capex
-                        if free_cash_flow and prev_fcf and prev_fcf != 0:
-                            fcf_growth = ((free_cash_flow - prev_fcf) / abs(prev_fcf) * 100)
-                
-                if period_label:
-                    year_str = period_label
-                else:
-                    year_str = str(period_col.year) if hasattr(period_col, 'year') else str(period_col)
-                    
-                if is_estimate and not year_str.endswith('E'):
-                    year_str += "E"
-                
-                return {
-                    "period": year_str,
-                    "revenue": revenue,
-                    "revenueGrowth": revenue_growth,
-                    "gpm": gpm,
-                    "opm": opm,
-                    "ebitdaMargin": ebitda_margin,
-                    "netIncome": net_income,
-                    "eps": eps,
-                    "epsGrowth": eps_growth,
-                    "freeCashFlow": free_cash_flow,
-                    "fcfGrowth": fcf_growth,
-                    "fcfMargin": fcf_margin,
-                    "operatingExpense": operating_expense,
-                    "rdExpense": rd_expense,
-                    "sgaExpense": sga_expense,
-                    "rdPct": rd_pct,
-                    "sgaPct": sga_pct,
-                    "opexPct": opex_pct,
-                    "isEstimate": is_estimate
-                }
-
-            # Annual Data
-            annual_income = ticker.financials
-            annual_cf = ticker.cashflow
-            
-            if not annual_income.empty:
-                years = annual_income.columns[:5]
-                
-                # Historical Annual
-                for i in range(len(years)):
-                    period_col = years[i]
-                    prev_period_col = years[i+1] if i + 1 < len(years) else None
-                    
-                    # CY Adjustment
-                    cy_year = get_cy_year(period_col)
-                    label = str(cy_year)
-                    
-                    metrics = calculate_period_metrics(annual_income, annual_cf, period_col, prev_period_col, is_estimate=False, period_label=label)
-                    financials_data["annual"].append(metrics)
-                
-                # Estimates (Annual)
-                last_hist_cy = get_cy_year(years[0])
-                
-                revenue_est = ticker.revenue_estimate
-                earnings_est = ticker.earnings_estimate
-
-                if revenue_est is not None and not revenue_est.empty and earnings_est is not None and not earnings_est.empty:
-                    for period in revenue_est.index:
-                        if 'y' in str(period):
-                            offset = 0
-                            if period == '0y': offset = 1 
-                            elif period == '+1y': offset = 2
-                            elif period == '+2y': offset = 3
-                            elif period == '+3y': offset = 4
-                            elif period == '+4y': offset = 5
-                            else: continue
-                            
-                            est_year = last_hist_cy + offset
-                            label = f"{est_year}"
-                            
-                            rev_val = safe_float(revenue_est.loc[period, 'avg']) if 'avg' in revenue_est.columns else None
-                            eps_val = safe_float(earnings_est.loc[period, 'avg']) if 'avg' in earnings_est.columns else None
-                            
-                            if rev_val or eps_val:
-                                metrics = {
-                                    "period": label + "E",
-                                    "revenue": rev_val,
-                                    "revenueGrowth": None, 
-                                    "gpm": None,
-                                    "ebitdaMargin": None,
-                                    "netIncome": None,
-                                    "eps": eps_val,
-                                    "epsGrowth": None,
-                                    "freeCashFlow": None,
-                                    "fcfGrowth": None,
-                                    "isEstimate": True
-                                }
-                                financials_data["annual"].append(metrics)
-            
-            # Sort annual (Oldest -> Newest)
-            financials_data["annual"].sort(key=lambda x: x['period'])
-
-            # Quarterly Data
-            quarterly_income = ticker.quarterly_financials
-            quarterly_cash = ticker.quarterly_cashflow
-                                          
-            if not quarterly_income.empty:
-                columns = quarterly_income.columns
-                num_periods = min(8, len(columns))
-                historical_quarters = []
-                
-                for i in range(num_periods):
-                    period_col = columns[i]
-                    prev_col = columns[i+1] if i + 1 < len(columns) else None
-                    
-                    label = get_cy_q_label(period_col)
-                    
-                    metrics = calculate_period_metrics(quarterly_income, quarterly_cash, period_col, prev_col, is_estimate=False, period_label=label)
-                    historical_quarters.append(metrics)
-            
-                # Estimates (Quarterly)
-                last_hist_label = historical_quarters[0]['period'] if historical_quarters else f"{datetime.now().year}-Q1"
-                try:
-                    l_year, l_q = map(int, last_hist_label.replace('Q','').split('-'))
-                except:
-                    l_year, l_q = datetime.now().year, 1 
-                
-                curr_y, curr_q = l_year, l_q
-                
-                estimate_quarters = []
-                est_periods = ['0q', '+1q', '+2q', '+3q', '+4q']
-                
-                if revenue_est is not None and not revenue_est.empty and earnings_est is not None:
-                    for p in est_periods:
-                        if p in revenue_est.index:
-                            curr_q += 1
-                            if curr_q > 4:
-                                curr_q = 1
-                                curr_y += 1
-                            
-                            label = f"{curr_y}-Q{curr_q}"
-                            
-                            rev_val = safe_float(revenue_est.loc[p, 'avg']) if 'avg' in revenue_est.columns else None
-                            eps_val = safe_float(earnings_est.loc[p, 'avg']) if 'avg' in earnings_est.columns else None
-                            
-                            if rev_val and eps_val:
-                                metrics = {
-                                    "period": label + "E",
-                                    "revenue": rev_val,
-                                    "revenueGrowth": None,
-                                    "gpm": None,
-                                    "ebitdaMargin": None,
-                                    "netIncome": None,
-                                    "eps": eps_val,
-                                    "epsGrowth": None,
-                                    "freeCashFlow": None,
-                                    "fcfGrowth": None,
-                                    "isEstimate": True
-                                }
-                                estimate_quarters.append(metrics)
-
-                combined_quarters = list(reversed(historical_quarters)) + estimate_quarters
-                financials_data["quarterly"] = sorted(combined_quarters, key=lambda x: x['period'])
-            
-            print(f"Financial time-series data: {len(financials_data['annual'])} annual, {len(financials_data['quarterly'])} quarterly")
-
+            financials_data = get_fundamentals(ticker_symbol)
         except Exception as e:
             print(f"YFinance Error: {e}")
-            import traceback
-            traceback.print_exc()
+            missing.append('financials')
 
-        # Get news from yfinance (new structure: content nested inside each news item)
-        news_data = []
-        try:
-            news_list = ticker.news
-            if news_list:
-                for item in news_list[:10]:  # Limit to 10 news items
-                    # New yfinance structure: data is inside 'content' object
-                    content = item.get('content', item)  # Fallback to item if no content
-                    
-                    # Extract thumbnail URL from nested structure
-                    thumbnail_url = ''
-                    thumbnail_obj = content.get('thumbnail', {})
-                    if thumbnail_obj:
-                        resolutions = thumbnail_obj.get('resolutions', [])
-                        if resolutions:
-                            thumbnail_url = resolutions[-1].get('url', '')
-                    
-                    # Extract publisher from provider object
-                    publisher = ''
-                    provider = content.get('provider', {})
-                    if provider:
-                        publisher = provider.get('displayName', '')
-                    
-                    # Extract link from clickThroughUrl or canonicalUrl
-                    link = ''
-                    click_url = content.get('clickThroughUrl', {})
-                    if click_url:
-                        link = click_url.get('url', '')
-                    if not link:
-                        canonical = content.get('canonicalUrl', {})
-                        if canonical:
-                            link = canonical.get('url', '')
-                    
-                    # Parse pubDate to timestamp
-                    pub_time = 0
-                    pub_date = content.get('pubDate', '')
-                    if pub_date:
-                        try:
-                            from datetime import datetime as dt
-                            parsed = dt.fromisoformat(pub_date.replace('Z', '+00:00'))
-                            pub_time = int(parsed.timestamp())
-                        except:
-                            pass
-                    
-                    news_item = {
-                        "title": content.get('title', ''),
-                        "link": link,
-                        "publisher": publisher,
-                        "providerPublishTime": pub_time,
-                        "thumbnail": thumbnail_url
-                    }
-                    news_data.append(news_item)
-                print(f"Fetched {len(news_data)} news items")
-        except Exception as news_err:
-            print(f"News fetch error: {news_err}")
-            import traceback
-            traceback.print_exc()
-
-        # Get description and translate to Korean
-        description_en = info.get('longBusinessSummary') or info.get('description', '')
-        description_ko = description_en  # Default to English
-        
-        if description_en and TRANSLATION_AVAILABLE:
-            try:
-                description_ko = GoogleTranslator(source='en', target='ko').translate(description_en)
-                print(f"Description translated to Korean successfully")
-            except Exception as trans_err:
-                print(f"Translation error: {trans_err}")
-                # Keep original English description
-
-        meta = {
-            "name": info.get('shortName', ticker_symbol),
-            "description": description_ko,
-            "descriptionEn": description_en,
-            "marketCap": str(info.get('marketCap', '-')), 
-            "sector": info.get('sector', '-'),
-            "peRatio": str(info.get('forwardPE', info.get('trailingPE', '-'))),
-            "website": info.get('website', '#'),
-            "irWebsite": info.get('irWebsite', '#')
-        }
+        results, errors = collect(pending)
+        missing.extend(errors.keys())
+
+        # 1. Price Data (가격이 없으면 응답 불가)
+        if 'prices' in errors:
+            raise RuntimeError(f"Price fetch failed: {errors['prices']}")
+        price_data = results['prices']
+        if price_data is None:
+            return json_response({"error": "No data found"}), 404
+
+        # 2. Rich Metadata / News (실패하거나 지연되면 기본값으로 부분 응답)
+        meta = results.get('meta') or build_meta(ticker_symbol, {})
+        news_data = results.get('news', [])
 
         response_data = {
-            "ticker": ticker_symbol,
-            "range": date_range,
-            "interval": interval,
-            "current_price": current_price,
-            "change": change,
-            "change_percent": round(change_percent, 2),
-            "prices": resampled_df['Close'].tolist(),
-            "labels": resampled_df.index.strftime('%Y-%m-%d').tolist(),
-            "ohlc": ohlc_data,
-            "volume": volume_data,
-            "ma10": ma10_data,
-            "ma20": ma20_data,
-            "ma50": ma50_data,
+            **price_data,
             "meta": meta,
             "financials": financials_data,
-            "news": news_data
+            "news": news_data,
+            "missing": missing
         }
-        
-        return jsonify(response_data)
+
+        return json_response(response_data)
 
     except Exception as e:
         print(f"Error: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
+
+
+# 한 번의 /api/quotes 요청에서 조회 가능한 최대 종목 수
+MAX_QUOTE_TICKERS = 100
+
+def get_quote_names(tickers):
+    """종목명 조회 (종목 메타데이터 캐시를 공유하고 누락분만 공용 풀에서 조회)"""
+    meta = get_stock_meta(tickers)
+    return {ticker_symbol: meta[ticker_symbol]['name'] for ticker_symbol in tickers}
+
+
+@app.route('/api/quotes')
+def quotes():
+    """여러 종목의 현재가/변동률/종목명을 한 번에 반환 (Watchlist용)."""
+
+    try:
+        tickers_param = request.args.get('tickers', '')
+        tickers = [t.strip().upper() for t in tickers_param.split(',') if t.strip()]
+        tickers = list(dict.fromkeys(tickers))[:MAX_QUOTE_TICKERS]
+
+        if not tickers:
+            return json_response({"error": "tickers is required"}), 400
+
+        results = {}
+        missing = []
+        for ticker_symbol in tickers:
+            cached = cache.get(f"quote:{ticker_symbol}")
+            if cached:
+                results[ticker_symbol] = cached
+            else:
+                missing.append(ticker_symbol)
+
+        if missing:
+            # 1. 누락 종목 일괄 다운로드 (요청 1회)
+            closes = download_history(missing, period='5d')['Close']
+            fresh = summarize_quotes(closes)
+
+            # 2. Yahoo에서 찾지 못한 종목은 FDR로 개별 조회 (예: 국내 종목 코드)
+            start_date = (datetime.now() - timedelta(days=10)).strftime('%Y-%m-%d')
+            for ticker_symbol in missing:
+                if ticker_symbol in fresh:
+                    continue
+                try:
+                    df = fdr.DataReader(ticker_symbol, start_date)
+                    if not df.empty:
+                        fresh.update(summarize_quotes(df[['Close']].rename(columns={'Close': ticker_symbol})))
+                except Exception as e:
+                    print(f"Quote fallback error for {ticker_symbol}: {e}")
+
+            names = get_quote_names(list(fresh.keys()))
+            for ticker_symbol, quote in fresh.items():
+                quote = {'ticker': ticker_symbol, 'name': names.get(ticker_symbol, ticker_symbol), **quote}
+                cache.set(f"quote:{ticker_symbol}", quote)
+                results[ticker_symbol] = quote
+
+        return json_response({
+            'success': True,
+            'quotes': results,
+            'missing': [t for t in tickers if t not in results]
+        })
+
+    except Exception as e:
+        print(f"Quotes Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return json_response({"error": str(e)}), 500
+
 
 @app.route('/api/earningcalls')
 def earningcalls():
@@ -501,7 +874,7 @@ def earningcalls():
     try:
         ticker = request.args.get('ticker', '').upper()
         if not ticker:
-            return jsonify({"error": "Ticker is required"}), 400
+            return json_response({"error": "Ticker is required"}), 400
         
         # Base folder for earnings calls
         base_folder = os.path.join(os.path.dirname(__file__), 'earningcall', ticker)
@@ -510,7 +883,8 @@ def earningcalls():
         if os.path.exists(base_folder) and os.path.isdir(base_folder):
             for filename in sorted(os.listdir(base_folder), reverse=True):
                 filepath = os.path.join(base_folder, filename)
-                if os.path.isfile(filepath):
+                # 예전 버전이 PDF 옆에 저장하던 분석 캐시(*_analysis.json)는 목록에서 제외
+                if os.path.isfile(filepath) and not filename.endswith('_analysis.json'):
                     # Extract date from filename (e.g., 2024-Q4.pdf -> 2024 Q4)
                     name_without_ext = os.path.splitext(filename)[0]
                     
@@ -520,38 +894,60 @@ def earningcalls():
                         "link": f"/earningcall/{ticker}/{filename}"
                     })
         
-        return jsonify({
+        return json_response({
             "ticker": ticker,
             "files": files
         })
 
     except Exception as e:
         print(f"Error listing earnings calls: {e}")
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 @app.route('/api/ai-analysis')
 def ai_analysis():
-    """AI-powered company analysis using Gemini API."""
+    """
+    AI-powered company analysis using Gemini API.
+    stream=true면 카테고리 분석을 동시에 실행하며 생성되는 텍스트를 SSE 이벤트로 바로 전송
+    (start -> delta(텍스트 조각) / category(카테고리 완료) -> done).
+    """
     try:
-        from api.ai_analysis import analyze_company, analyze_all
+        from api.ai_analysis import ANALYSIS_CATEGORIES, PROMPTS, analyze_company, analyze_all, iter_analysis_events
         
         ticker = request.args.get('ticker', '').upper()
         company_name = request.args.get('name', ticker)
         category = request.args.get('category', '')  # Optional: specific category
+        stream = request.args.get('stream', '').lower() == 'true'
+        force_refresh = request.args.get('refresh', '').lower() == 'true'  # 캐시 무시하고 재분석
         
         if not ticker:
-            return jsonify({"error": "Ticker is required"}), 400
+            return json_response({"error": "Ticker is required"}), 400
         
         print(f"AI Analysis requested for {ticker} ({company_name}), category: {category or 'all'}")
         
+        if stream:
+            # categories=a,b,c 로 여러 카테고리 지정 가능 (기본: 전체 분석 카테고리)
+            categories = [c.strip() for c in request.args.get('categories', category).split(',') if c.strip()]
+            categories = list(dict.fromkeys(categories)) or ANALYSIS_CATEGORIES
+            unknown = [c for c in categories if c not in PROMPTS]
+            if unknown:
+                return json_response({"error": f"Unknown category: {', '.join(unknown)}"}), 400
+
+            def events():
+                yield sse_event({"ticker": ticker, "company_name": company_name, "categories": categories}, event='start')
+                for event, payload in iter_analysis_events(ticker, company_name, categories, force_refresh):
+                    yield sse_event(payload, event=event)
+                yield sse_event({"success": True}, event='done')
+
+            return sse_response(events())
+        
         if category:
             # Single category analysis
-            result = analyze_company(ticker, company_name, category)
-            return jsonify(result)
+            result = analyze_company(ticker, company_name, category, force_refresh)
+            return json_response(result)
         else:
             # All categories
-            results = analyze_all(ticker, company_name)
-            return jsonify({
+            results = analyze_all(ticker, company_name, force_refresh=force_refresh)
+            return json_response({
                 "success": True,
                 "ticker": ticker,
                 "company_name": company_name,
@@ -562,46 +958,59 @@ def ai_analysis():
         print(f"AI Analysis Error: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 
 @app.route('/api/analyze-earningcall')
 def analyze_earningcall():
-    """어닝콜 PDF를 분석하여 투자 리포트를 생성합니다."""
+    """
+    어닝콜 PDF를 분석하여 투자 리포트를 생성합니다.
+    stream=true면 생성되는 텍스트를 SSE로 바로 전송 (start -> delta(텍스트 조각) -> result).
+    """
     try:
-        from api.ai_analysis import analyze_earnings_call
+        from api.ai_analysis import analyze_earnings_call, iter_earnings_call
         
         ticker = request.args.get('ticker', '').upper()
         filename = request.args.get('filename', '')
         force_refresh = request.args.get('refresh', '').lower() == 'true'
+        stream = request.args.get('stream', '').lower() == 'true'
         
         if not ticker:
-            return jsonify({"error": "Ticker is required"}), 400
+            return json_response({"error": "Ticker is required"}), 400
         if not filename:
-            return jsonify({"error": "Filename is required"}), 400
+            return json_response({"error": "Filename is required"}), 400
         
         # PDF 파일 경로 구성
         base_folder = os.path.join(os.path.dirname(__file__), 'earningcall', ticker)
         pdf_path = os.path.join(base_folder, filename)
         
         if not os.path.exists(pdf_path):
-            return jsonify({"error": f"File not found: {filename}"}), 404
+            return json_response({"error": f"File not found: {filename}"}), 404
         
         # 파일명에서 기간 추출 (예: 2024-Q4.pdf -> 2024 Q4)
         period = os.path.splitext(filename)[0].replace('-', ' ')
         
         print(f"Analyzing earnings call: {ticker} - {period} (refresh={force_refresh})")
         
+        if stream:
+            def events():
+                yield sse_event({"ticker": ticker, "period": period}, event='start')
+                for event, payload in iter_earnings_call(ticker, pdf_path, period, force_refresh):
+                    yield sse_event({"text": payload} if event == 'delta' else payload, event=event)
+                yield sse_event({"success": True}, event='done')
+
+            return sse_response(events())
+        
         # 분석 실행 (캐시 또는 새로 분석)
         result = analyze_earnings_call(ticker, pdf_path, period, force_refresh)
         
-        return jsonify(result)
+        return json_response(result)
     
     except Exception as e:
         print(f"Earnings Call Analysis Error: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 
 @app.route('/api/notion-status')
@@ -609,11 +1018,11 @@ def notion_status():
     """노션 API 설정 상태를 확인합니다."""
     try:
         from api.notion_export import is_notion_configured
-        return jsonify({
+        return json_response({
             "configured": is_notion_configured()
         })
     except Exception as e:
-        return jsonify({"configured": False, "error": str(e)})
+        return json_response({"configured": False, "error": str(e)})
 
 
 @app.route('/api/export-to-notion', methods=['POST'])
@@ -623,7 +1032,7 @@ def export_to_notion_endpoint():
         from api.notion_export import export_to_notion, is_notion_configured
         
         if not is_notion_configured():
-            return jsonify({
+            return json_response({
                 "success": False,
                 "error": "Notion API가 설정되지 않았습니다. 환경변수를 설정해주세요."
             }), 400
@@ -635,16 +1044,16 @@ def export_to_notion_endpoint():
         analyzed_at = data.get('analyzed_at', '')
         
         if not ticker or not content:
-            return jsonify({"error": "ticker와 content는 필수입니다."}), 400
+            return json_response({"error": "ticker와 content는 필수입니다."}), 400
         
         result = export_to_notion(ticker, period, content, analyzed_at)
-        return jsonify(result)
+        return json_response(result)
         
     except Exception as e:
         print(f"Notion Export Error: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 
 # ============================================
@@ -698,273 +1107,354 @@ SECTOR_STOCKS = {
 }
 
 
+def compute_market_overview():
+    """주요 시장 지수 데이터 및 당일 변동률 계산 (전체 지수를 한 번에 다운로드)."""
+    today = datetime.now()
+    closes = download_history(list(MARKET_INDICES.values()), period='1mo')['Close']
+    quotes = summarize_quotes(closes)
+
+    results = {}
+    for name, ticker_symbol in MARKET_INDICES.items():
+        quote = quotes.get(ticker_symbol)
+        if quote is None:
+            print(f"Error fetching {name}: no data")
+            continue
+
+        # 차트용 데이터 (최근 30일)
+        series = closes[ticker_symbol].dropna()
+        chart_data = encode_xy(encode_dates(series.index), series, x_key='date', y_key='close')
+
+        results[name] = {
+            'ticker': ticker_symbol,
+            'name': name,
+            'price': quote['price'],
+            'change': quote['change'],
+            'changePct': quote['changePct'],
+            'chart': chart_data
+        }
+
+    return {
+        'success': True,
+        'date': today.strftime('%Y-%m-%d'),
+        'indices': results
+    }
+
+
 @app.route('/api/market-overview')
 def market_overview():
     """주요 시장 지수 데이터 및 당일 변동률 반환."""
-    # 캐시 확인
-    cache_key = 'market_overview'
-    cached = get_cached(cache_key)
-    if cached:
-        return jsonify(cached)
-    
     try:
-        results = {}
-        today = datetime.now()
-        start_date = (today - timedelta(days=30)).strftime('%Y-%m-%d')
-        
-        for name, ticker_symbol in MARKET_INDICES.items():
-            try:
-                ticker = yf.Ticker(ticker_symbol)
-                hist = ticker.history(period='1mo')
-                
-                if hist.empty:
-                    continue
-                
-                current_price = float(hist['Close'].iloc[-1])
-                prev_close = float(hist['Close'].iloc[-2]) if len(hist) > 1 else current_price
-                change = current_price - prev_close
-                change_pct = (change / prev_close * 100) if prev_close != 0 else 0
-                
-                # 차트용 데이터 (최근 30일)
-                chart_data = []
-                for idx, row in hist.iterrows():
-                    chart_data.append({
-                        'date': idx.strftime('%Y-%m-%d'),
-                        'close': float(row['Close'])
-                    })
-                
-                results[name] = {
-                    'ticker': ticker_symbol,
-                    'name': name,
-                    'price': current_price,
-                    'change': change,
-                    'changePct': round(change_pct, 2),
-                    'chart': chart_data
-                }
-            except Exception as e:
-                print(f"Error fetching {name}: {e}")
-                continue
-        
-        result = {
-            'success': True,
-            'date': today.strftime('%Y-%m-%d'),
-            'indices': results
-        }
-        
-        # 캐시에 저장
-        set_cache(cache_key, result)
-        
-        return jsonify(result)
+        # 캐시 확인 (만료 시 이전 값을 즉시 반환하고 백그라운드에서 갱신)
+        return json_response(serve_daily_summary('market_overview'))
+    
+    except Exception as e:
+        print(f"Market Overview Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return json_response({'error': str(e)}), 500
+
+
+def compute_sectors():
+    """섹터별 ETF 성과 데이터 계산 (전체 ETF를 한 번에 다운로드)."""
+    closes = download_history(list(SECTOR_ETFS.values()), period='5d')['Close']
+    quotes = summarize_quotes(closes)
+    counts = closes.count()
+
+    # 주간 변동률 (조회 구간의 첫 종가 대비)
+    week_starts = closes.bfill().iloc[0] if len(closes) else pd.Series(dtype=float)
+
+    results = []
+    for sector_name, etf_ticker in SECTOR_ETFS.items():
+        quote = quotes.get(etf_ticker)
+        if quote is None or counts[etf_ticker] < 2:
+            continue
+
+        current_price = quote['price']
+        week_start = week_starts[etf_ticker]
+        week_change_pct = ((current_price - week_start) / week_start * 100) if week_start != 0 else 0
+
+        results.append({
+            'sector': sector_name,
+            'etf': etf_ticker,
+            'price': current_price,
+            'dailyChange': quote['changePct'],
+            'weeklyChange': round(week_change_pct, 2)
+        })
     
-    except Exception as e:
-        print(f"Market Overview Error: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+    # 일간 변동률 기준 정렬
+    results.sort(key=lambda x: x['dailyChange'], reverse=True)
+    
+    return {
+        'success': True,
+        'date': datetime.now().strftime('%Y-%m-%d'),
+        'sectors': results
+    }
 
 
 @app.route('/api/sectors')
 def sectors():
     """섹터별 ETF 성과 데이터 반환."""
-    # 캐시 확인
-    cache_key = 'sectors'
-    cached = get_cached(cache_key)
-    if cached:
-        return jsonify(cached)
-    
     try:
-        results = []
-        
-        for sector_name, etf_ticker in SECTOR_ETFS.items():
-            try:
-                ticker = yf.Ticker(etf_ticker)
-                hist = ticker.history(period='5d')
-                
-                if hist.empty or len(hist) < 2:
-                    continue
-                
-                current_price = float(hist['Close'].iloc[-1])
-                prev_close = float(hist['Close'].iloc[-2])
-                change_pct = ((current_price - prev_close) / prev_close * 100) if prev_close != 0 else 0
-                
-                # 주간 변동률
-                week_start = float(hist['Close'].iloc[0])
-                week_change_pct = ((current_price - week_start) / week_start * 100) if week_start != 0 else 0
-                
-                results.append({
-                    'sector': sector_name,
-                    'etf': etf_ticker,
-                    'price': current_price,
-                    'dailyChange': round(change_pct, 2),
-                    'weeklyChange': round(week_change_pct, 2)
-                })
-            except Exception as e:
-                print(f"Error fetching sector {sector_name}: {e}")
-                continue
-        
-        # 일간 변동률 기준 정렬
-        results.sort(key=lambda x: x['dailyChange'], reverse=True)
-        
-        result = {
-            'success': True,
-            'date': datetime.now().strftime('%Y-%m-%d'),
-            'sectors': results
-        }
-        
-        # 캐시에 저장
-        set_cache(cache_key, result)
-        
-        return jsonify(result)
+        # 캐시 확인 (만료 시 이전 값을 즉시 반환하고 백그라운드에서 갱신)
+        return json_response(serve_daily_summary('sectors'))
     
     except Exception as e:
         print(f"Sectors Error: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 
-@app.route('/api/movers')
-def movers():
-    """급등락 상위 종목 반환 - 타임아웃 및 폴백 처리 포함."""
-    
-    # 캐시 확인
-    cache_key = 'movers'
-    cached = get_cached(cache_key)
-    if cached:
-        return jsonify(cached)
-    
-    gainers = []
-    losers = []
-    
-    try:
-        # Yahoo Finance Screener API 시도 (타임아웃 위험 있음)
-        try:
-            gainer_screener = yf.Screener()
-            gainer_screener.set_predefined_body('day_gainers')
-            gainer_data = gainer_screener.response
-            
-            if gainer_data and 'quotes' in gainer_data:
-                for stock in gainer_data['quotes'][:10]:
-                    gainers.append({
-                        'ticker': stock.get('symbol', ''),
-                        'name': stock.get('shortName', stock.get('symbol', '')),
-                        'sector': '-',
-                        'price': round(stock.get('regularMarketPrice', 0), 2),
-                        'change': round(stock.get('regularMarketChange', 0), 2),
-                        'changePct': round(stock.get('regularMarketChangePercent', 0), 2),
-                        'volume': stock.get('regularMarketVolume', 0),
-                        'marketCap': stock.get('marketCap', 0)
-                    })
-        except Exception as e:
-            print(f"Gainers screener error: {e}")
-        
-        try:
-            loser_screener = yf.Screener()
-            loser_screener.set_predefined_body('day_losers')
-            loser_data = loser_screener.response
-            
-            if loser_data and 'quotes' in loser_data:
-                for stock in loser_data['quotes'][:10]:
-                    losers.append({
-                        'ticker': stock.get('symbol', ''),
-                        'name': stock.get('shortName', stock.get('symbol', '')),
-                        'sector': '-',
-                        'price': round(stock.get('regularMarketPrice', 0), 2),
-                        'change': round(stock.get('regularMarketChange', 0), 2),
-                        'changePct': round(stock.get('regularMarketChangePercent', 0), 2),
-                        'volume': stock.get('regularMarketVolume', 0),
-                        'marketCap': stock.get('marketCap', 0)
-                    })
-        except Exception as e:
-            print(f"Losers screener error: {e}")
-    
-    except Exception as e:
-        print(f"Movers outer error: {e}")
-    
-    # 성공/실패 상관없이 항상 응답
-    result = {
+# 로컬 스크리너 설정: 유니버스 가격 매트릭스로 계산하고 Yahoo 스크리너는 선택적으로 보강에만 사용
+MOVERS_COUNT = 10
+NEW_HIGHS_COUNT = 15
+SCREENER_ENRICH = os.environ.get('SCREENER_ENRICH', '1') == '1'
+SCREENER_TIMEOUT = float(os.environ.get('SCREENER_TIMEOUT', '5'))
+# 스크리닝 대상에 추가할 티커 (쉼표 구분, 예: "PLTR,SNOW")
+SCREENER_EXTRA_TICKERS = [
+    t.strip().upper() for t in os.environ.get('SCREENER_EXTRA_TICKERS', '').split(',') if t.strip()
+]
+
+
+def screener_universe():
+    """로컬 스크리닝 대상 종목 (섹터 대표 종목 + 주요 종목 + 추가 티커)"""
+    symbols = [symbol for stocks in SECTOR_STOCKS.values() for symbol in stocks]
+    return list(dict.fromkeys(symbols + MAJOR_STOCKS + SCREENER_EXTRA_TICKERS))
+
+
+def stock_sectors():
+    """티커 -> 섹터 (SECTOR_STOCKS 기준, 없으면 '-')"""
+    return {symbol: sector for sector, stocks in SECTOR_STOCKS.items() for symbol in stocks}
+
+
+def screened_mover(stock):
+    """Yahoo 스크리너 quote -> 급등락 종목 항목"""
+    return {
+        'ticker': stock.get('symbol', ''),
+        'name': stock.get('shortName', stock.get('symbol', '')),
+        'sector': '-',
+        'price': round(stock.get('regularMarketPrice', 0), 2),
+        'change': round(stock.get('regularMarketChange', 0), 2),
+        'changePct': round(stock.get('regularMarketChangePercent', 0), 2),
+        'volume': stock.get('regularMarketVolume', 0),
+        'marketCap': stock.get('marketCap', 0),
+        'source': 'screener'
+    }
+
+
+def merge_movers(local, screened, descending):
+    """로컬 결과에 스크리너 결과 중 유니버스 밖 종목만 더해 등락률 순 상위 MOVERS_COUNT개"""
+    seen = {stock['ticker'] for stock in local}
+    merged = local + [stock for stock in screened if stock['ticker'] and stock['ticker'] not in seen]
+    merged.sort(key=lambda x: x['changePct'], reverse=descending)
+    return merged[:MOVERS_COUNT]
+
+
+def compute_movers():
+    """급등락 상위 종목 계산 (유니버스 가격 매트릭스 기준, Yahoo 스크리너는 선택적 보강)."""
+    symbols = screener_universe()
+    frames = universe_store.get(universe_symbols())
+    gainer_rows, loser_rows = screen_movers(frames['Close'][symbols], frames['Volume'][symbols], MOVERS_COUNT)
+
+    meta = get_stock_meta(list(gainer_rows.index) + list(loser_rows.index))
+    sectors = stock_sectors()
+
+    def to_items(rows):
+        return [
+            {
+                'ticker': symbol,
+                'name': meta[symbol]['name'],
+                'sector': sectors.get(symbol, '-'),
+                'price': round(row['price'], 2),
+                'change': round(row['change'], 2),
+                'changePct': round(row['changePct'], 2),
+                'volume': int(row['volume']),
+                'marketCap': meta[symbol]['marketCap'],
+                'source': 'local'
+            }
+            for symbol, row in rows.iterrows()
+        ]
+
+    gainers = to_items(gainer_rows)
+    losers = to_items(loser_rows)
+
+    if SCREENER_ENRICH:
+        # 스크리너가 느리거나 실패하면 로컬 결과만 사용
+        screened, _ = fan_out({
+            'gainers': lambda: fetch_predefined_screen('day_gainers'),
+            'losers': lambda: fetch_predefined_screen('day_losers')
+        }, timeout=SCREENER_TIMEOUT)
+        gainers = merge_movers(gainers, [screened_mover(s) for s in screened.get('gainers', [])], True)
+        losers = merge_movers(losers, [screened_mover(s) for s in screened.get('losers', [])], False)
+
+    print(f"Movers: {len(gainers)} gainers, {len(losers)} losers")
+
+    return {
         'success': True,
         'date': datetime.now().strftime('%Y-%m-%d'),
+        'universeSize': len(symbols),
         'gainers': gainers,
         'losers': losers,
         'message': '데이터가 없으면 시장 휴장 중이거나 API 지연입니다.' if not gainers and not losers else None
     }
-    
-    if gainers or losers:
-        set_cache(cache_key, result)
-    
-    print(f"Movers: {len(gainers)} gainers, {len(losers)} losers")
-    return jsonify(result)
 
 
-@app.route('/api/new-highs')
-def new_highs():
-    """52주 신고가 달성 종목 반환 - 타임아웃 및 폴백 처리 포함."""
-    
-    # 캐시 확인
-    cache_key = 'new_highs'
-    cached = get_cached(cache_key)
-    if cached:
-        return jsonify(cached)
-    
-    new_high_stocks = []
-    
+@app.route('/api/movers')
+def movers():
+    """급등락 상위 종목 반환 (로컬 계산, 스크리너 지연 시 로컬 결과만)."""
     try:
-        # Yahoo Finance Screener API 사용 (52wk_gain 스크리너)
-        try:
-            screener = yf.Screener()
-            screener.set_predefined_body('52wk_gain')
-            data = screener.response
-            
-            if data and 'quotes' in data:
-                for stock in data['quotes'][:15]:
-                    fiftyTwoWeekHigh = stock.get('fiftyTwoWeekHigh', 0)
-                    currentPrice = stock.get('regularMarketPrice', 0)
-                    
-                    if fiftyTwoWeekHigh > 0:
-                        pct_from_high = (currentPrice / fiftyTwoWeekHigh - 1) * 100
-                    else:
-                        pct_from_high = 0
-                    
-                    new_high_stocks.append({
-                        'ticker': stock.get('symbol', ''),
-                        'name': stock.get('shortName', stock.get('symbol', '')),
-                        'sector': stock.get('sector', '-'),
-                        'price': round(currentPrice, 2),
-                        'fiftyTwoWeekHigh': round(fiftyTwoWeekHigh, 2),
-                        'marketCap': stock.get('marketCap', 0),
-                        'pctFromHigh': round(pct_from_high, 2)
-                    })
-        except Exception as e:
-            print(f"52wk screener error: {e}")
-    
+        return json_response(serve_daily_summary('movers'))
+
     except Exception as e:
-        print(f"New Highs outer error: {e}")
-    
+        print(f"Movers Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return json_response({'error': str(e)}), 500
+
+
+def screened_new_high(stock):
+    """Yahoo 52wk_gain 스크리너 quote -> 신고가 종목 항목"""
+    price = stock.get('regularMarketPrice', 0) or 0
+    high52 = stock.get('fiftyTwoWeekHigh', 0) or 0
+    low52 = stock.get('fiftyTwoWeekLow', 0) or 0
+    return {
+        'ticker': stock.get('symbol', ''),
+        'name': stock.get('shortName', stock.get('symbol', '')),
+        'sector': stock.get('sector', '-'),
+        'price': round(price, 2),
+        'fiftyTwoWeekHigh': round(high52, 2),
+        'fiftyTwoWeekLow': round(low52, 2),
+        'marketCap': stock.get('marketCap', 0),
+        'pctFromHigh': round((price / high52 - 1) * 100, 2) if high52 > 0 else 0,
+        'pctFromLow': round((price / low52 - 1) * 100, 2) if low52 > 0 else 0,
+        'source': 'screener'
+    }
+
+
+def merge_new_highs(local, screened, universe):
+    """
+    로컬 신고가에 스크리너 결과 중 유니버스 밖 종목만 더해 52주 고가에 가까운 순 상위 NEW_HIGHS_COUNT개
+    (유니버스 종목은 로컬 계산 결과를 따름)
+    """
+    seen = set(universe)
+    merged = local + [stock for stock in screened if stock['ticker'] and stock['ticker'] not in seen]
+    merged.sort(key=lambda x: x['pctFromHigh'], reverse=True)
+    return merged[:NEW_HIGHS_COUNT]
+
+
+def compute_new_highs():
+    """
+    52주 신고가/신저가 종목 계산 (유니버스 고가/저가 매트릭스의 52주 이동 최고/최저가 기준).
+    로컬 유니버스는 추적 중인 대형주뿐이므로, 시장 전체 신고가는 Yahoo 52wk_gain 스크리너로 선택적 보강.
+    """
+    symbols = screener_universe()
+    frames = universe_store.get(universe_symbols())
+    extremes = screen_extremes(frames['High'][symbols], frames['Low'][symbols], frames['Close'][symbols])
+
+    new_high_rows = extremes[extremes['newHigh']].sort_values('pctFromHigh', ascending=False).head(NEW_HIGHS_COUNT)
+    new_low_rows = extremes[extremes['newLow']].sort_values('pctFromLow').head(NEW_HIGHS_COUNT)
+
+    meta = get_stock_meta(list(new_high_rows.index) + list(new_low_rows.index))
+    sectors = stock_sectors()
+
+    def to_items(rows):
+        return [
+            {
+                'ticker': symbol,
+                'name': meta[symbol]['name'],
+                'sector': sectors.get(symbol, '-'),
+                'price': round(row['price'], 2),
+                'fiftyTwoWeekHigh': round(row['high52'], 2),
+                'fiftyTwoWeekLow': round(row['low52'], 2),
+                'marketCap': meta[symbol]['marketCap'],
+                'pctFromHigh': round(row['pctFromHigh'], 2),
+                'pctFromLow': round(row['pctFromLow'], 2),
+                'source': 'local'
+            }
+            for symbol, row in rows.iterrows()
+        ]
+
+    new_high_stocks = to_items(new_high_rows)
+    new_low_stocks = to_items(new_low_rows)
+
+    screener_included = False
+    if SCREENER_ENRICH:
+        # 스크리너가 느리거나 실패하면 로컬 결과만 사용
+        screened, _ = fan_out({
+            'new_highs': lambda: fetch_predefined_screen('52wk_gain', NEW_HIGHS_COUNT)
+        }, timeout=SCREENER_TIMEOUT)
+        if 'new_highs' in screened:
+            screener_included = True
+            new_high_stocks = merge_new_highs(
+                new_high_stocks, [screened_new_high(s) for s in screened['new_highs']], symbols
+            )
+
     # 섹터별 그룹핑
     sectors_grouped = {}
     for stock in new_high_stocks:
-        sector = stock['sector']
-        if sector not in sectors_grouped:
-            sectors_grouped[sector] = []
-        sectors_grouped[sector].append(stock)
-    
-    print(f"New highs found: {len(new_high_stocks)} stocks")
-    
-    # 성공/실패 상관없이 항상 응답
-    result = {
+        sectors_grouped.setdefault(stock['sector'], []).append(stock)
+
+    print(f"New highs found: {len(new_high_stocks)} stocks, new lows: {len(new_low_stocks)}")
+
+    return {
         'success': True,
         'date': datetime.now().strftime('%Y-%m-%d'),
+        'universeSize': len(symbols),
+        'screenerIncluded': screener_included,  # False면 추적 중인 대형주만 (시장 전체 아님)
         'totalCount': len(new_high_stocks),
         'stocks': new_high_stocks,
         'bySector': sectors_grouped,
-        'message': '데이터가 없으면 시장 휴장 중이거나 API 지연입니다.' if not new_high_stocks else None
+        'newLows': new_low_stocks,
+        # 유니버스 전체의 52주 고가 대비 거리 (%)
+        'distanceFromHigh': {
+            symbol: round(value, 2) for symbol, value in extremes['pctFromHigh'].dropna().items()
+        },
+        'message': '오늘 52주 신고가를 기록한 종목이 없습니다.' if not new_high_stocks else None
     }
-    
-    if new_high_stocks:
-        set_cache(cache_key, result)
-    
-    return jsonify(result)
+
+
+@app.route('/api/new-highs')
+def new_highs():
+    """52주 신고가/신저가 종목 반환 (로컬 계산, 스크리너로 유니버스 밖 종목 보강)."""
+    try:
+        return json_response(serve_daily_summary('new_highs'))
+
+    except Exception as e:
+        print(f"New Highs Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return json_response({'error': str(e)}), 500
+
+
+# 하루 정리 캐시 키 -> (계산 함수, 저장 조건). 빈 급등락 결과는 캐시하지 않음 (다음 요청에서 재시도)
+DAILY_SUMMARY_JOBS = {
+    'market_overview': (compute_market_overview, None),
+    'sectors': (compute_sectors, None),
+    'movers': (compute_movers, lambda r: bool(r['gainers'] or r['losers'])),
+    'new_highs': (compute_new_highs, None)
+}
+
+
+def serve_published(cache_key, compute, should_cache=None):
+    """
+    스케줄러가 공유 캐시에 발행한 값을 조회 (stale-while-revalidate).
+    만료된 값은 'stale': True 표시와 함께 즉시 반환되고 백그라운드에서 갱신됩니다.
+    """
+    result, is_stale = cache.get_or_revalidate(cache_key, compute, should_cache=should_cache)
+    if is_stale:
+        result = {**result, 'stale': True}
+    return result
+
+
+def serve_daily_summary(cache_key):
+    """하루 정리 데이터 조회"""
+    compute, should_cache = DAILY_SUMMARY_JOBS[cache_key]
+    return serve_published(cache_key, compute, should_cache)
+
+
+def publish(cache_key, compute, should_cache, ttl):
+    """지금 다시 계산해 ttl초 동안 유효하도록 공유 캐시에 저장 (모든 워커가 읽음)"""
+    cache.refresh(cache_key, compute, ttl=ttl, should_cache=should_cache)
 
 
 @app.route('/api/market-news')
@@ -1039,7 +1529,7 @@ def market_news():
         # 최신순 정렬
         all_news.sort(key=lambda x: x['publishTime'], reverse=True)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'date': datetime.now().strftime('%Y-%m-%d'),
             'news': all_news[:20]  # 상위 20개만 반환
@@ -1049,130 +1539,500 @@ def market_news():
         print(f"Market News Error: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
+
+
+def fetch_stock_meta(ticker_symbol):
+    """종목명/시가총액 조회 (ticker.info, 느림)"""
+    info = yf.Ticker(ticker_symbol).info
+    return {
+        'name': info.get('shortName') or ticker_symbol,
+        'marketCap': info.get('marketCap', 0)
+    }
+
+
+def get_stock_meta(tickers):
+    """종목 메타데이터 (장기 캐시 후 누락분만 공용 풀에서 병렬 조회)"""
+    meta = {}
+    missing = []
+    for ticker_symbol in tickers:
+        cached = cache.get(f"stock_meta:{ticker_symbol}")
+        if cached:
+            meta[ticker_symbol] = cached
+        else:
+            missing.append(ticker_symbol)
+
+    if missing:
+        results, _ = fan_out({
+            ticker_symbol: (lambda t=ticker_symbol: fetch_stock_meta(t)) for ticker_symbol in missing
+        })
+        for ticker_symbol, value in results.items():
+            cache.set(f"stock_meta:{ticker_symbol}", value)
+            meta[ticker_symbol] = value
+
+    # 조회 실패 종목은 티커를 이름으로 사용 (다음 계산 때 다시 조회)
+    for ticker_symbol in missing:
+        meta.setdefault(ticker_symbol, {'name': ticker_symbol, 'marketCap': 0})
+
+    return meta
+
+
+def compute_sector_stocks(sector):
+    """섹터 대표 종목들의 주가 변동 계산 (1년치 종가를 한 번에 받아 기간별 수익률 계산, 시가총액 순)"""
+    stocks = SECTOR_STOCKS[sector]
+    frames = download_history(stocks, period='1y')
+    closes = frames['Close']
+    quotes = summarize_quotes(closes)
+    counts = closes.count()
+    volumes = last_valid(frames['Volume']).fillna(0)
+
+    # 1주(5 거래일), 1개월(~21 거래일), 1년(전체 기간의 첫 데이터)
+    prices = pd.Series({symbol: quote['price'] for symbol, quote in quotes.items()}, dtype=float)
+    returns = period_returns(closes[prices.index], prices, {'week': 5, 'month': 21, 'year': None})
+
+    loaded = [symbol for symbol in stocks if symbol in quotes and counts[symbol] >= 2]
+    meta = get_stock_meta(loaded)
+
+    results = []
+    for symbol in loaded:
+        quote = quotes[symbol]
+        results.append({
+            'ticker': symbol,
+            'name': meta[symbol]['name'],
+            'price': round(quote['price'], 2),
+            'change': round(quote['change'], 2),
+            'changePct': quote['changePct'],
+            'week': round(returns['week'][symbol], 2),
+            'month': round(returns['month'][symbol], 2),
+            'year': round(returns['year'][symbol], 2),
+            'marketCap': meta[symbol]['marketCap'],
+            'volume': int(volumes[symbol])
+        })
+
+    # 시가총액 순 정렬
+    results.sort(key=lambda x: x.get('marketCap') or 0, reverse=True)
+
+    print(f"Sector {sector}: {len(results)} stocks loaded")
+
+    return {
+        'success': True,
+        'sector': sector,
+        'etf': SECTOR_ETFS.get(sector, ''),
+        'stocks': results
+    }
 
 
 @app.route('/api/sector-stocks')
 def sector_stocks():
     """섹터별 대표 종목들의 주가 변동 반환 (기간별 수익률 포함)."""
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    
-    def get_stock_data(ticker_symbol):
-        """개별 종목 데이터 조회"""
-        try:
-            ticker = yf.Ticker(ticker_symbol)
-            # 1년치 데이터로 모든 기간 계산
-            hist = ticker.history(period='1y')
-            info = ticker.info
-            
-            if hist.empty or len(hist) < 2:
-                return None
-            
-            current_price = float(hist['Close'].iloc[-1])
-            
-            # 일간 변동
-            prev_close = float(hist['Close'].iloc[-2]) if len(hist) >= 2 else current_price
-            daily_change = current_price - prev_close
-            daily_pct = (daily_change / prev_close * 100) if prev_close != 0 else 0
-            
-            # 1주 수익률 (5 거래일 전)
-            week_ago_idx = max(0, len(hist) - 6)
-            week_ago_price = float(hist['Close'].iloc[week_ago_idx])
-            week_pct = ((current_price - week_ago_price) / week_ago_price * 100) if week_ago_price != 0 else 0
-            
-            # 1개월 수익률 (~21 거래일 전)
-            month_ago_idx = max(0, len(hist) - 22)
-            month_ago_price = float(hist['Close'].iloc[month_ago_idx])
-            month_pct = ((current_price - month_ago_price) / month_ago_price * 100) if month_ago_price != 0 else 0
-            
-            # 1년 수익률 (전체 기간의 첫 데이터)
-            year_ago_price = float(hist['Close'].iloc[0])
-            year_pct = ((current_price - year_ago_price) / year_ago_price * 100) if year_ago_price != 0 else 0
-            
-            return {
-                'ticker': ticker_symbol,
-                'name': info.get('shortName', ticker_symbol),
-                'price': round(current_price, 2),
-                'change': round(daily_change, 2),
-                'changePct': round(daily_pct, 2),
-                'week': round(week_pct, 2),
-                'month': round(month_pct, 2),
-                'year': round(year_pct, 2),
-                'marketCap': info.get('marketCap', 0),
-                'volume': int(hist['Volume'].iloc[-1]) if 'Volume' in hist else 0
-            }
-        except Exception as e:
-            print(f"Error fetching {ticker_symbol}: {e}")
-            return None
-    
     try:
         sector = request.args.get('sector', '')
         
         if not sector or sector not in SECTOR_STOCKS:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': f'Invalid sector: {sector}',
                 'availableSectors': list(SECTOR_STOCKS.keys())
             }), 400
         
-        stocks = SECTOR_STOCKS[sector]
-        results = []
-        
-        # 병렬 처리로 속도 개선
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {executor.submit(get_stock_data, ticker): ticker for ticker in stocks}
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    results.append(result)
-        
-        # 시가총액 순 정렬
-        results.sort(key=lambda x: x.get('marketCap', 0), reverse=True)
-        
-        print(f"Sector {sector}: {len(results)} stocks loaded")
-        
-        return jsonify({
-            'success': True,
-            'sector': sector,
-            'etf': SECTOR_ETFS.get(sector, ''),
-            'stocks': results
-        })
+        return json_response(serve_published(
+            f"sector_stocks:{sector}",
+            lambda: compute_sector_stocks(sector),
+            should_cache=lambda r: bool(r['stocks'])
+        ))
     
     except Exception as e:
         print(f"Sector Stocks Error: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
+
+
+# ============================================
+# 유니버스 (섹터 대표 종목 + 주요 종목 + 섹터 ETF + 지수) 수익률/등락 집계
+# 전체 종가 매트릭스를 한 번에 받아 두고 모든 섹터를 한 번의 벡터 연산으로 계산
+# ============================================
+universe_store = UniverseStore()
+
+
+def universe_symbols():
+    """유니버스 전체 티커 (스크리닝 대상 종목 + 섹터 ETF + 지수, 중복 제거, 순서 유지)"""
+    symbols = screener_universe() + list(SECTOR_ETFS.values()) + list(MARKET_INDICES.values())
+    return list(dict.fromkeys(symbols))
+
+
+def returns_dict(row):
+    """기간별 수익률 행 -> {기간: 수익률(소수점 2자리, 없으면 None)}"""
+    return {period: round(value, 2) if pd.notna(value) else None for period, value in row.items()}
+
+
+def compute_universe_returns():
+    """유니버스 전체의 기간별 수익률, 섹터별 등락 종목 수와 동일/시가총액 가중 수익률 계산"""
+    symbols = universe_symbols()
+    frames = universe_store.get(symbols)
+    closes = frames['Close']
+
+    stocks = list(dict.fromkeys(
+        [symbol for members in SECTOR_STOCKS.values() for symbol in members] + MAJOR_STOCKS
+    ))
+    caps = {symbol: meta['marketCap'] for symbol, meta in get_stock_meta(stocks).items()}
+
+    groups = dict(SECTOR_STOCKS)
+    groups['ALL'] = stocks
+    result = universe_returns(closes, frames['Volume'], groups, caps)
+    tickers = result['tickers']
+    periods = list(RETURN_PERIODS)
+
+    sectors = []
+    for sector, etf in SECTOR_ETFS.items():
+        if sector not in SECTOR_STOCKS:
+            continue
+        stats = result['groups'].loc[sector]
+        sectors.append({
+            'sector': sector,
+            'etf': etf,
+            'count': int(stats['count']),
+            'advancers': int(stats['advancers']),
+            'decliners': int(stats['decliners']),
+            'unchanged': int(stats['unchanged']),
+            'returns': returns_dict(result['equal'].loc[sector]),
+            'capWeighted': returns_dict(result['capWeighted'].loc[sector]),
+            'etfReturns': returns_dict(tickers.loc[etf, periods])
+        })
+
+    indices = [
+        {
+            'name': name,
+            'ticker': symbol,
+            'price': tickers.loc[symbol, 'price'],
+            'returns': returns_dict(tickers.loc[symbol, periods])
+        }
+        for name, symbol in MARKET_INDICES.items()
+    ]
+
+    stock_rows = tickers.loc[stocks]
+    breadth = result['groups'].loc['ALL']
+
+    return {
+        'success': True,
+        'date': datetime.now().strftime('%Y-%m-%d'),
+        'asOf': closes.index[-1].strftime('%Y-%m-%d'),
+        'periods': periods,
+        'breadth': {
+            'count': int(breadth['count']),
+            'advancers': int(breadth['advancers']),
+            'decliners': int(breadth['decliners']),
+            'unchanged': int(breadth['unchanged'])
+        },
+        'sectors': sectors,
+        'indices': indices,
+        'stocks': [
+            {
+                'ticker': symbol,
+                'price': row['price'],
+                'volume': int(row['volume']) if pd.notna(row['volume']) else 0,
+                'marketCap': caps.get(symbol, 0),
+                'returns': returns_dict(row[periods])
+            }
+            for symbol, row in stock_rows.iterrows() if pd.notna(row['price'])
+        ]
+    }
+
+
+@app.route('/api/universe/returns')
+def universe_returns_route():
+    """전체 유니버스의 섹터별 기간 수익률, 등락 종목 수, 시가총액 가중 수익률 반환."""
+    try:
+        return json_response(serve_published(
+            'universe_returns',
+            compute_universe_returns,
+            should_cache=lambda r: bool(r['stocks'])
+        ))
+
+    except Exception as e:
+        print(f"Universe Returns Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return json_response({'error': str(e)}), 500
+
+
+@app.route('/api/fundamentals/trend')
+def fundamentals_trend():
+    """저장된 재무 지표의 종목 간 추이 (예: ?field=gpm&frequency=annual&tickers=AAPL,MSFT)."""
+    try:
+        field = request.args.get('field', '')
+        frequency = request.args.get('frequency', 'annual')
+        if frequency not in ('annual', 'quarterly'):
+            return json_response({'success': False, 'error': f'Invalid frequency: {frequency}'}), 400
+
+        fields = fundamentals_store.fields()
+        if field not in fields:
+            return json_response({
+                'success': False,
+                'error': f'Unknown field: {field}',
+                'availableFields': fields
+            }), 400
+
+        tickers = [t.strip().upper() for t in request.args.get('tickers', '').split(',') if t.strip()]
+        include_estimates = request.args.get('estimates', 'false').lower() == 'true'
+        trend = fundamentals_store.metric_trend(field, frequency, tickers or None, include_estimates)
+
+        return json_response({
+            'success': True,
+            'field': field,
+            'frequency': frequency,
+            'periods': list(trend.index),
+            'series': {ticker: trend[ticker].to_numpy() for ticker in trend.columns}
+        })
+
+    except Exception as e:
+        print(f"Fundamentals Trend Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return json_response({'error': str(e)}), 500
+
+
+# ============================================
+# 선언형 스크리너 (/api/screen)
+# 유니버스 가격 + 캐시된 재무 지표(calculate_period_metrics)로 만든 종목 x 필드 테이블을
+# 백그라운드에서 갱신하고, 요청은 메모리에서 벡터 연산으로만 평가 (요청당 업스트림 호출 없음)
+# ============================================
+SCREEN_FUNDAMENTAL_FIELDS = [
+    'revenue', 'revenueGrowth', 'gpm', 'opm', 'ebitdaMargin', 'netIncome', 'eps', 'epsGrowth',
+    'freeCashFlow', 'fcfGrowth', 'fcfMargin', 'rdPct', 'sgaPct', 'opexPct'
+]
+SCREEN_TEXT_FIELDS = ['name', 'sector']
+
+
+def latest_reported(periods):
+    """재무 시계열(오래된 순)에서 가장 최근 실적 (추정치 제외, 없으면 빈 dict)"""
+    for metrics in reversed(periods):
+        if not metrics.get('isEstimate'):
+            return metrics
+    return {}
+
+
+def build_screen_table():
+    """
+    스크리닝 대상 종목 x 필드 테이블 생성 (가격/수익률/52주 고저 + 최근 연간/분기 재무 지표).
+    재무 지표와 메타데이터는 캐시에 있는 값만 사용 (없으면 NaN).
+    """
+    symbols = screener_universe()
+    frames = universe_store.get(universe_symbols())
+    closes = frames['Close'][symbols]
+    prices = last_valid(closes)
+    prev_closes = last_valid(closes, 2)
+    returns = period_returns(closes, prices, {'1w': 5, '1m': 21, '3m': 63, '1y': None})
+    extremes = screen_extremes(frames['High'][symbols], frames['Low'][symbols], closes)
+
+    table = pd.DataFrame({
+        'price': prices,
+        'change': prices - prev_closes,
+        'changePct': ((prices - prev_closes) / prev_closes * 100).where(prev_closes != 0),
+        'volume': last_valid(frames['Volume'][symbols]),
+        'return1w': returns['1w'],
+        'return1m': returns['1m'],
+        'return3m': returns['3m'],
+        'return1y': returns['1y'],
+        'high52': extremes['high52'],
+        'low52': extremes['low52'],
+        'pctFromHigh': extremes['pctFromHigh'],
+        'pctFromLow': extremes['pctFromLow']
+    }, index=symbols)
+
+    # 최근 연간 실적은 필드 이름 그대로, 최근 분기 실적은 q 접두사 (예: qRevenueGrowth)
+    quarterly_fields = {field: 'q' + field[0].upper() + field[1:] for field in SCREEN_FUNDAMENTAL_FIELDS}
+    rows = {}
+    for symbol in symbols:
+        data = cache.get_stale(f"fundamentals:{symbol}")
+        if not data:
+            continue
+        annual = latest_reported(data.get('annual', []))
+        quarterly = latest_reported(data.get('quarterly', []))
+        row = {field: annual.get(field) for field in SCREEN_FUNDAMENTAL_FIELDS}
+        row.update({name: quarterly.get(field) for field, name in quarterly_fields.items()})
+        rows[symbol] = row
+    fundamentals = pd.DataFrame.from_dict(
+        rows, orient='index', columns=SCREEN_FUNDAMENTAL_FIELDS + list(quarterly_fields.values())
+    ).reindex(symbols).astype('f8')
+
+    sectors = stock_sectors()
+    metas = {symbol: cache.get_stale(f"stock_meta:{symbol}") or {} for symbol in symbols}
+    table['marketCap'] = pd.Series({symbol: metas[symbol].get('marketCap') for symbol in symbols}, dtype='f8')
+    table = pd.concat([table, fundamentals], axis=1)
+    table['peRatio'] = (table['price'] / table['eps']).where(table['eps'] > 0)
+    table['fcfYield'] = (table['freeCashFlow'] / table['marketCap'] * 100).where(table['marketCap'] > 0)
+
+    table.insert(0, 'name', [metas[symbol].get('name', symbol) for symbol in symbols])
+    table.insert(1, 'sector', [sectors.get(symbol, '-') for symbol in symbols])
+    table.index.name = 'ticker'
+
+    print(f"Screen table built: {len(table)} tickers, {len(rows)} with fundamentals")
+    return table
+
+
+def screen_fields(table):
+    """필터/정렬에 사용할 수 있는 숫자 필드"""
+    return [column for column in table.columns if column not in SCREEN_TEXT_FIELDS]
+
+
+@app.route('/api/screen')
+def screen():
+    """선언형 조건으로 종목 스크리닝 (예: ?filters=marketCap>1e11,revenueGrowth>20&sort=changePct)."""
+    try:
+        table, is_stale = cache.get_or_revalidate(
+            'screen_table', build_screen_table, should_cache=lambda t: not t.empty
+        )
+        fields = screen_fields(table)
+
+        try:
+            filters = parse_filters(request.args.get('filters', ''), fields)
+            sort = request.args.get('sort', 'marketCap')
+            if sort not in fields:
+                raise ValueError(f"Unknown sort field: {sort}")
+            limit = min(int(request.args.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+            if limit < 1:
+                raise ValueError("limit must be positive")
+        except ValueError as e:
+            return json_response({
+                'success': False,
+                'error': str(e),
+                'availableFields': fields
+            }), 400
+
+        sector = request.args.get('sector', '')
+        if sector:
+            table = table[table['sector'] == sector]
+
+        descending = request.args.get('order', 'desc') != 'asc'
+        matched, total = run_screen(table, filters, sort, descending, limit)
+
+        return json_response({
+            'success': True,
+            'date': datetime.now().strftime('%Y-%m-%d'),
+            'universeSize': len(table),
+            'count': total,
+            'filters': [f"{field}{op}{value:g}" for field, op, value in filters],
+            'sort': sort,
+            'order': 'desc' if descending else 'asc',
+            'stale': is_stale,
+            'results': matched.round(2).reset_index().to_dict('records')
+        })
+
+    except Exception as e:
+        print(f"Screen Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return json_response({'error': str(e)}), 500
+
+
+# ============================================
+# 캐시 워밍업/갱신 스케줄러
+# gunicorn에서는 gunicorn.conf.py의 post_worker_init 훅에서 시작되며,
+# 파일 락을 잡은 워커 하나만 실제로 계산해 공유 캐시에 발행합니다.
+# ============================================
+REFRESH_AHEAD = 60  # 장중에는 만료 REFRESH_AHEAD초 전에 미리 재계산
+CLOSED_REFRESH_INTERVAL = 3600  # 장외 갱신 주기 (초)
+SECTOR_STOCKS_CLOSED_REFRESH_INTERVAL = 6 * 3600
+
+scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def refresh_sector_stocks(ttl):
+    """모든 섹터의 대표 종목 데이터 갱신 및 발행"""
+    for sector in SECTOR_STOCKS:
+        publish(f"sector_stocks:{sector}", lambda: compute_sector_stocks(sector),
+                lambda r: bool(r['stocks']), ttl)
+
+
+def refresh_universe(ttl):
+    """유니버스 매트릭스를 다시 받아 집계 결과 발행"""
+    universe_store.refresh(universe_symbols())
+    publish('universe_returns', compute_universe_returns, lambda r: bool(r['stocks']), ttl)
+
+
+_screen_warm_pending = 0  # 진행 중인 스크리닝 워밍업의 남은 조회 수
+_screen_warm_lock = threading.Lock()
+
+
+def refresh_screen_table(ttl):
+    """
+    스크리닝 대상 종목의 메타데이터/재무 데이터 조회를 백그라운드 풀에 제출하고 바로 반환.
+    마지막 조회가 끝나면 그 스레드에서 테이블을 재생성해 발행합니다 (스케줄러 스레드를 막지 않음).
+    """
+    global _screen_warm_pending
+    symbols = screener_universe()
+    with _screen_warm_lock:
+        if _screen_warm_pending:
+            print(f"Screen table warm-up still running ({_screen_warm_pending} left), skipping")
+            return
+        _screen_warm_pending = len(symbols) + 1
+
+    def on_done(future):
+        global _screen_warm_pending
+        exc = future.exception()
+        if exc is not None:
+            print(f"Screen table warm-up call failed: {exc}")
+        with _screen_warm_lock:
+            _screen_warm_pending -= 1
+            if _screen_warm_pending:
+                return
+        try:
+            publish('screen_table', build_screen_table, lambda t: not t.empty, ttl)
+        except Exception as e:
+            print(f"Screen table publish error: {e}")
+
+    # 공용 업스트림 풀 대신 백그라운드 전용 풀에서 종목별로 순차 조회 (요청 처리 방해 방지)
+    # 캐시에 있는 종목은 바로 반환되고 누락/만료 종목만 조회
+    futures = [background_executor.submit(get_stock_meta, symbols)]
+    futures.extend(background_executor.submit(get_fundamentals, symbol) for symbol in symbols)
+    for future in futures:
+        future.add_done_callback(on_done)
+
+
+def start_scheduler():
+    """프로세스당 한 번 스케줄러 스레드 시작 (실행은 호스트당 하나의 프로세스)"""
+    global scheduler
+    with _scheduler_lock:
+        if scheduler is not None:
+            return scheduler
+
+        scheduler = Scheduler()
+        for cache_key, (compute, should_cache) in DAILY_SUMMARY_JOBS.items():
+            scheduler.add_job(
+                cache_key,
+                lambda ttl, key=cache_key, fn=compute, cond=should_cache: publish(key, fn, cond, ttl),
+                open_interval=CACHE_TTLS[cache_key] - REFRESH_AHEAD,
+                closed_interval=CLOSED_REFRESH_INTERVAL
+            )
+        scheduler.add_job(
+            'sector_stocks',
+            refresh_sector_stocks,
+            open_interval=CACHE_TTLS['sector_stocks'] - REFRESH_AHEAD,
+            closed_interval=SECTOR_STOCKS_CLOSED_REFRESH_INTERVAL
+        )
+        scheduler.add_job(
+            'universe_returns',
+            refresh_universe,
+            open_interval=CACHE_TTLS['universe_returns'] - REFRESH_AHEAD,
+            closed_interval=CLOSED_REFRESH_INTERVAL
+        )
+        scheduler.add_job(
+            'screen_table',
+            refresh_screen_table,
+            open_interval=CACHE_TTLS['screen_table'] - REFRESH_AHEAD,
+            closed_interval=CLOSED_REFRESH_INTERVAL
+        )
+        return scheduler.start()
 
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8000))
     print(f"Starting Flask Server on port {port}...")
     
-    # 백그라운드에서 캐시 워밍업
-    def warmup_cache():
-        """서버 시작 후 캐시 워밍업"""
-        import time
-        time.sleep(2)  # 서버 완전히 시작될 때까지 대기
-        print("Starting cache warmup...")
-        
-        with app.test_client() as client:
-            try:
-                print("Warming up: market-overview")
-                client.get('/api/market-overview')
-                print("Warming up: sectors")
-                client.get('/api/sectors')
-                print("Warming up: movers")
-                client.get('/api/movers')
-                print("Warming up: new-highs")
-                client.get('/api/new-highs')
-                print("Cache warmup complete!")
-            except Exception as e:
-                print(f"Cache warmup error: {e}")
-    
-    # 백그라운드 스레드로 캐시 워밍업 실행
-    warmup_thread = threading.Thread(target=warmup_cache, daemon=True)
-    warmup_thread.start()
+    # 백그라운드에서 캐시 워밍업 및 시장 일정에 맞춘 주기적 갱신
+    start_scheduler()
     
     app.run(host='0.0.0.0', port=port, debug=False)
 
@@ -0,0 +1,83 @@
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from api.serialization import encode_dates, encode_ohlc, encode_volume, encode_xy
+
+ROWS = 20000
+REPEAT = 3
+
+
+def make_frame(rows):
+    """벤치마크용 일봉 OHLCV + 이동평균 (MA 앞부분 NaN 포함)"""
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range(end='2025-01-01', periods=rows)
+    close = 100 + rng.standard_normal(rows).cumsum()
+    open_ = close + rng.standard_normal(rows) * 0.5
+    df = pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + 1,
+        'Low': np.minimum(open_, close) - 1,
+        'Close': close,
+        'Volume': rng.integers(1e5, 1e6, rows).astype(float)
+    }, index=index)
+    df.loc[df.index[::97], 'Volume'] = np.nan
+    for window in (10, 20, 50):
+        df[f'MA{window}'] = df['Close'].rolling(window=window).mean()
+    return df
+
+
+def encode_iterrows(df):
+    """기존 방식 (DataFrame.iterrows)"""
+    ohlc_data, volume_data, ma10_data, ma20_data, ma50_data = [], [], [], [], []
+    for index, row in df.iterrows():
+        date_str = index.strftime('%Y-%m-%d')
+        ohlc_data.append({
+            "x": date_str,
+            "o": float(row['Open']), "h": float(row['High']), "l": float(row['Low']), "c": float(row['Close'])
+        })
+        volume_data.append({
+            "x": date_str,
+            "y": float(row['Volume']) if pd.notna(row['Volume']) else 0,
+            "color": '#22c55e' if row['Close'] >= row['Open'] else '#ef4444'
+        })
+        ma10_data.append({"x": date_str, "y": float(row['MA10']) if pd.notna(row['MA10']) else None})
+        ma20_data.append({"x": date_str, "y": float(row['MA20']) if pd.notna(row['MA20']) else None})
+        ma50_data.append({"x": date_str, "y": float(row['MA50']) if pd.notna(row['MA50']) else None})
+    return [ohlc_data, volume_data, ma10_data, ma20_data, ma50_data]
+
+
+def encode_vectorized(df):
+    """api.serialization 인코더"""
+    dates = encode_dates(df.index)
+    return [
+        encode_ohlc(df, dates),
+        encode_volume(df, dates),
+        encode_xy(dates, df['MA10']),
+        encode_xy(dates, df['MA20']),
+        encode_xy(dates, df['MA50'])
+    ]
+
+
+def best_time(fn, df):
+    times = []
+    for _ in range(REPEAT):
+        start_time = time.perf_counter()
+        fn(df)
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+df = make_frame(ROWS)
+print(f"Benchmarking chart serialization on {len(df)} rows...")
+
+same = json.dumps(encode_iterrows(df)) == json.dumps(encode_vectorized(df))
+print(f"Identical JSON: {same}")
+
+old_time = best_time(encode_iterrows, df)
+new_time = best_time(encode_vectorized, df)
+print(f"iterrows:   {old_time * 1000:.1f} ms")
+print(f"vectorized: {new_time * 1000:.1f} ms")
+print(f"Speedup: {old_time / new_time:.1f}x")
@@ -0,0 +1,19 @@
+# Gunicorn configuration
+# 워커가 앱을 로드한 뒤 캐시 워밍업/갱신 스케줄러를 시작합니다.
+# 모든 워커가 시작을 시도하지만 파일 락을 잡은 워커 하나만 실제로 실행하고,
+# 그 워커가 재시작되면 다른 워커가 이어받습니다 (api/scheduler.py 참고).
+
+import os
+
+# SSE 스트림(/api/analyze-earningcall?stream=true 등)은 응답이 끝날 때까지 연결을 잡고 있으므로
+# sync 워커 대신 스레드 워커를 사용 (스트림 하나가 워커 전체를 막지 않음)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+
+# 워커 응답 없음 판정 시간 (초). 긴 분석 스트림 중에 워커가 종료되지 않도록 기본값(30)보다 길게
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '300'))
+
+
+def post_worker_init(worker):
+    from app import start_scheduler
+    start_scheduler()
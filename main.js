@@ -551,9 +551,12 @@ document.addEventListener('DOMContentLoaded', () => {
             let chartLabels = [];
 
             try {
-                const res = await fetch(`/api/historical?ticker=${ticker}&range=${currentRange}&interval=${currentInterval}`);
+                // 장기 차트는 서버에서 화면 폭 수준으로 축소 (구간 고가/저가 유지)
+                const maxPoints = Math.max(200, Math.min(2000, Math.round(window.innerWidth || 1000)));
+                const res = await fetch(`/api/historical/prices?ticker=${ticker}&range=${currentRange}&interval=${currentInterval}&format=columnar&encoding=base64&max_points=${maxPoints}`);
                 if (!res.ok) throw new Error(`API Error ${res.status}`);
-                const data = await res.json();
+                const payload = await res.json();
+                const data = payload.format === 'columnar' ? decodeColumnarPrices(payload) : payload;
 
                 ohlcData = data.ohlc;
                 chartPrices = data.prices;
@@ -617,6 +620,59 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    // 컬럼형 차트 응답(format=columnar)의 한 열을 typed array로 변환
+    // (JSON 배열의 null은 NaN, base64 버퍼는 little-endian int64/float32)
+    function decodeColumn(value, dtype) {
+        if (typeof value !== 'string') {
+            return Float64Array.from(value, v => (v === null ? NaN : v));
+        }
+        const binary = atob(value);
+        const bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+        if (dtype === 'int64') {
+            return Float64Array.from(new BigInt64Array(bytes.buffer), Number);
+        }
+        return new Float32Array(bytes.buffer);
+    }
+
+    // 컬럼형 응답을 renderChart가 사용하는 행 형식(ohlc/volume/ma)으로 변환
+    function decodeColumnarPrices(data) {
+        const dtypes = data.dtypes || {};
+        const column = name => decodeColumn(data.columns[name], dtypes[name]);
+        const t = decodeColumn(data.t, dtypes.t);
+        const o = column('o'), h = column('h'), l = column('l'), c = column('c'), v = column('v');
+
+        const n = t.length;
+        const x = new Float64Array(n);
+        const labels = new Array(n);
+        const ohlc = new Array(n);
+        const volume = new Array(n);
+        for (let i = 0; i < n; i++) {
+            // 서버 타임스탬프는 UTC 자정 -> 날짜 문자열을 로컬 자정으로 읽던 기존 차트와 같은 위치로 보정
+            x[i] = t[i] + new Date(t[i]).getTimezoneOffset() * 60000;
+            labels[i] = new Date(t[i]).toISOString().slice(0, 10);
+            ohlc[i] = { x: x[i], o: o[i], h: h[i], l: l[i], c: c[i] };
+            volume[i] = { x: x[i], y: v[i], color: c[i] >= o[i] ? '#22c55e' : '#ef4444' };
+        }
+
+        const line = values => Array.from(values, (y, i) => ({ x: x[i], y: Number.isNaN(y) ? null : y }));
+        return {
+            ...data,
+            prices: Array.from(c),
+            labels,
+            ohlc,
+            volume,
+            ma10: line(column('ma10')),
+            ma20: line(column('ma20')),
+            ma50: line(column('ma50'))
+        };
+    }
+
+    // 차트 x값: 날짜 문자열(ISO) 또는 이미 변환된 epoch 밀리초
+    function toMillis(x) {
+        return typeof x === 'number' ? x : luxon.DateTime.fromISO(x).valueOf();
+    }
+
     function renderChart(prices, labels, ohlc = null, extras = {}) {
         const chartElement = document.getElementById('stock-chart');
         if (!chartElement) return;
@@ -643,7 +699,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (isChartPage && ohlc && ohlc.length > 0) {
             // Filter out invalid OHLC data points
             const formattedOhlc = ohlc.map(d => ({
-                x: luxon.DateTime.fromISO(d.x).valueOf(),
+                x: toMillis(d.x),
                 o: parseFloat(d.o),
                 h: parseFloat(d.h),
                 l: parseFloat(d.l),
@@ -669,7 +725,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 datasets.push({
                     label: 'MA10',
                     type: 'line',
-                    data: extras.ma10.filter(d => d.y !== null).map(d => ({ x: luxon.DateTime.fromISO(d.x).valueOf(), y: d.y })),
+                    data: extras.ma10.filter(d => d.y !== null).map(d => ({ x: toMillis(d.x), y: d.y })),
                     borderColor: '#f59e0b',
                     borderWidth: 1.5,
                     pointRadius: 0,
@@ -682,7 +738,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 datasets.push({
                     label: 'MA20',
                     type: 'line',
-                    data: extras.ma20.filter(d => d.y !== null).map(d => ({ x: luxon.DateTime.fromISO(d.x).valueOf(), y: d.y })),
+                    data: extras.ma20.filter(d => d.y !== null).map(d => ({ x: toMillis(d.x), y: d.y })),
                     borderColor: '#3b82f6',
                     borderWidth: 1.5,
                     pointRadius: 0,
@@ -695,7 +751,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 datasets.push({
                     label: 'MA50',
                     type: 'line',
-                    data: extras.ma50.filter(d => d.y !== null).map(d => ({ x: luxon.DateTime.fromISO(d.x).valueOf(), y: d.y })),
+                    data: extras.ma50.filter(d => d.y !== null).map(d => ({ x: toMillis(d.x), y: d.y })),
                     borderColor: '#a855f7',
                     borderWidth: 1.5,
                     pointRadius: 0,
@@ -710,7 +766,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 datasets.push({
                     label: '거래량',
                     type: 'bar',
-                    data: extras.volume.map(d => ({ x: luxon.DateTime.fromISO(d.x).valueOf(), y: d.y })),
+                    data: extras.volume.map(d => ({ x: toMillis(d.x), y: d.y })),
                     backgroundColor: extras.volume.map(d => d.color + '80'),
                     borderColor: extras.volume.map(d => d.color),
                     borderWidth: 0,
@@ -949,21 +1005,27 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    // Fetch current price for a ticker
-    async function fetchCurrentPrice(ticker) {
+    // Fetch current prices for many tickers in one request
+    async function fetchCurrentPrices(tickers) {
+        const prices = {};
+        tickers.forEach(ticker => { prices[ticker] = { price: null, name: ticker }; });
+        if (tickers.length === 0) return prices;
+
         try {
-            const res = await fetch(`/api/historical?ticker=${ticker}&range=1m`);
+            const res = await fetch(`/api/quotes?tickers=${tickers.map(encodeURIComponent).join(',')}`);
             if (res.ok) {
                 const data = await res.json();
-                return {
-                    price: data.current_price,
-                    name: data.meta?.name || ticker
-                };
+                Object.entries(data.quotes || {}).forEach(([ticker, quote]) => {
+                    prices[ticker] = {
+                        price: quote.price,
+                        name: quote.name || ticker
+                    };
+                });
             }
         } catch (e) {
-            console.warn(`Failed to fetch price for ${ticker}`, e);
+            console.warn('Failed to fetch watchlist prices', e);
         }
-        return { price: null, name: ticker };
+        return prices;
     }
 
     // Render watchlist tabs
@@ -1037,13 +1099,12 @@ document.addEventListener('DOMContentLoaded', () => {
         `;
 
         // Fetch current prices for all stocks
-        const pricePromises = stocks.map(stock => fetchCurrentPrice(stock.ticker));
-        const prices = await Promise.all(pricePromises);
+        const prices = await fetchCurrentPrices(stocks.map(stock => stock.ticker));
 
         // Build table rows
         let rowsHTML = '';
-        stocks.forEach((stock, idx) => {
-            const priceData = prices[idx];
+        stocks.forEach(stock => {
+            const priceData = prices[stock.ticker];
             const currentPrice = priceData.price;
             const name = priceData.name || stock.name || stock.ticker;
 